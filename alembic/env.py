@@ -1,5 +1,6 @@
 from logging.config import fileConfig
 from sqlalchemy import engine_from_config, pool
+from sqlalchemy.engine import make_url
 from alembic import context
 import sys
 import os
@@ -19,11 +20,35 @@ if config.config_file_name is not None:
 target_metadata = Base.metadata
 
 
+def include_object_for(dialect_name: str):
+    """Autogenerate filtr — vynechá objekty, které modely nepopisují pro tento dialekt.
+
+    - items_fts* (FTS5 tabulka a její stínové tabulky na SQLite) vzniká
+      v app/models/item.py přes DDL, v metadatech není
+    - indexy s ddl_if(dialect=…) (ft_items jen pro MariaDB/MySQL)
+    """
+    def include_object(obj, name, type_, reflected, compare_to):
+        if type_ == "table" and name and name.startswith("items_fts"):
+            return False
+        if type_ == "index" and not reflected:
+            ddl_if = getattr(obj, "_ddl_if", None)
+            dialects = getattr(ddl_if, "dialect", None)
+            if dialects is not None:
+                if isinstance(dialects, str):
+                    dialects = (dialects,)
+                if dialect_name not in dialects:
+                    return False
+        return True
+
+    return include_object
+
+
 def run_migrations_offline() -> None:
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object_for(make_url(url).get_backend_name()),
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -38,7 +63,11 @@ def run_migrations_online() -> None:
         poolclass=pool.NullPool,
     )
     with connectable.connect() as connection:
-        context.configure(connection=connection, target_metadata=target_metadata)
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object_for(connection.dialect.name),
+        )
         with context.begin_transaction():
             context.run_migrations()
 
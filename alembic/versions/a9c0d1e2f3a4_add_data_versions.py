@@ -0,0 +1,27 @@
+"""add data_versions table (shared table versions for multiple workers)
+
+Revision ID: a9c0d1e2f3a4
+Revises: f7a8b9c0d1e2
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'a9c0d1e2f3a4'
+down_revision = 'f7a8b9c0d1e2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'data_versions',
+        sa.Column('table_name', sa.String(length=64), nullable=False),
+        sa.Column('version', sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint('table_name'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('data_versions')
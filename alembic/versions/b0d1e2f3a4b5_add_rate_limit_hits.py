@@ -0,0 +1,30 @@
+"""add rate_limit_hits table (login throttle shared across workers)
+
+Revision ID: b0d1e2f3a4b5
+Revises: a9c0d1e2f3a4
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'b0d1e2f3a4b5'
+down_revision = 'a9c0d1e2f3a4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'rate_limit_hits',
+        sa.Column('rate_key', sa.String(length=128), nullable=False),
+        sa.Column('bucket', sa.BigInteger(), nullable=False),
+        sa.Column('hits', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('rate_key', 'bucket'),
+    )
+    op.create_index('ix_rate_limit_hits_bucket', 'rate_limit_hits', ['bucket'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_rate_limit_hits_bucket', table_name='rate_limit_hits')
+    op.drop_table('rate_limit_hits')
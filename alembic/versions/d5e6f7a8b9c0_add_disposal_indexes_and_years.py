@@ -0,0 +1,42 @@
+"""add disposal indexes and disposal_years summary
+
+Revision ID: d5e6f7a8b9c0
+Revises: c4d5e6f7a8b9
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'd5e6f7a8b9c0'
+down_revision = 'c4d5e6f7a8b9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_disposals_disposed_at', 'disposals', ['disposed_at'], unique=False)
+    op.create_index('ix_disposals_reason_disposed_at', 'disposals', ['reason', 'disposed_at'], unique=False)
+
+    op.create_table(
+        'disposal_years',
+        sa.Column('year', sa.Integer(), autoincrement=False, nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('year'),
+    )
+
+    # Naplnění souhrnu z existujících záznamů
+    disposals = sa.table('disposals', sa.column('disposed_at', sa.DateTime(timezone=True)))
+    year = sa.extract('year', disposals.c.disposed_at)
+    rows = op.get_bind().execute(
+        sa.select(year, sa.func.count()).select_from(disposals).group_by(year)
+    ).all()
+    if rows:
+        years = sa.table('disposal_years', sa.column('year', sa.Integer), sa.column('count', sa.Integer))
+        op.bulk_insert(years, [{'year': int(y), 'count': c} for y, c in rows if y is not None])
+
+
+def downgrade() -> None:
+    op.drop_table('disposal_years')
+    op.drop_index('ix_disposals_reason_disposed_at', table_name='disposals')
+    op.drop_index('ix_disposals_disposed_at', table_name='disposals')
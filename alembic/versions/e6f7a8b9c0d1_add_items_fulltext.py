@@ -0,0 +1,54 @@
+"""add full-text index on items (FTS5 on SQLite, FULLTEXT on MariaDB)
+
+Revision ID: e6f7a8b9c0d1
+Revises: d5e6f7a8b9c0
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from alembic import op
+
+revision = 'e6f7a8b9c0d1'
+down_revision = 'd5e6f7a8b9c0'
+branch_labels = None
+depends_on = None
+
+COLUMNS = ['code', 'name', 'serial_number', 'description', 'category', 'responsible_person']
+_cols = ', '.join(COLUMNS)
+_new = ', '.join(f'new.{c}' for c in COLUMNS)
+_old = ', '.join(f'old.{c}' for c in COLUMNS)
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute(
+            f"CREATE VIRTUAL TABLE items_fts USING fts5({_cols}, content='items', "
+            f"content_rowid='id', tokenize='unicode61 remove_diacritics 2')"
+        )
+        op.execute(
+            f"CREATE TRIGGER items_fts_ai AFTER INSERT ON items BEGIN "
+            f"INSERT INTO items_fts(rowid, {_cols}) VALUES (new.id, {_new}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER items_fts_ad AFTER DELETE ON items BEGIN "
+            f"INSERT INTO items_fts(items_fts, rowid, {_cols}) VALUES ('delete', old.id, {_old}); END"
+        )
+        op.execute(
+            f"CREATE TRIGGER items_fts_au AFTER UPDATE ON items BEGIN "
+            f"INSERT INTO items_fts(items_fts, rowid, {_cols}) VALUES ('delete', old.id, {_old}); "
+            f"INSERT INTO items_fts(rowid, {_cols}) VALUES (new.id, {_new}); END"
+        )
+        # Naplnění indexu z existujících položek
+        op.execute("INSERT INTO items_fts(items_fts) VALUES ('rebuild')")
+    elif dialect in ('mysql', 'mariadb'):
+        op.create_index('ft_items', 'items', COLUMNS, mysql_prefix='FULLTEXT')
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for trigger in ('items_fts_ai', 'items_fts_ad', 'items_fts_au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS items_fts")
+    elif dialect in ('mysql', 'mariadb'):
+        op.drop_index('ft_items', table_name='items')
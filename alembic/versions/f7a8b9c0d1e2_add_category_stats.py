@@ -0,0 +1,50 @@
+"""add category_stats summary table
+
+Revision ID: f7a8b9c0d1e2
+Revises: e6f7a8b9c0d1
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = 'f7a8b9c0d1e2'
+down_revision = 'e6f7a8b9c0d1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'category_stats',
+        sa.Column('category', sa.String(length=128), nullable=False),
+        sa.Column('item_count', sa.Integer(), nullable=False),
+        sa.Column('total_value', sa.Numeric(precision=14, scale=2), nullable=False),
+        sa.PrimaryKeyConstraint('category'),
+    )
+
+    # Naplnění souhrnu z aktivních položek
+    items = sa.table(
+        'items',
+        sa.column('category', sa.String),
+        sa.column('purchase_price', sa.Numeric(12, 2)),
+        sa.column('is_active', sa.Boolean),
+    )
+    category = sa.func.coalesce(items.c.category, '')
+    rows = op.get_bind().execute(
+        sa.select(category, sa.func.count(), sa.func.coalesce(sa.func.sum(items.c.purchase_price), 0))
+        .where(items.c.is_active == sa.true())
+        .group_by(category)
+    ).all()
+    if rows:
+        stats = sa.table(
+            'category_stats',
+            sa.column('category', sa.String),
+            sa.column('item_count', sa.Integer),
+            sa.column('total_value', sa.Numeric(14, 2)),
+        )
+        op.bulk_insert(stats, [{'category': c, 'item_count': n, 'total_value': v} for c, n, v in rows])
+
+
+def downgrade() -> None:
+    op.drop_table('category_stats')
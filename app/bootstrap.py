@@ -0,0 +1,110 @@
+"""
+Jednorázová inicializace databáze při startu — create_all, naplnění nově
+vytvořených souhrnných tabulek a první admin.
+
+S více workery by ji jinak spustil každý proces najednou (souběžné CREATE
+TABLE, dva první admini). Proto:
+  - gunicorn (gunicorn.conf.py) ji provede jednou v master procesu před
+    forkem workerů a nastaví INIT_DONE_ENV — lifespan workerů ji přeskočí
+  - jinak běží pod zámkem napříč procesy (SQLite: flock na souboru vedle
+    DB, MariaDB: GET_LOCK) — třeba při souběžném startu více kontejnerů nad
+    jednou DB ji dokončí první a ostatní už nic nevytvoří
+
+Více workerů se spouští jen přes gunicorn (entrypoint.sh, WEB_CONCURRENCY),
+který zapne i sdílené verze dat a limit přihlášení. `uvicorn --workers`
+podporované není — cache (ETagy, počty) by v každém procesu zastarávaly.
+"""
+import logging
+import os
+from contextlib import contextmanager, nullcontext
+
+from sqlalchemy import inspect, select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import Base
+import app.models  # noqa — register all models
+from app.models.user import User
+from app.services.category_service import rebuild_category_stats
+from app.services.disposal_service import rebuild_disposal_years
+from app.services.user_service import hash_password
+
+try:
+    import fcntl
+except ImportError:  # Windows — jen jeden proces
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+INIT_DONE_ENV = "ASSETTRACK_DB_INITIALIZED"
+_LOCK_NAME = "assettrack_init"
+
+# Souhrnné tabulky → přepočet ze zdrojových dat. Migrace je naplní samy;
+# u DB spravované přes create_all je nová tabulka prázdná a doplní se tady.
+_SUMMARY_TABLES = {
+    "category_stats": rebuild_category_stats,
+    "disposal_years": rebuild_disposal_years,
+}
+
+
+@contextmanager
+def _file_lock(path: str):
+    with open(path, "a") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+@contextmanager
+def _mysql_lock(bind: Engine, timeout: int = 60):
+    with bind.connect() as conn:
+        conn.execute(text("SELECT GET_LOCK(:name, :timeout)"), {"name": _LOCK_NAME, "timeout": timeout})
+        try:
+            yield
+        finally:
+            conn.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": _LOCK_NAME})
+
+
+def init_lock(bind: Engine):
+    """Zámek napříč procesy pro inicializaci databáze `bind`."""
+    url = bind.url
+    backend = url.get_backend_name()
+    if backend == "sqlite" and fcntl is not None and url.database not in (None, "", ":memory:"):
+        return _file_lock(f"{url.database}.init.lock")
+    if backend in ("mysql", "mariadb"):
+        return _mysql_lock(bind)
+    return nullcontext()
+
+
+def init_database(bind: Engine) -> None:
+    """Vytvoří chybějící tabulky (nové souhrnné tabulky naplní) a prvního
+    admina (jen pokud v DB není žádný uživatel)."""
+    with init_lock(bind):
+        existing = set(inspect(bind).get_table_names())
+        Base.metadata.create_all(bind=bind)
+        with Session(bind) as db:
+            for table, rebuild in _SUMMARY_TABLES.items():
+                if table not in existing:
+                    rebuild(db)
+            if db.scalar(select(User.id).limit(1)) is None:
+                db.add(User(
+                    username=settings.FIRST_ADMIN_USER,
+                    email=f"{settings.FIRST_ADMIN_USER}@assettrack.local",
+                    hashed_password=hash_password(settings.FIRST_ADMIN_PASS),
+                    role="admin",
+                    is_active=True,
+                ))
+                db.commit()
+                logger.info("Vytvořen první admin uživatel: %s", settings.FIRST_ADMIN_USER)
+
+
+def already_initialized() -> bool:
+    return os.environ.get(INIT_DONE_ENV) == "1"
+
+
+def mark_initialized() -> None:
+    """Voláno v master procesu gunicornu — forknuté workery env zdědí."""
+    os.environ[INIT_DONE_ENV] = "1"
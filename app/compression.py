@@ -0,0 +1,153 @@
+"""
+Komprese API odpovědí podle Accept-Encoding — brotli (je-li nainstalováno), jinak gzip.
+
+Komprimují se jen textové odpovědi pod /api/ nad `minimum_size`. HTML stránky s CSRF tokenem se záměrně nekomprimují
+(BREACH), PNG/PDF by kompresí nic nezískaly.
+"""
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # volitelná závislost — bez ní jen gzip
+    brotli = None
+
+_COMPRESSIBLE = ("application/json", "text/csv", "text/plain")
+
+
+def _accepts(header: str, coding: str) -> bool:
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        if name.strip().lower() == coding:
+            return params.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def _negotiate(header: str) -> str | None:
+    if brotli is not None and _accepts(header, "br"):
+        return "br"
+    if _accepts(header, "gzip"):
+        return "gzip"
+    return None
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        path_prefix: str = "/api/",
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.path_prefix = path_prefix
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["path"].startswith(self.path_prefix):
+            coding = _negotiate(Headers(scope=scope).get("accept-encoding", ""))
+            if coding:
+                await _Responder(self, coding)(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+    def compressor(self, coding: str):
+        """Objekt s metodami process/flush/finish pro postupnou kompresi."""
+        if coding == "br":
+            return _Brotli(brotli.Compressor(quality=self.brotli_quality))
+        return _Gzip(zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31))
+
+
+class _Gzip:
+    def __init__(self, obj) -> None:
+        self.obj = obj
+
+    def process(self, data: bytes) -> bytes:
+        return self.obj.compress(data)
+
+    def flush(self) -> bytes:
+        return self.obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self.obj.flush()
+
+
+class _Brotli:
+    def __init__(self, obj) -> None:
+        self.obj = obj
+
+    def process(self, data: bytes) -> bytes:
+        return self.obj.process(data)
+
+    def flush(self) -> bytes:
+        return self.obj.flush()
+
+    def finish(self) -> bytes:
+        return self.obj.finish()
+
+
+class _Responder:
+    """Drží hlavičky a tělo, dokud se nerozhodne: do `minimum_size` se nekomprimuje.
+
+    Tělo může přijít po částech (BaseHTTPMiddleware, StreamingResponse) —
+    nad limitem se komprimuje postupně a Content-Length se vynechá.
+    """
+
+    def __init__(self, middleware: CompressionMiddleware, coding: str) -> None:
+        self.middleware = middleware
+        self.coding = coding
+        self.start: Message | None = None
+        self.buffer = b""
+        self.compressor = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.middleware.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            if "content-encoding" in headers or not content_type.startswith(_COMPRESSIBLE):
+                self.passthrough = True
+                await self.send(message)
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+
+        more_body = message.get("more_body", False)
+        if self.compressor is not None:
+            body = self.compressor.process(message.get("body", b""))
+            body += self.compressor.flush() if more_body else self.compressor.finish()
+            await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
+            return
+
+        self.buffer += message.get("body", b"")
+        if more_body and len(self.buffer) < self.middleware.minimum_size:
+            return
+        headers = MutableHeaders(raw=self.start["headers"])
+        headers.add_vary_header("Accept-Encoding")
+        if not more_body and len(self.buffer) < self.middleware.minimum_size:
+            await self.send(self.start)
+            await self.send({"type": "http.response.body", "body": self.buffer})
+            return
+
+        self.compressor = self.middleware.compressor(self.coding)
+        body = self.compressor.process(self.buffer)
+        body += self.compressor.flush() if more_body else self.compressor.finish()
+        self.buffer = b""
+        headers["Content-Encoding"] = self.coding
+        if more_body:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(len(body))
+        await self.send(self.start)
+        await self.send({"type": "http.response.body", "body": body, "more_body": more_body})
@@ -1,4 +1,5 @@
 import logging
+import os
 from pydantic_settings import BaseSettings
 
 logger = logging.getLogger(__name__)
@@ -11,8 +12,36 @@ class Settings(BaseSettings):
     BASE_URL: str = "http://localhost:8000"
     SECRET_KEY: str = _DEFAULT_SECRET
     DATABASE_URL: str = "sqlite:///./data/inventory.db"
+    # Replika pro reporty a exporty (MariaDB); prázdné = SQLite read-only pool / primární DB
+    DATABASE_READ_URL: str = ""
     FIRST_ADMIN_USER: str = "admin"
     FIRST_ADMIN_PASS: str = "admin123"
+    # Pool spojení (MariaDB); SQLite pool neomezuje
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800  # < wait_timeout serveru
+    DB_POOL_PRE_PING: bool = True
+    # SQLite — WAL umožní čtení souběžně se zápisem, busy_timeout čeká místo „database is locked"
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_SIZE_KB: int = 65536
+    SQLITE_MMAP_SIZE: int = 268435456
+    # Limit pokusů o přihlášení: memory (v procesu) / database (sdílený mezi workery)
+    RATE_LIMIT_BACKEND: str = "memory"
+    # Skeny a přesuny přes jednoho zapisovače se skupinovým commitem (SQLite)
+    WRITE_QUEUE: bool = False
+    WRITE_QUEUE_WINDOW_MS: float = 2.0
+    WRITE_QUEUE_MAX_BATCH: int = 256
+    # Verze tabulek i v DB (tabulka data_versions) — zapnout při více workerech
+    DATA_VERSIONS_SHARED: bool = False
+    DATA_VERSIONS_SYNC_INTERVAL: float = 1.0
+    # Hlavička Server-Timing (prozrazuje časy a počty SQL komukoli — jen pro vývoj/ladění)
+    SERVER_TIMING: bool = False
+    # JSON log požadavků delších než SLOW_REQUEST_MS (0 = vypnuto)
+    SLOW_REQUEST_MS: int = 1000
+    SLOW_REQUEST_TOP_SQL: int = 5
 
     class Config:
         env_file = ".env"
@@ -31,3 +60,11 @@ if settings.FIRST_ADMIN_PASS == "admin123":
         logger.warning("⚠️  FIRST_ADMIN_PASS má výchozí hodnotu 'admin123' — změňte ji v .env!")
     else:
         logger.warning("⚠️  FIRST_ADMIN_PASS má výchozí hodnotu — doporučeno změnit v .env")
+
+if int(os.environ.get("WEB_CONCURRENCY", "1")) > 1 and (
+    not settings.DATA_VERSIONS_SHARED or settings.RATE_LIMIT_BACKEND != "database"
+):
+    logger.warning(
+        "⚠️  WEB_CONCURRENCY > 1 bez DATA_VERSIONS_SHARED=true a RATE_LIMIT_BACKEND=database — "
+        "cache a limity přihlášení nebudou sdílené mezi workery"
+    )
@@ -0,0 +1,177 @@
+"""
+Verze dat po tabulkách — základ pro invalidaci cache.
+
+Každý commit, který změnil tabulku, jí přidělí novou verzi z jedné rostoucí
+sekvence procesu. Cache si uloží verze tabulek, ze kterých počítala
+(`get_versions`), a při neshodě hodnotu zahodí.
+
+Změny se sbírají ze dvou míst:
+  - after_flush — ORM objekty (session.add, změna atributu, delete)
+  - do_orm_execute — hromadné INSERT/UPDATE/DELETE přes session.execute()
+a verze se zvýší až v after_commit; rollback nasbírané změny zahodí.
+
+Sdílený režim (DATA_VERSIONS_SHARED): v before_commit se verze každé změněné
+tabulky jednou přičte v tabulce data_versions — ve stejné transakci jako
+samotná změna — a výsledek se přečte. Řádek tabulky je pak zamčený jen na
+dobu commitu, ne od prvního flushe, takže zápisy různých workerů do stejné
+tabulky se na MariaDB neřadí za sebe po celou transakci. Workery přes
+`sync_shared()` nejvýš jednou za DATA_VERSIONS_SYNC_INTERVAL zjistí změny
+provedené jinými procesy; vlastní zápisy se za cizí nepovažují, pokud mezi
+ně nikdo jiný nezapsal. Cache mimo verze (index kódů) se přihlásí přes
+`subscribe()`.
+"""
+import threading
+import time
+from collections import defaultdict
+from itertools import chain, count
+from typing import Callable, Iterable
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.data_version import DataVersion
+import app.services.upsert as upsert
+
+_sequence = count(1)
+_versions: dict[str, int] = defaultdict(int)
+_lock = threading.Lock()
+
+_shared_seen: dict[str, int] = {}
+_shared_synced_at = 0.0
+_listeners: list[tuple[frozenset[str], Callable[[list[str]], None]]] = []
+
+_PENDING_KEY = "_data_versions_pending"
+_SHARED_KEY = "_data_versions_shared"
+_SHARED_TABLE = DataVersion.__tablename__
+
+
+def get_version(table: str) -> int:
+    return _versions[table]
+
+
+def get_versions(*tables: str) -> tuple[int, ...]:
+    return tuple(_versions[t] for t in tables)
+
+
+def shared_versions(db: Session, *tables: str) -> tuple[int, ...]:
+    """Verze tabulek přímo z data_versions (sdílený režim) — stejné ve všech procesech."""
+    rows = dict(db.execute(
+        select(DataVersion.table_name, DataVersion.version).where(DataVersion.table_name.in_(tables))
+    ).all())
+    return tuple(rows.get(t, 0) for t in tables)
+
+
+def bump(*tables: str) -> None:
+    """Přidělí tabulkám novou verzi."""
+    with _lock:
+        for table in tables:
+            _versions[table] = next(_sequence)
+
+
+# ── Sběr změn v session ───────────────────────────────────────────────────────
+
+def _pending(session: Session) -> set[str]:
+    return session.info.setdefault(_PENDING_KEY, set())
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed(session: Session, flush_context) -> None:
+    for obj in chain(session.new, session.dirty, session.deleted):
+        table = getattr(obj, "__tablename__", None)
+        if table and table != _SHARED_TABLE:
+            _pending(session).add(table)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _collect_dml(state) -> None:
+    if state.is_insert or state.is_update or state.is_delete:
+        table = getattr(state.statement, "table", None)
+        if table is not None and table.name != _SHARED_TABLE:
+            _pending(state.session).add(table.name)
+
+
+@event.listens_for(Session, "before_commit")
+def _bump_shared(session: Session) -> None:
+    if not settings.DATA_VERSIONS_SHARED:
+        return
+    # before_commit běží před závěrečným flushem — změny z něj musí být v pending
+    session.flush()
+    pending = session.info.get(_PENDING_KEY)
+    if not pending:
+        return
+    connection = session.connection()
+    written = session.info.setdefault(_SHARED_KEY, {})
+    for table in sorted(pending):  # stálé pořadí zámků — bez deadlocku mezi workery
+        upsert.increment(connection, DataVersion, {"table_name": table}, {"version": 1})
+        written[table] = connection.scalar(select(DataVersion.version).where(DataVersion.table_name == table))
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_committed(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        bump(*pending)
+    written = session.info.pop(_SHARED_KEY, None)
+    if written:
+        with _lock:
+            for table, version in written.items():
+                # Jen navazuje-li zápis na známou verzi — jinak mezitím zapsal
+                # jiný worker a změnu ohlásí až sync_shared
+                if _shared_seen.get(table) == version - 1:
+                    _shared_seen[table] = version
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_SHARED_KEY, None)
+
+
+# ── Sdílené verze (více workerů) ──────────────────────────────────────────────
+
+def subscribe(tables: Iterable[str], callback: Callable[[list[str]], None]) -> None:
+    """`callback(změněné tabulky)` po zápisu jiného procesu do některé z `tables`.
+
+    Pro cache, které verze tabulek samy nekontrolují. Volá se ze `sync_shared`,
+    tedy se zpožděním nejvýš DATA_VERSIONS_SYNC_INTERVAL.
+    """
+    _listeners.append((frozenset(tables), callback))
+
+
+def sync_shared(db: Session) -> list[str]:
+    """Načte data_versions a posune lokální verze tabulek změněných jinde.
+
+    Při prvním volání se posunou všechny tabulky uvedené v data_versions —
+    cache postavené před synchronizací mohly zmeškat cizí zápisy.
+    """
+    global _shared_synced_at
+    rows = db.execute(select(DataVersion.table_name, DataVersion.version)).all()
+    with _lock:
+        changed = [table for table, version in rows if _shared_seen.get(table) != version]
+        _shared_seen.update(rows)
+        _shared_synced_at = time.monotonic()
+    if changed:
+        bump(*changed)
+        for tables, callback in _listeners:
+            if hit := [table for table in changed if table in tables]:
+                callback(hit)
+    return changed
+
+
+def sync_due() -> bool:
+    return (
+        settings.DATA_VERSIONS_SHARED
+        and time.monotonic() - _shared_synced_at >= settings.DATA_VERSIONS_SYNC_INTERVAL
+    )
+
+
+def sync_shared_if_due(session_factory) -> None:
+    """Volá `sync_shared` nejvýš jednou za DATA_VERSIONS_SYNC_INTERVAL sekund."""
+    if not sync_due():
+        return
+    db = session_factory()
+    try:
+        sync_shared(db)
+    finally:
+        db.close()
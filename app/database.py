@@ -1,14 +1,143 @@
-from sqlalchemy import create_engine
+import os
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
 from app.config import settings
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
-)
+
+def engine_options(url: str) -> dict:
+    """Parametry create_engine podle backendu (profil z DB_* / SQLITE_* v Settings)."""
+    backend = make_url(url).get_backend_name()
+    if backend == "sqlite":
+        return {"connect_args": {"check_same_thread": False}}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def sqlite_pragmas() -> dict[str, object]:
+    return {
+        "journal_mode": settings.SQLITE_JOURNAL_MODE,
+        "synchronous": settings.SQLITE_SYNCHRONOUS,
+        "busy_timeout": settings.SQLITE_BUSY_TIMEOUT_MS,
+        # Záporná hodnota = velikost v KiB, ne počet stránek
+        "cache_size": -settings.SQLITE_CACHE_SIZE_KB,
+        "mmap_size": settings.SQLITE_MMAP_SIZE,
+        "temp_store": "MEMORY",
+    }
+
+
+# Async ovladač pro backend (sync URL → async URL se stejnou databází)
+_ASYNC_DRIVERS = {"sqlite": "aiosqlite", "mysql": "asyncmy", "mariadb": "asyncmy"}
+
+
+def async_url(url: str) -> str:
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    return parsed.set(drivername=f"{backend}+{_ASYNC_DRIVERS[backend]}").render_as_string(hide_password=False)
+
+
+def apply_sqlite_pragmas(engine: Engine, read_only: bool = False) -> None:
+    """Nastaví PRAGMA na každém novém spojení (WAL, busy_timeout, cache…).
+
+    `read_only`: spojení jen pro čtení (query_only) — journal mode je vlastnost
+    souboru a nastaví ho zapisující engine.
+    """
+    pragmas = sqlite_pragmas()
+    if read_only:
+        del pragmas["journal_mode"]
+        pragmas["query_only"] = "ON"
+
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name} = {value}")
+        finally:
+            cursor.close()
+
+
+def make_engine(url: str) -> Engine:
+    new_engine = create_engine(url, **engine_options(url))
+    if new_engine.dialect.name == "sqlite":
+        apply_sqlite_pragmas(new_engine)
+    return new_engine
+
+
+def make_read_engine(url: str, read_url: str = "") -> Engine | None:
+    """Engine pro reporty a exporty.
+
+    `read_url` (replika MariaDB) má přednost. Bez něj má SQLite soubor vlastní
+    pool spojení jen pro čtení — ve WAL čtení neblokuje zápisy ani naopak.
+    Jinak None: čte se přes primární engine.
+    """
+    if read_url:
+        return make_engine(read_url)
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "sqlite" or parsed.database in (None, "", ":memory:"):
+        return None
+    new_engine = create_engine(url, **engine_options(url))
+    apply_sqlite_pragmas(new_engine, read_only=True)
+    return new_engine
+
+
+def make_async_engine(url: str) -> AsyncEngine:
+    """Async engine nad stejnou databází a se stejným profilem jako `make_engine`."""
+    options = engine_options(url)
+    options.pop("connect_args", None)  # aiosqlite běží ve vlastním vlákně
+    new_engine = create_async_engine(async_url(url), **options)
+    if new_engine.dialect.name == "sqlite":
+        apply_sqlite_pragmas(new_engine.sync_engine)
+    return new_engine
+
+
+def database_key(bind) -> object:
+    """Identita databáze nezávislá na ovladači — sync i async engine nad stejnou DB
+    dají stejný klíč. In-memory SQLite je vždy jen svůj engine."""
+    engine = getattr(bind, "engine", bind)
+    url = engine.url
+    backend = url.get_backend_name()
+    if backend == "sqlite":
+        if url.database in (None, "", ":memory:") or "mode=memory" in str(url):
+            return engine
+        return backend, os.path.abspath(url.database)
+    return backend, url.host, url.port, url.database
+
+
+def pool_stats(bind: Engine) -> dict:
+    """Stav poolu spojení; u poolů bez limitu (SQLite :memory:) jen třída."""
+    pool = bind.pool
+    stats = {"class": type(pool).__name__}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        method = getattr(pool, name, None)
+        if callable(method):
+            stats[name] = method()
+    if "size" in stats:
+        stats["max_overflow"] = getattr(pool, "_max_overflow", None)
+    return stats
+
+
+engine = make_engine(settings.DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Session jen pro čtení — info["read_only"] říká službám, že nesmí zapisovat
+read_engine = make_read_engine(settings.DATABASE_URL, settings.DATABASE_READ_URL) or engine
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine, info={"read_only": True})
+
+# Async vrstva pro endpointy skenerů (scan, resolve, přesun, detail položky) —
+# čekání na DB neblokuje vlákno threadpoolu. Po commitu se objekty neexpirují,
+# aby šly serializovat bez dalšího (async) načtení.
+async_engine = make_async_engine(settings.DATABASE_URL)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 
 class Base(DeclarativeBase):
     pass
@@ -20,3 +149,17 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+def get_read_db():
+    """Session pro těžké čtení (exporty, reporty, dashboard) — nesoupeří se zápisy skenů."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,42 @@
+"""
+Rychlá cesta pro JSON seznamy — řádky z Core dotazu rovnou do orjson.
+
+Standardní cesta validuje každý ORM objekt přes Pydantic (`from_attributes`)
+a pak ho kóduje výchozím encoderem. Pro 200 položek s Decimal a datetime to
+je většina CPU času požadavku. Rychlá cesta (`?fast=true`) vynechá ORM
+i Pydantic; výstup je bajtově shodný (Decimal jako řetězec, UTC jako „Z“).
+
+orjson je v requirements.txt připnutý samostatně — FastAPI ho od 0.112 nezávisí.
+"""
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi import Response
+
+from app.schemas.pagination import Page
+
+# Validátory nastavené na injektované Response (viz app.http_cache)
+_PASSTHROUGH_HEADERS = ("etag", "last-modified", "cache-control")
+
+
+def _default(value: Any):
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError
+
+
+def dumps(payload: Any) -> bytes:
+    return orjson.dumps(payload, default=_default, option=orjson.OPT_UTC_Z)
+
+
+def row_dicts(rows, fields: tuple[str, ...]) -> list[dict]:
+    return [{f: row._mapping[f] for f in fields} for row in rows]
+
+
+def page_response(page: Page, response: Response | None = None) -> Response:
+    """JSON odpověď stránky, jejíž `items` jsou už hotové slovníky."""
+    headers = {}
+    if response is not None:
+        headers = {h: response.headers[h] for h in _PASSTHROUGH_HEADERS if h in response.headers}
+    return Response(content=dumps(dict(page)), media_type="application/json", headers=headers)
@@ -0,0 +1,97 @@
+"""
+Podmíněné GET požadavky — ETag / Last-Modified a odpovědi 304.
+
+Endpoint spočítá validátory z levných údajů (updated_at, verze tabulek,
+agregát přes index) ještě před načtením a serializací dat a zavolá
+`not_modified()`. Pokud klient hodnotu už má, vrátí se prázdná 304.
+"""
+import hashlib
+import os
+import uuid
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+from sqlalchemy.orm import Session
+
+from app import data_versions
+from app.config import settings
+
+# Verze tabulek žijí v paměti procesu a po restartu začínají od nuly —
+# epocha procesu zajistí, že se ETag z minulého běhu ani z jiného workeru
+# nikdy neshoduje. Forknutý worker (gunicorn preload_app) si ji vygeneruje
+# znovu, jinak by zdědil epochu mastera.
+_EPOCH = uuid.uuid4().hex[:8]
+
+
+def _new_epoch() -> None:
+    global _EPOCH
+    _EPOCH = uuid.uuid4().hex[:8]
+
+
+if hasattr(os, "register_at_fork"):  # není na Windows — tam se nic neforkuje
+    os.register_at_fork(after_in_child=_new_epoch)
+
+# JSON: klient smí uložit, ale před použitím musí ověřit (304 je levná)
+REVALIDATE = "private, no-cache"
+# Obsah adresovaný svým obsahem (QR s ?code=) se nemění nikdy
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha1("\x1f".join(str(p) for p in parts).encode()).hexdigest()
+    return f'"{digest[:24]}"'
+
+
+def versions_etag(db: Session, tables: tuple[str, ...], *parts) -> str:
+    """ETag z verzí tabulek (app.data_versions) a parametrů dotazu.
+
+    Ve sdíleném režimu z tabulky data_versions — stejný ve všech workerech,
+    takže 304 funguje i za load balancerem; čte se před samotnými daty.
+    """
+    if settings.DATA_VERSIONS_SHARED:
+        return make_etag("shared", *data_versions.shared_versions(db, *tables), *parts)
+    return make_etag(_EPOCH, *data_versions.get_versions(*tables), *parts)
+
+
+def _matches(header: str, etag: str) -> bool:
+    if header.strip() == "*":
+        return True
+    # Slabé porovnání (RFC 9110) — pro GET stačí, nginx při gzipu přidává W/
+    candidates = {tag.strip().removeprefix("W/") for tag in header.split(",")}
+    return etag in candidates
+
+
+def not_modified(
+    request: Request,
+    response: Response,
+    etag: str,
+    last_modified: datetime | None = None,
+    cache_control: str = REVALIDATE,
+) -> Response | None:
+    """Nastaví validátory na `response`; vrátí 304, pokud klient má aktuální verzi.
+
+    If-None-Match má přednost — If-Modified-Since se použije jen bez něj.
+    """
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if last_modified is not None:
+        if last_modified.tzinfo is None:
+            last_modified = last_modified.replace(tzinfo=timezone.utc)
+        headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+    response.headers.update(headers)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        fresh = _matches(if_none_match, etag)
+    elif last_modified is not None and "if-modified-since" in request.headers:
+        try:
+            since = parsedate_to_datetime(request.headers["if-modified-since"])
+        except (TypeError, ValueError):
+            return None
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # HTTP datum má přesnost na sekundy
+        fresh = last_modified.replace(microsecond=0) <= since
+    else:
+        fresh = False
+    return Response(status_code=304, headers=headers) if fresh else None
@@ -5,17 +5,21 @@ from fastapi.templating import Jinja2Templates
 from starlette.middleware.sessions import SessionMiddleware
 from starlette.middleware.base import BaseHTTPMiddleware
 from uvicorn.middleware.proxy_headers import ProxyHeadersMiddleware
+from starlette.concurrency import run_in_threadpool
 from contextlib import asynccontextmanager
 from jinja2 import pass_context
 import os
 
-from app.database import engine, SessionLocal
-from app.database import Base
+from app.database import engine, read_engine, SessionLocal, async_engine
 import app.models  # noqa — register all models
-from app.models.user import User
+from app import bootstrap, data_versions, metrics, request_stats
+from app.compression import CompressionMiddleware
+from app.metrics import MetricsMiddleware
+from app.write_queue import write_queue
 from app.config import settings
-from app.services.user_service import hash_password
-from app.routers import health, items, locations, moves, audits, qr, export, scan, disposals
+from app.services.code_index import code_index
+import app.services.qr_service as qr_svc
+from app.routers import health, items, locations, moves, audits, qr, export, scan, disposals, codes
 from app.routers import ui, auth_ui, admin_ui
 import logging
 
@@ -26,27 +30,23 @@ logger = logging.getLogger(__name__)
 async def lifespan(application: FastAPI):
     # Ensure DB exists and tables are created (for dev mode without alembic)
     os.makedirs("data", exist_ok=True)
-    Base.metadata.create_all(bind=engine)
+    if not bootstrap.already_initialized():
+        await run_in_threadpool(bootstrap.init_database, engine)
 
-    # Create first admin user if no users exist yet
     db = SessionLocal()
     try:
-        if not db.query(User).first():
-            admin = User(
-                username=settings.FIRST_ADMIN_USER,
-                email=f"{settings.FIRST_ADMIN_USER}@assettrack.local",
-                hashed_password=hash_password(settings.FIRST_ADMIN_PASS),
-                role="admin",
-                is_active=True,
-            )
-            db.add(admin)
-            db.commit()
-            logger.info("Vytvořen první admin uživatel: %s", settings.FIRST_ADMIN_USER)
+        code_index.rebuild(db)
     finally:
         db.close()
 
+    if settings.WRITE_QUEUE:
+        write_queue.start()
+
     yield
 
+    write_queue.stop()
+    await async_engine.dispose()
+
 
 app = FastAPI(
     title="AssetTrack",
@@ -75,7 +75,27 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
 
 
 app.add_middleware(SecurityHeadersMiddleware)
+
+
+class DataVersionSyncMiddleware(BaseHTTPMiddleware):
+    """Při více workerech převezme změny verzí tabulek z ostatních procesů."""
+
+    async def dispatch(self, request: Request, call_next) -> Response:
+        if data_versions.sync_due():
+            await run_in_threadpool(data_versions.sync_shared_if_due, SessionLocal)
+        return await call_next(request)
+
+
+if settings.DATA_VERSIONS_SHARED:
+    app.add_middleware(DataVersionSyncMiddleware)
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
 app.add_middleware(ProxyHeadersMiddleware, trusted_hosts="*")
+app.add_middleware(MetricsMiddleware)
+
+metrics.instrument_engine(engine, "primary")
+if read_engine is not engine:
+    metrics.instrument_engine(read_engine, "read")
+metrics.instrument_engine(async_engine.sync_engine, "async")
 app.mount("/static", StaticFiles(directory="app/static"), name="static")
 app.mount("/favicon", StaticFiles(directory="favicon"), name="favicon")
 
@@ -92,8 +112,11 @@ def _get_flashed_messages(ctx, with_categories=False):
     return [msg for _cat, msg in messages]
 
 
+request_stats.time_templates(ui.templates.env)
+request_stats.time_templates(auth_ui.templates.env)
 ui.templates.env.globals["get_flashed_messages"] = _get_flashed_messages
 ui.templates.env.globals["csrf_token"] = auth_ui.get_csrf_token
+ui.templates.env.globals["qr_version"] = lambda code: qr_svc.qr_version(qr_svc.scan_url(code))
 _v = app.version.split(".")
 ui.templates.env.globals["app_version"] = f"{_v[0]}.{_v[1]}"
 
@@ -107,6 +130,7 @@ app.include_router(qr.router)
 app.include_router(export.router)
 app.include_router(scan.router)
 app.include_router(disposals.router)
+app.include_router(codes.router)
 
 # Auth + UI routers
 app.include_router(auth_ui.router)
@@ -0,0 +1,241 @@
+"""
+Metriky pro Prometheus — endpoint /metrics (app/routers/health.py).
+
+  - MetricsMiddleware: latence a počet požadavků podle šablony cesty
+    (/api/items/{item_id}, ne konkrétní URL — omezený počet řad), požadavky
+    v běhu, obsazenost threadpoolu, počet a čas SQL dotazů na požadavek
+    (app.request_stats — tamtéž Server-Timing a log pomalých požadavků)
+  - `instrument_engine`: čekání na spojení z poolu (vč. otevření nového)
+  - doménové čítače: služby volají `record(db, …)`, do čítače se hodnota
+    přičte až po commitu (rollback ji zahodí, skupinový commit ve
+    write_queue ji při opakování nezapočítá dvakrát)
+
+Při více workerech (gunicorn) musí být nastavené PROMETHEUS_MULTIPROC_DIR
+ještě před importem — hodnoty se pak sčítají přes soubory všech procesů.
+Soubory ukončeného workeru (recyklace po max_requests) master přičte do
+`<typ>_archive.db` a smaže (`archive_dead_process`), takže počet souborů
+a cena scrapu nerostou s počtem vystřídaných workerů.
+Režie na požadavek jsou jednotky mikrosekund.
+"""
+import glob
+import os
+import time
+from contextlib import contextmanager, nullcontext
+
+from anyio import to_thread
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest,
+)
+from prometheus_client import multiprocess
+from prometheus_client.mmap_dict import MmapedDict
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app import request_stats
+from app.config import settings
+
+try:
+    import fcntl
+except ImportError:  # Windows — bez gunicornu, jen jeden proces
+    fcntl = None
+
+_PENDING_KEY = "_metrics_pending"
+_ARCHIVE_LOCK = ".archive.lock"
+
+REQUESTS = Counter(
+    "assettrack_http_requests_total", "HTTP požadavky", ["method", "route", "status"],
+)
+REQUEST_DURATION = Histogram(
+    "assettrack_http_request_duration_seconds", "Doba zpracování požadavku", ["method", "route"],
+)
+IN_PROGRESS = Gauge(
+    "assettrack_http_requests_in_progress", "Rozpracované požadavky", multiprocess_mode="livesum",
+)
+THREADPOOL_BUSY = Gauge(
+    "assettrack_threadpool_busy_threads", "Obsazená vlákna threadpoolu (sync endpointy)",
+    multiprocess_mode="livesum",
+)
+THREADPOOL_SIZE = Gauge(
+    "assettrack_threadpool_size_threads", "Velikost threadpoolu", multiprocess_mode="livesum",
+)
+QUERIES_PER_REQUEST = Histogram(
+    "assettrack_db_queries_per_request", "SQL dotazy na požadavek",
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, 500),
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "assettrack_db_time_per_request_seconds", "Čas SQL dotazů na požadavek",
+)
+POOL_CHECKOUT = Histogram(
+    "assettrack_db_pool_checkout_seconds", "Čekání na spojení z poolu", ["pool"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+)
+
+SCANS = Counter("assettrack_audit_scans_total", "Nově zaznamenané skeny inventur")
+MOVES = Counter("assettrack_moves_total", "Přesuny položek (vč. automatických při skenu)")
+DISPOSALS = Counter("assettrack_disposals_total", "Vyřazené položky")
+EXPORT_DURATION = Histogram(
+    "assettrack_export_duration_seconds", "Doba generování exportu", ["kind"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+EXPORT_SIZE = Histogram(
+    "assettrack_export_size_bytes", "Velikost exportu", ["kind"],
+    buckets=(1e4, 1e5, 5e5, 1e6, 5e6, 1e7, 5e7),
+)
+
+_COUNTERS = {"scans": SCANS, "moves": MOVES, "disposals": DISPOSALS}
+
+
+def _route_label(scope, root_path: str) -> str:
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    # Mount (statické soubory) route nenastaví, jen prodlouží root_path
+    mounted = scope.get("root_path", "")
+    return mounted if mounted != root_path else "unmatched"
+
+
+class MetricsMiddleware:
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        root_path = scope.get("root_path", "")
+        status = 500
+        stats = request_stats.RequestStats()
+
+        async def send_status(message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if settings.SERVER_TIMING:
+                    timing = stats.server_timing(time.perf_counter() - start).encode()
+                    message = {**message, "headers": [*message.get("headers", ()), (b"server-timing", timing)]}
+            await send(message)
+
+        token = request_stats.current.set(stats)
+        _sample_threadpool()
+        IN_PROGRESS.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            IN_PROGRESS.dec()
+            request_stats.current.reset(token)
+            route = _route_label(scope, root_path)
+            REQUEST_DURATION.labels(scope["method"], route).observe(elapsed)
+            REQUESTS.labels(scope["method"], route, str(status)).inc()
+            QUERIES_PER_REQUEST.observe(stats.queries)
+            DB_TIME_PER_REQUEST.observe(stats.db_time)
+            stats.log_if_slow(scope["method"], scope["path"], route, status, elapsed)
+
+
+def _sample_threadpool() -> None:
+    limiter = to_thread.current_default_thread_limiter()
+    THREADPOOL_BUSY.set(limiter.borrowed_tokens)
+    THREADPOOL_SIZE.set(limiter.total_tokens)
+
+
+def render() -> tuple[bytes, str]:
+    """Text pro /metrics — při více workerech součet přes všechny procesy.
+
+    Volá se z threadpoolu; obsazenost threadpoolu už zapsal middleware
+    na začátku tohoto požadavku."""
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if not directory:
+        return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, directory)
+    # Sdílený zámek — archivace nesmí smazat soubor mezi výpisem adresáře a čtením
+    with _archive_lock(directory, exclusive=False):
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def _archive_lock(directory: str, exclusive: bool):
+    if fcntl is None:
+        return nullcontext()
+    return _flock(os.path.join(directory, _ARCHIVE_LOCK), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+
+
+@contextmanager
+def _flock(path: str, mode: int):
+    with open(path, "a") as handle:
+        fcntl.flock(handle, mode)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def archive_dead_process(pid: int, directory: str | None = None) -> None:
+    """Po ukončení workeru (gunicorn child_exit): živé gauge zahodí, čítače
+    a histogramy přičte do `<typ>_archive.db` a soubory procesu smaže."""
+    directory = directory or os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if not directory:
+        return
+    multiprocess.mark_process_dead(pid, directory)
+    with _archive_lock(directory, exclusive=True):
+        for path in glob.glob(os.path.join(directory, f"*_{pid}.db")):
+            kind = os.path.basename(path).split("_")[0]
+            if kind == "gauge":
+                continue  # ne-live gauge (max, min…) tu nepoužíváme, nechat být
+            archive = MmapedDict(os.path.join(directory, f"{kind}_archive.db"))
+            try:
+                for key, value, timestamp, _ in MmapedDict.read_all_values_from_file(path):
+                    archive.write_value(key, archive.read_value(key)[0] + value, timestamp)
+            finally:
+                archive.close()
+            os.remove(path)
+
+
+# ── Pool ──────────────────────────────────────────────────────────────────────
+
+def instrument_engine(engine: Engine, pool: str) -> None:
+    """Měří čekání na spojení z poolu enginu (u async enginu předat sync_engine).
+
+    Pool nemá událost před výdejem spojení, proto obal `raw_connection` na
+    instanci — na rozdíl od obalu poolu přežije i engine.dispose().
+    """
+    raw_connection = engine.raw_connection
+    histogram = POOL_CHECKOUT.labels(pool)
+
+    def timed_raw_connection():
+        start = time.perf_counter()
+        try:
+            return raw_connection()
+        finally:
+            histogram.observe(time.perf_counter() - start)
+
+    engine.raw_connection = timed_raw_connection
+
+
+# ── Doménové čítače ───────────────────────────────────────────────────────────
+
+def record(db, name: str, amount: int = 1) -> None:
+    """Přičte `amount` k čítači `name` (scans, moves, disposals) po commitu `db`."""
+    if amount:
+        pending = db.info.setdefault(_PENDING_KEY, {})
+        pending[name] = pending.get(name, 0) + amount
+
+
+def observe_export(kind: str, started: float, size: int) -> None:
+    EXPORT_DURATION.labels(kind).observe(time.perf_counter() - started)
+    EXPORT_SIZE.labels(kind).observe(size)
+
+
+@event.listens_for(Session, "after_commit")
+def _count_committed(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending:
+        for name, amount in pending.items():
+            _COUNTERS[name].inc(amount)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
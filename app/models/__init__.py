@@ -1,8 +1,11 @@
 from app.models.user import User
 from app.models.location import Location
 from app.models.item import Item
+from app.models.category_stat import CategoryStat
 from app.models.assignment import Assignment
 from app.models.audit import Audit, AuditScan
-from app.models.disposal import Disposal, DisposalReason
+from app.models.disposal import Disposal, DisposalReason, DisposalYear
+from app.models.data_version import DataVersion
+from app.models.rate_limit import RateLimitHit
 
-__all__ = ["User", "Location", "Item", "Assignment", "Audit", "AuditScan", "Disposal", "DisposalReason"]
+__all__ = ["User", "Location", "Item", "CategoryStat", "Assignment", "Audit", "AuditScan", "Disposal", "DisposalReason", "DisposalYear", "DataVersion", "RateLimitHit"]
@@ -0,0 +1,17 @@
+from decimal import Decimal
+from sqlalchemy import String, Numeric, Integer
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+
+
+class CategoryStat(Base):
+    """Udržovaný souhrn aktivních položek po kategoriích (počet, pořizovací hodnota).
+
+    Položky bez kategorie jsou pod prázdným řetězcem.
+    """
+
+    __tablename__ = "category_stats"
+
+    category: Mapped[str] = mapped_column(String(128), primary_key=True)
+    item_count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
+    total_value: Mapped[Decimal] = mapped_column(Numeric(14, 2), default=0, nullable=False)
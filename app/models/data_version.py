@@ -0,0 +1,12 @@
+from sqlalchemy import String, BigInteger
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+
+
+class DataVersion(Base):
+    """Sdílené verze tabulek pro běh s více workery (viz app/data_versions.py)."""
+
+    __tablename__ = "data_versions"
+
+    table_name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
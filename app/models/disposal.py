@@ -1,6 +1,6 @@
 import enum
 from datetime import datetime, timezone
-from sqlalchemy import Integer, ForeignKey, String, DateTime, Enum as SAEnum
+from sqlalchemy import Integer, ForeignKey, String, DateTime, Index, Enum as SAEnum
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database import Base
 
@@ -19,6 +19,11 @@ class Disposal(Base):
 
     __tablename__ = "disposals"
 
+    __table_args__ = (
+        Index("ix_disposals_disposed_at", "disposed_at"),
+        Index("ix_disposals_reason_disposed_at", "reason", "disposed_at"),
+    )
+
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     item_id: Mapped[int] = mapped_column(ForeignKey("items.id"), nullable=False, index=True)
     reason: Mapped[str] = mapped_column(
@@ -36,3 +41,12 @@ class Disposal(Base):
 
     item: Mapped["Item"] = relationship(back_populates="disposals")
     disposed_by_user: Mapped["User | None"] = relationship(back_populates="disposals")
+
+
+class DisposalYear(Base):
+    """Udržovaný souhrn let, ve kterých existuje vyřazení (pro filtr v /vyrazeni)."""
+
+    __tablename__ = "disposal_years"
+
+    year: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=False)
+    count: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
@@ -1,12 +1,19 @@
 from datetime import datetime, timezone, date
 from decimal import Decimal
-from sqlalchemy import String, Boolean, DateTime, Date, Numeric
+from sqlalchemy import String, Boolean, DateTime, Date, Numeric, Index, event, exc
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database import Base
 
 
+# Sloupce fulltextového indexu (FTS5 na SQLite, FULLTEXT na MariaDB)
+FTS_COLUMNS = ("code", "name", "serial_number", "description", "category", "responsible_person")
+
+
 class Item(Base):
     __tablename__ = "items"
+    __table_args__ = (
+        Index("ft_items", *FTS_COLUMNS, mysql_prefix="FULLTEXT").ddl_if(dialect="mysql"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     code: Mapped[str] = mapped_column(String(64), unique=True, index=True, nullable=False)
@@ -36,3 +43,42 @@ class Item(Base):
     )
     audit_scans: Mapped[list["AuditScan"]] = relationship(back_populates="item")
     disposals: Mapped[list["Disposal"]] = relationship(back_populates="item")
+
+
+# --- SQLite FTS5 -------------------------------------------------------------
+# External-content tabulka nad items; triggery ji drží v synchronizaci i při
+# hromadných UPDATE/INSERT. remove_diacritics 2 → „zidle" najde „židle".
+
+_cols = ", ".join(FTS_COLUMNS)
+_new = ", ".join(f"new.{c}" for c in FTS_COLUMNS)
+_old = ", ".join(f"old.{c}" for c in FTS_COLUMNS)
+
+SQLITE_FTS_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS items_fts USING fts5({_cols}, content='items', "
+    f"content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER IF NOT EXISTS items_fts_ai AFTER INSERT ON items BEGIN "
+    f"INSERT INTO items_fts(rowid, {_cols}) VALUES (new.id, {_new}); END",
+    f"CREATE TRIGGER IF NOT EXISTS items_fts_ad AFTER DELETE ON items BEGIN "
+    f"INSERT INTO items_fts(items_fts, rowid, {_cols}) VALUES ('delete', old.id, {_old}); END",
+    f"CREATE TRIGGER IF NOT EXISTS items_fts_au AFTER UPDATE ON items BEGIN "
+    f"INSERT INTO items_fts(items_fts, rowid, {_cols}) VALUES ('delete', old.id, {_old}); "
+    f"INSERT INTO items_fts(rowid, {_cols}) VALUES (new.id, {_new}); END",
+)
+
+
+@event.listens_for(Item.__table__, "after_create")
+def _create_sqlite_fts(target, connection, **kw) -> None:
+    if connection.dialect.name != "sqlite":
+        return
+    try:
+        for statement in SQLITE_FTS_DDL:
+            connection.exec_driver_sql(statement)
+    except exc.OperationalError:
+        # SQLite bez FTS5 — vyhledávání spadne zpět na LIKE
+        pass
+
+
+@event.listens_for(Item.__table__, "before_drop")
+def _drop_sqlite_fts(target, connection, **kw) -> None:
+    if connection.dialect.name == "sqlite":
+        connection.exec_driver_sql("DROP TABLE IF EXISTS items_fts")
@@ -0,0 +1,14 @@
+from sqlalchemy import String, Integer, BigInteger
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+
+
+class RateLimitHit(Base):
+    """Počet pokusů klíče (např. IP) v časovém okně — sdílený limiter (viz app/rate_limit.py)."""
+
+    __tablename__ = "rate_limit_hits"
+
+    rate_key: Mapped[str] = mapped_column(String(128), primary_key=True)
+    # Pořadové číslo okna: int(unix_time // délka okna)
+    bucket: Mapped[int] = mapped_column(BigInteger, primary_key=True, index=True)
+    hits: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
@@ -0,0 +1,94 @@
+"""
+Omezení počtu pokusů (přihlášení) — klouzavé okno ze dvou čítačů.
+
+Pro každý klíč se drží jen počet v aktuálním a předchozím okně; odhad
+za posledních `window` sekund je prev * (zbývající podíl okna) + cur.
+Paměť je tedy konstantní na klíč bez ohledu na počet pokusů.
+
+MemoryRateLimiter — v procesu, nejvýš `max_keys` klíčů (nejdéle nepoužité
+se zahazují). S více workery platí limit v každém zvlášť.
+DatabaseRateLimiter — čítače v tabulce rate_limit_hits (atomické přičtení
+přes app.services.upsert), limit platí napříč workery. Zapisuje přes Core
+spojení, aby pokusy o přihlášení neposouvaly verze dat (app.data_versions).
+
+Zamítnuté pokusy se započítávají také — kdo zkouší dál, zůstane blokován.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import delete, select
+from sqlalchemy.engine import Engine
+
+from app.models.rate_limit import RateLimitHit
+import app.services.upsert as upsert
+
+
+def _estimate(previous: int, current: int, elapsed: float) -> float:
+    """Odhad počtu pokusů za poslední okno; `elapsed` = uplynulý podíl aktuálního okna."""
+    return previous * (1 - elapsed) + current
+
+
+class MemoryRateLimiter:
+    def __init__(self, limit: int, window: int, max_keys: int = 10_000) -> None:
+        self.limit = limit
+        self.window = window
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        # klíč → (okno, počet v předchozím okně, počet v aktuálním okně)
+        self._counters: OrderedDict[str, tuple[int, int, int]] = OrderedDict()
+
+    def hit(self, key: str) -> bool:
+        """Započítá pokus; False = limit překročen."""
+        now = time.time()
+        bucket, elapsed = divmod(now, self.window)
+        bucket = int(bucket)
+        with self._lock:
+            last_bucket, previous, current = self._counters.pop(key, (bucket, 0, 0))
+            if last_bucket == bucket - 1:
+                previous, current = current, 0
+            elif last_bucket < bucket - 1:
+                previous, current = 0, 0
+            current += 1
+            self._counters[key] = (bucket, previous, current)
+            while len(self._counters) > self.max_keys:
+                self._counters.popitem(last=False)
+        return _estimate(previous, current, elapsed / self.window) <= self.limit
+
+    def reset(self, key: str) -> None:
+        with self._lock:
+            self._counters.pop(key, None)
+
+
+class DatabaseRateLimiter:
+    def __init__(self, bind: Engine, limit: int, window: int) -> None:
+        self.bind = bind
+        self.limit = limit
+        self.window = window
+        self._pruned_bucket = 0
+
+    def hit(self, key: str) -> bool:
+        now = time.time()
+        bucket, elapsed = divmod(now, self.window)
+        bucket = int(bucket)
+        with self.bind.begin() as conn:
+            upsert.increment(conn, RateLimitHit, {"rate_key": key, "bucket": bucket}, {"hits": 1})
+            counts = dict(conn.execute(
+                select(RateLimitHit.bucket, RateLimitHit.hits)
+                .where(RateLimitHit.rate_key == key, RateLimitHit.bucket >= bucket - 1)
+            ).all())
+            if bucket > self._pruned_bucket:
+                # Starší okna už do odhadu nevstupují — tabulka drží jen aktivní klíče
+                conn.execute(delete(RateLimitHit).where(RateLimitHit.bucket < bucket - 1))
+                self._pruned_bucket = bucket
+        return _estimate(counts.get(bucket - 1, 0), counts.get(bucket, 0), elapsed / self.window) <= self.limit
+
+    def reset(self, key: str) -> None:
+        with self.bind.begin() as conn:
+            conn.execute(delete(RateLimitHit).where(RateLimitHit.rate_key == key))
+
+
+def make_limiter(backend: str, bind: Engine, limit: int, window: int):
+    if backend == "database":
+        return DatabaseRateLimiter(bind, limit, window)
+    return MemoryRateLimiter(limit, window)
@@ -0,0 +1,113 @@
+"""
+Statistiky jednoho požadavku — SQL dotazy a vykreslování šablon.
+
+Middleware (app.metrics.MetricsMiddleware) založí `RequestStats` v ContextVar;
+ta se propaguje do threadpoolu i do greenletů async session, takže cursor
+události SQLAlchemy a vykreslení šablony (TimedTemplate) se připíší ke
+správnému požadavku. Z nich vzniká:
+  - hlavička Server-Timing (SERVER_TIMING) — čas a počet SQL, šablony, celkem
+    do odeslání hlaviček; v DevTools prohlížeče na záložce Timing
+  - JSON řádek v logu „app.slow_requests" pro požadavky delší než
+    SLOW_REQUEST_MS, s SLOW_REQUEST_TOP_SQL nejpomalejšími dotazy (bez
+    parametrů — mohou obsahovat osobní údaje)
+
+Líné načtení v šabloně se započítá do SQL i do šablony.
+"""
+import heapq
+import json
+import logging
+import time
+from contextvars import ContextVar
+from itertools import count
+
+import jinja2
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+
+logger = logging.getLogger("app.slow_requests")
+
+_QUERY_START_KEY = "_request_stats_query_start"
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_time", "render_time", "slowest", "_order")
+
+    def __init__(self) -> None:
+        self.queries = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+        # min-halda (čas, pořadí, SQL) — drží jen SLOW_REQUEST_TOP_SQL nejpomalejších
+        self.slowest: list[tuple[float, int, str]] = []
+        self._order = count()
+
+    def add_query(self, statement: str, elapsed: float) -> None:
+        self.queries += 1
+        self.db_time += elapsed
+        entry = (elapsed, next(self._order), statement)
+        if len(self.slowest) < settings.SLOW_REQUEST_TOP_SQL:
+            heapq.heappush(self.slowest, entry)
+        elif self.slowest and elapsed > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    def server_timing(self, total: float) -> str:
+        return (
+            f'db;desc="{self.queries} SQL";dur={self.db_time * 1000:.1f}, '
+            f"tpl;dur={self.render_time * 1000:.1f}, "
+            f"total;dur={total * 1000:.1f}"
+        )
+
+    def log_if_slow(self, method: str, path: str, route: str, status: int, total: float) -> None:
+        if not settings.SLOW_REQUEST_MS or total * 1000 < settings.SLOW_REQUEST_MS:
+            return
+        logger.warning(json.dumps({
+            "event": "slow_request",
+            "method": method,
+            "path": path,
+            "route": route,
+            "status": status,
+            "total_ms": round(total * 1000, 1),
+            "db_ms": round(self.db_time * 1000, 1),
+            "queries": self.queries,
+            "template_ms": round(self.render_time * 1000, 1),
+            "slowest_sql": [
+                {"ms": round(elapsed * 1000, 1), "sql": " ".join(statement.split())}
+                for elapsed, _, statement in sorted(self.slowest, reverse=True)
+            ],
+        }, ensure_ascii=False))
+
+
+current: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if current.get() is not None:
+        conn.info[_QUERY_START_KEY] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    stats = current.get()
+    start = conn.info.pop(_QUERY_START_KEY, None)
+    if stats is not None and start is not None:
+        stats.add_query(statement, time.perf_counter() - start)
+
+
+class TimedTemplate(jinja2.Template):
+    """Šablona, která si čas vykreslení připíše k aktuálnímu požadavku."""
+
+    def render(self, *args, **kwargs) -> str:
+        stats = current.get()
+        if stats is None:
+            return super().render(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return super().render(*args, **kwargs)
+        finally:
+            stats.render_time += time.perf_counter() - start
+
+
+def time_templates(env: jinja2.Environment) -> None:
+    env.template_class = TimedTemplate
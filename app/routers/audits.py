@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, Query, Request
 from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db, get_async_db, get_read_db
 from app.schemas.audit import AuditCreate, AuditScanRequest, AuditScanResponse, AuditResponse
 from app.schemas.pagination import Page
 from app.routers.auth_ui import require_session_user, require_session_manager
+from app.write_queue import write_queue
 import app.services.audit_service as svc
 
 router = APIRouter(prefix="/api/audits", tags=["audits"])
@@ -13,10 +15,12 @@ router = APIRouter(prefix="/api/audits", tags=["audits"])
 def list_audits(
     page: int = Query(1, ge=1),
     size: int = Query(50, ge=1, le=200),
+    after: str | None = Query(None, description="Kurzor další stránky (next_cursor) — keyset stránkování"),
+    with_total: bool = Query(True, description="false = bez celkového počtu, jen has_more"),
     db: Session = Depends(get_db),
     _=Depends(require_session_user),
 ):
-    return svc.get_audits(db, page=page, size=size)
+    return svc.get_audits(db, page=page, size=size, after=after, with_total=with_total)
 
 
 @router.post("", response_model=AuditResponse, status_code=201)
@@ -31,9 +35,14 @@ def get_audit(audit_id: int, db: Session = Depends(get_db), _=Depends(require_se
 
 
 @router.post("/{audit_id}/scan", response_model=AuditScanResponse)
-def scan_item(request: Request, audit_id: int, data: AuditScanRequest, db: Session = Depends(get_db), _=Depends(require_session_user)):
+async def scan_item(
+    request: Request, audit_id: int, data: AuditScanRequest,
+    db: AsyncSession = Depends(get_async_db), _=Depends(require_session_user),
+):
     user_id = request.session.get("user_id")
-    return svc.scan_item(db, audit_id, data, user_id=user_id)
+    if write_queue.running:
+        return await write_queue.run(svc.apply_scan, audit_id, data, user_id=user_id)
+    return await svc.scan_item_async(db, audit_id, data, user_id=user_id)
 
 
 @router.post("/{audit_id}/close", response_model=AuditResponse)
@@ -43,7 +52,7 @@ def close_audit(request: Request, audit_id: int, db: Session = Depends(get_db),
 
 
 @router.get("/{audit_id}/report")
-def audit_report(audit_id: int, db: Session = Depends(get_db), _=Depends(require_session_user)):
+def audit_report(audit_id: int, db: Session = Depends(get_read_db), _=Depends(require_session_user)):
     report = svc.get_audit_report(db, audit_id)
     return {
         "audit_id": audit_id,
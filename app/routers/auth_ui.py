@@ -1,14 +1,14 @@
 import logging
 import secrets
-import time
-from collections import defaultdict
 from fastapi import APIRouter, Depends, HTTPException, Request, Form
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 
-from app.database import get_db
+from app.config import settings
+from app.database import engine, get_db
 from app.models.user import User
+from app.rate_limit import make_limiter
 from app.services.user_service import verify_password, get_user_by_username
 
 logger = logging.getLogger(__name__)
@@ -18,24 +18,20 @@ templates = Jinja2Templates(directory="app/templates")
 
 MANAGER_ROLES = {"spravce", "admin"}
 
-# ── Rate limiting (in-memory, per IP) ──────────────────────────────────────
-_login_attempts: dict[str, list[float]] = defaultdict(list)
+# ── Rate limiting (per IP) ─────────────────────────────────────────────────
+# RATE_LIMIT_BACKEND=database — limit sdílený všemi workery (tabulka rate_limit_hits)
 _RATE_LIMIT_WINDOW = 60   # seconds
 _RATE_LIMIT_MAX = 10      # max attempts per window
+login_limiter = make_limiter(settings.RATE_LIMIT_BACKEND, engine, _RATE_LIMIT_MAX, _RATE_LIMIT_WINDOW)
 
 
 def _check_rate_limit(ip: str) -> bool:
-    now = time.time()
-    _login_attempts[ip] = [t for t in _login_attempts[ip] if now - t < _RATE_LIMIT_WINDOW]
-    if len(_login_attempts[ip]) >= _RATE_LIMIT_MAX:
-        return False
-    _login_attempts[ip].append(now)
-    return True
+    return login_limiter.hit(f"login:{ip}")
 
 
 def _reset_rate_limit(ip: str) -> None:
     """Clear failed attempts after successful login."""
-    _login_attempts.pop(ip, None)
+    login_limiter.reset(f"login:{ip}")
 
 
 # ── CSRF ───────────────────────────────────────────────────────────────────
@@ -83,13 +79,13 @@ def require_admin(user: User = Depends(require_user)) -> User:
     return user
 
 
-def require_session_user(request: Request) -> None:
+async def require_session_user(request: Request) -> None:
     """Light session-only check — any authenticated user."""
     if not request.session.get("user_id"):
         raise HTTPException(status_code=401, detail="Přihlášení vyžadováno")
 
 
-def require_session_manager(request: Request) -> None:
+async def require_session_manager(request: Request) -> None:
     """Light session-only check for API mutation routes."""
     if not request.session.get("user_id"):
         raise HTTPException(status_code=401, detail="Přihlášení vyžadováno")
@@ -98,7 +94,7 @@ def require_session_manager(request: Request) -> None:
         raise HTTPException(status_code=403, detail="Nedostatečná oprávnění")
 
 
-def require_session_admin(request: Request) -> None:
+async def require_session_admin(request: Request) -> None:
     """Light session-only check — admin only."""
     if not request.session.get("user_id"):
         raise HTTPException(status_code=401, detail="Přihlášení vyžadováno")
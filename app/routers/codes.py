@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.schemas.code import CodeSuggestion
+from app.services.code_index import code_index
+
+router = APIRouter(prefix="/api/codes", tags=["codes"])
+
+
+@router.get("/suggest", response_model=list[CodeSuggestion])
+def suggest_codes(
+    prefix: str = Query(..., min_length=1, max_length=64),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+):
+    """Našeptávání kódů položek a lokací podle začátku kódu (bez ohledu na velikost písmen)."""
+    return code_index.suggest(db, prefix.strip(), limit)
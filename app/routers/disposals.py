@@ -15,7 +15,9 @@ def list_disposals(
     size: int = Query(50, ge=1, le=200),
     year: int | None = Query(None, description="Filtrovat dle roku vyřazení"),
     reason: str | None = Query(None, description="Filtrovat dle důvodu (liquidation, sale, ...)"),
+    after: str | None = Query(None, description="Kurzor další stránky (next_cursor) — keyset stránkování"),
+    with_total: bool = Query(True, description="false = bez celkového počtu, jen has_more"),
     db: Session = Depends(get_db),
     _=Depends(require_session_user),
 ):
-    return svc.get_disposals(db, page=page, size=size, year=year, reason=reason)
+    return svc.get_disposals(db, page=page, size=size, year=year, reason=reason, after=after, with_total=with_total)
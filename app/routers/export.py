@@ -1,7 +1,10 @@
+import time
+
 from fastapi import APIRouter, Depends
 from fastapi.responses import Response
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app import metrics
+from app.database import get_read_db
 import app.services.export_service as svc
 import app.services.import_service as import_svc
 
@@ -9,8 +12,10 @@ router = APIRouter(prefix="/api", tags=["export"])
 
 
 @router.get("/export/excel")
-def export_excel(db: Session = Depends(get_db)):
+def export_excel(db: Session = Depends(get_read_db)):
+    started = time.perf_counter()
     xlsx_bytes = svc.export_items_excel(db)
+    metrics.observe_export("items_xlsx", started, len(xlsx_bytes))
     return Response(
         content=xlsx_bytes,
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
@@ -19,8 +24,10 @@ def export_excel(db: Session = Depends(get_db)):
 
 
 @router.get("/export/pdf/{audit_id}")
-def export_audit_pdf(audit_id: int, db: Session = Depends(get_db)):
+def export_audit_pdf(audit_id: int, db: Session = Depends(get_read_db)):
+    started = time.perf_counter()
     pdf_bytes = svc.export_audit_pdf(db, audit_id)
+    metrics.observe_export("audit_pdf", started, len(pdf_bytes))
     return Response(
         content=pdf_bytes,
         media_type="application/pdf",
@@ -29,8 +36,10 @@ def export_audit_pdf(audit_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/export/excel/disposals")
-def export_disposals_excel(db: Session = Depends(get_db)):
+def export_disposals_excel(db: Session = Depends(get_read_db)):
+    started = time.perf_counter()
     xlsx_bytes = svc.export_disposals_excel(db)
+    metrics.observe_export("disposals_xlsx", started, len(xlsx_bytes))
     return Response(
         content=xlsx_bytes,
         media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
@@ -39,8 +48,10 @@ def export_disposals_excel(db: Session = Depends(get_db)):
 
 
 @router.get("/export/pdf/disposal/{disposal_id}")
-def export_disposal_pdf(disposal_id: int, db: Session = Depends(get_db)):
+def export_disposal_pdf(disposal_id: int, db: Session = Depends(get_read_db)):
+    started = time.perf_counter()
     pdf_bytes = svc.export_disposal_pdf(db, disposal_id)
+    metrics.observe_export("disposal_pdf", started, len(pdf_bytes))
     return Response(
         content=pdf_bytes,
         media_type="application/pdf",
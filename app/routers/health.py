@@ -1,4 +1,10 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from fastapi.responses import Response
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app import metrics
+from app.database import get_db, pool_stats
 
 router = APIRouter()
 
@@ -6,3 +12,24 @@ router = APIRouter()
 @router.get("/health")
 def health_check():
     return {"status": "ok"}
+
+
+@router.get("/health/db")
+def health_db(db: Session = Depends(get_db)):
+    """Stav DB: dialekt, pool spojení a u SQLite aktivní journal mode."""
+    bind = db.get_bind()
+    db.execute(text("SELECT 1"))
+    result = {"status": "ok", "dialect": bind.dialect.name, "pool": pool_stats(bind)}
+    if bind.dialect.name == "sqlite":
+        result["journal_mode"] = db.scalar(text("PRAGMA journal_mode"))
+    return result
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics_endpoint():
+    """Metriky pro Prometheus — zpřístupnit jen interní síti (viz README).
+
+    Sync — při více workerech čte a slučuje soubory všech procesů, to patří
+    do threadpoolu, ne do event loopu."""
+    body, content_type = metrics.render()
+    return Response(body, media_type=content_type)
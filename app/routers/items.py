@@ -1,26 +1,41 @@
-from fastapi import APIRouter, Depends, Query, Request
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.schemas.item import ItemCreate, ItemUpdate, ItemResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db, get_async_db
+from app.schemas.item import ItemCreate, ItemUpdate, ItemResponse, ItemFacets
 from app.schemas.assignment import AssignmentResponse
 from app.schemas.disposal import DisposalRequest, DisposalResponse, BulkDisposeRequest, BulkDisposeResponse
 from app.schemas.pagination import Page
 from fastapi import HTTPException
 from app.routers.auth_ui import require_session_manager
+from app import http_cache, fast_json
 import app.services.item_service as svc
 import app.services.disposal_service as disposal_svc
+import app.services.category_service as category_svc
 
 router = APIRouter(prefix="/api/items", tags=["items"])
 
 
 @router.get("", response_model=Page[ItemResponse])
 def list_items(
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1),
     size: int = Query(50, ge=1, le=200),
     search: str = Query(""),
+    after: str | None = Query(None, description="Kurzor další stránky (next_cursor) — keyset stránkování"),
+    with_total: bool = Query(True, description="false = bez celkového počtu, jen has_more"),
+    fast: bool = Query(False, description="Rychlá serializace (Core řádky → orjson), stejný výstup"),
     db: Session = Depends(get_db),
 ):
-    return svc.get_items(db, page=page, size=size, search=search)
+    etag = http_cache.versions_etag(db, ("items",), request.url.query)
+    if cached := http_cache.not_modified(request, response, etag):
+        return cached
+    result = svc.get_items(db, page=page, size=size, search=search, after=after, with_total=with_total, as_rows=fast)
+    if fast:
+        # Položky jsou už slovníky z Core řádků — bez validace přes response_model
+        return fast_json.page_response(result, response)
+    return result
 
 
 @router.post("", response_model=ItemResponse, status_code=201)
@@ -28,9 +43,20 @@ def create_item(data: ItemCreate, db: Session = Depends(get_db), _=Depends(requi
     return svc.create_item(db, data)
 
 
+@router.get("/facets", response_model=ItemFacets)
+def item_facets(db: Session = Depends(get_db)):
+    """Počty a pořizovací hodnota aktivních položek po kategoriích (z udržovaného souhrnu)."""
+    return {
+        "categories": [
+            {"category": s.category or None, "count": s.item_count, "total_value": s.total_value}
+            for s in category_svc.get_category_stats(db)
+        ]
+    }
+
+
 @router.get("/by-code/{code}", response_model=ItemResponse)
-def get_item_by_code(code: str, db: Session = Depends(get_db)):
-    item = svc.get_item_by_code(db, code)
+async def get_item_by_code(code: str, db: AsyncSession = Depends(get_async_db)):
+    item = await svc.get_item_by_code_async(db, code)
     if not item:
         raise HTTPException(status_code=404, detail="Položka nenalezena")
     return item
@@ -42,8 +68,12 @@ def bulk_dispose(data: BulkDisposeRequest, db: Session = Depends(get_db), _=Depe
 
 
 @router.get("/{item_id}", response_model=ItemResponse)
-def get_item(item_id: int, db: Session = Depends(get_db)):
-    return svc.get_item(db, item_id)
+async def get_item(item_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    item = await svc.get_item_async(db, item_id)
+    etag = http_cache.make_etag("item", item.id, item.updated_at.isoformat())
+    if cached := http_cache.not_modified(request, response, etag, item.updated_at):
+        return cached
+    return item
 
 
 @router.put("/{item_id}", response_model=ItemResponse)
@@ -57,7 +87,12 @@ def delete_item(item_id: int, db: Session = Depends(get_db), _=Depends(require_s
 
 
 @router.get("/{item_id}/history", response_model=list[AssignmentResponse])
-def item_history(item_id: int, db: Session = Depends(get_db)):
+def item_history(item_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    svc.get_item(db, item_id)
+    # Přesuny se jen přidávají — počet a max id stačí jako validátor
+    etag = http_cache.make_etag("history", item_id, *svc.get_item_history_stamp(db, item_id))
+    if cached := http_cache.not_modified(request, response, etag):
+        return cached
     return svc.get_item_history(db, item_id)
 
 
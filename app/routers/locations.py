@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.schemas.location import LocationCreate, LocationUpdate, LocationResponse
 from app.schemas.item import ItemResponse
 from app.schemas.pagination import Page
 from app.routers.auth_ui import require_session_manager
+from app import http_cache, fast_json
 import app.services.location_service as svc
 
 router = APIRouter(prefix="/api/locations", tags=["locations"])
@@ -12,11 +13,23 @@ router = APIRouter(prefix="/api/locations", tags=["locations"])
 
 @router.get("", response_model=Page[LocationResponse])
 def list_locations(
+    request: Request,
+    response: Response,
     page: int = Query(1, ge=1),
     size: int = Query(50, ge=1, le=200),
+    after: str | None = Query(None, description="Kurzor další stránky (next_cursor) — keyset stránkování"),
+    with_total: bool = Query(True, description="false = bez celkového počtu, jen has_more"),
+    fast: bool = Query(False, description="Rychlá serializace (Core řádky → orjson), stejný výstup"),
     db: Session = Depends(get_db),
 ):
-    return svc.get_locations(db, page=page, size=size)
+    etag = http_cache.versions_etag(db, ("locations",), request.url.query)
+    if cached := http_cache.not_modified(request, response, etag):
+        return cached
+    result = svc.get_locations(db, page=page, size=size, after=after, with_total=with_total, as_rows=fast)
+    if fast:
+        # Položky jsou už slovníky z Core řádků — bez validace přes response_model
+        return fast_json.page_response(result, response)
+    return result
 
 
 @router.post("", response_model=LocationResponse, status_code=201)
@@ -25,8 +38,12 @@ def create_location(data: LocationCreate, db: Session = Depends(get_db), _=Depen
 
 
 @router.get("/{loc_id}", response_model=LocationResponse)
-def get_location(loc_id: int, db: Session = Depends(get_db)):
-    return svc.get_location(db, loc_id)
+def get_location(loc_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    loc = svc.get_location(db, loc_id)
+    etag = http_cache.make_etag("location", loc.id, loc.updated_at.isoformat())
+    if cached := http_cache.not_modified(request, response, etag, loc.updated_at):
+        return cached
+    return loc
 
 
 @router.put("/{loc_id}", response_model=LocationResponse)
@@ -40,5 +57,8 @@ def delete_location(loc_id: int, db: Session = Depends(get_db), _=Depends(requir
 
 
 @router.get("/{loc_id}/items", response_model=list[ItemResponse])
-def items_at_location(loc_id: int, db: Session = Depends(get_db)):
+def items_at_location(loc_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    etag = http_cache.versions_etag(db, ("items", "assignments", "locations"), loc_id)
+    if cached := http_cache.not_modified(request, response, etag):
+        return cached
     return svc.get_items_at_location(db, loc_id)
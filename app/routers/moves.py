@@ -1,25 +1,39 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.schemas.assignment import MoveRequest, AssignmentResponse, BulkMoveRequest, BulkMoveResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db, get_async_db
+from app.schemas.assignment import (
+    MoveRequest, AssignmentResponse, BulkMoveRequest, BulkMoveResponse, BatchMoveRequest, BatchMoveResponse,
+)
 from app.routers.auth_ui import require_session_manager
+from app.write_queue import write_queue
 import app.services.move_service as svc
 
 router = APIRouter(prefix="/api/moves", tags=["moves"])
 
 
 @router.post("", response_model=AssignmentResponse, status_code=201)
-def move_item(data: MoveRequest, db: Session = Depends(get_db), _=Depends(require_session_manager)):
-    return svc.move_item(db, data)
+async def move_item(data: MoveRequest, db: AsyncSession = Depends(get_async_db), _=Depends(require_session_manager)):
+    if write_queue.running:
+        return await write_queue.run(svc.apply_move, data)
+    return await svc.move_item_async(db, data)
 
 
 @router.post("/bulk", response_model=BulkMoveResponse, status_code=200)
-def bulk_move(data: BulkMoveRequest, db: Session = Depends(get_db), _=Depends(require_session_manager)):
-    count = svc.bulk_move_items(db, data.from_location_id, data.to_location_id, data.note)
+def bulk_move(request: Request, data: BulkMoveRequest, db: Session = Depends(get_db), _=Depends(require_session_manager)):
+    user_id = request.session.get("user_id")
+    count = svc.bulk_move_items(db, data.from_location_id, data.to_location_id, data.note, user_id=user_id)
     return BulkMoveResponse(moved=count)
 
 
+@router.post("/batch", response_model=BatchMoveResponse, status_code=200)
+def batch_move(request: Request, data: BatchMoveRequest, db: Session = Depends(get_db), _=Depends(require_session_manager)):
+    user_id = request.session.get("user_id")
+    return svc.batch_move_items(db, data, user_id=user_id)
+
+
 @router.post("/assign-unlocated/{loc_id}", response_model=BulkMoveResponse, status_code=200)
-def assign_unlocated(loc_id: int, db: Session = Depends(get_db), _=Depends(require_session_manager)):
-    count = svc.assign_unlocated_items(db, loc_id)
+def assign_unlocated(request: Request, loc_id: int, db: Session = Depends(get_db), _=Depends(require_session_manager)):
+    user_id = request.session.get("user_id")
+    count = svc.assign_unlocated_items(db, loc_id, user_id=user_id)
     return BulkMoveResponse(moved=count)
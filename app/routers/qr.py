@@ -1,22 +1,51 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
 from fastapi.responses import Response
 from sqlalchemy.orm import Session
 from app.database import get_db
+from app import http_cache
 import app.services.qr_service as svc
 
 router = APIRouter(prefix="/api/qr", tags=["qr"])
 
 
+def _qr_response(request: Request, url: str, version: str | None) -> Response:
+    """PNG odpověď s ETagem z obsahu QR — 304 ještě před generováním obrázku.
+
+    S ?v= odpovídajícím otisku zakódované adresy (svc.qr_version) je URL
+    obsahově adresovaná a smí se cachovat natrvalo — změna kódu i BASE_URL
+    změní otisk, a tedy i URL v šablonách.
+    """
+    response = Response(media_type="image/png")
+    immutable = version is not None and version == svc.qr_version(url)
+    cached = http_cache.not_modified(
+        request, response, http_cache.make_etag("qr", url),
+        cache_control=http_cache.IMMUTABLE if immutable else http_cache.REVALIDATE,
+    )
+    if cached:
+        return cached
+    response.body = svc.qr_png(url)
+    response.headers["Content-Length"] = str(len(response.body))
+    return response
+
+
 @router.get("/item/{item_id}")
-def qr_item(item_id: int, db: Session = Depends(get_db)):
-    png_bytes = svc.generate_item_qr(db, item_id)
-    return Response(content=png_bytes, media_type="image/png")
+def qr_item(
+    item_id: int,
+    request: Request,
+    v: str | None = Query(None, description="Otisk zakódované adresy (qr_version) — zapne trvalé cachování"),
+    db: Session = Depends(get_db),
+):
+    return _qr_response(request, svc.item_qr_url(db, item_id), v)
 
 
 @router.get("/location/{loc_id}")
-def qr_location(loc_id: int, db: Session = Depends(get_db)):
-    png_bytes = svc.generate_location_qr(db, loc_id)
-    return Response(content=png_bytes, media_type="image/png")
+def qr_location(
+    loc_id: int,
+    request: Request,
+    v: str | None = Query(None, description="Otisk zakódované adresy (qr_version) — zapne trvalé cachování"),
+    db: Session = Depends(get_db),
+):
+    return _qr_response(request, svc.location_qr_url(db, loc_id), v)
 
 
 @router.get("/batch")
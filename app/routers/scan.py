@@ -1,20 +1,23 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
-from app.database import get_db
+from app.database import get_db, get_async_db
 from app.models.item import Item
 from app.models.location import Location
 from app.models.audit import Audit, AuditScan
 from app.models.assignment import Assignment
 from app.config import settings
+from app.services.code_index import code_index
 from app.routers.auth_ui import require_user, require_session_user
+from app.routers.ui import templates
 
 router = APIRouter(tags=["scan"])
 
 
 @router.get("/scan/{code}")
-def scan_redirect(code: str, db: Session = Depends(get_db), _=Depends(require_user)):
+def scan_redirect(request: Request, code: str, db: Session = Depends(get_db), _=Depends(require_user)):
     # 1. Zkus položku
     item = db.scalar(select(Item).where(Item.code == code, Item.is_active == True))
     if item:
@@ -28,24 +31,31 @@ def scan_redirect(code: str, db: Session = Depends(get_db), _=Depends(require_us
     if loc:
         return RedirectResponse(url=f"{settings.BASE_URL}/lokace/{loc.id}")
 
-    # 3. Neznámý kód → home
-    return RedirectResponse(url=f"{settings.BASE_URL}/")
+    # 3. Neznámý kód → nabídni kódy o jeden překlep vedle
+    return templates.TemplateResponse("scan/unknown.html", {
+        "request": request,
+        "code": code,
+        "candidates": code_index.nearest(db, code),
+    }, status_code=404)
 
 
 @router.get("/api/scan/resolve/{code}")
-def resolve_code(code: str, db: Session = Depends(get_db), _=Depends(require_session_user)):
-    """JSON endpoint — vrátí info o kódu bez redirectu. Používá scan stránka."""
+async def resolve_code(code: str, db: AsyncSession = Depends(get_async_db), _=Depends(require_session_user)):
+    """JSON endpoint — vrátí info o kódu bez redirectu. Používá scan stránka.
+
+    Async — stovky čteček mohou čekat na DB bez obsazení vláken threadpoolu.
+    """
 
     # Zkus aktivní položku
-    item = db.scalar(select(Item).where(Item.code == code))
+    item = await db.scalar(select(Item).where(Item.code == code))
     if item:
-        active_audit = db.scalar(select(Audit).where(Audit.status == "open").limit(1))
+        active_audit = await db.scalar(select(Audit).where(Audit.status == "open").limit(1))
         audit_id = None
         audit_status = None
         if active_audit:
             audit_id = active_audit.id
-            existing = db.scalar(
-                select(AuditScan).where(
+            existing = await db.scalar(
+                select(AuditScan.id).where(
                     AuditScan.audit_id == active_audit.id,
                     AuditScan.item_id == item.id,
                 )
@@ -53,16 +63,16 @@ def resolve_code(code: str, db: Session = Depends(get_db), _=Depends(require_ses
             audit_status = "scanned" if existing else "not_scanned"
 
         # Aktuální lokace
-        current = db.scalar(
-            select(Assignment)
+        current_location_id = await db.scalar(
+            select(Assignment.location_id)
             .where(Assignment.item_id == item.id)
             .order_by(Assignment.assigned_at.desc())
             .limit(1)
         )
         loc_name = None
         loc_id = None
-        if current:
-            loc = db.get(Location, current.location_id)
+        if current_location_id:
+            loc = await db.get(Location, current_location_id)
             if loc:
                 loc_name = loc.name
                 loc_id = loc.id
@@ -81,7 +91,7 @@ def resolve_code(code: str, db: Session = Depends(get_db), _=Depends(require_ses
         }
 
     # Zkus lokaci
-    loc = db.scalar(select(Location).where(Location.code == code, Location.is_active == True))
+    loc = await db.scalar(select(Location).where(Location.code == code, Location.is_active == True))
     if loc:
         return {
             "type": "location",
@@ -92,4 +102,6 @@ def resolve_code(code: str, db: Session = Depends(get_db), _=Depends(require_ses
             "floor": loc.floor,
         }
 
-    return {"type": "unknown", "code": code}
+    # Neznámý kód — nabídni kódy o jeden překlep vedle (O/0, vynechaný znak…)
+    candidates = await db.run_sync(code_index.nearest, code)
+    return {"type": "unknown", "code": code, "candidates": candidates}
@@ -1,10 +1,10 @@
-from fastapi import APIRouter, Depends, Request, Query, UploadFile, File
+from fastapi import APIRouter, Depends, Request, Query, UploadFile, File, Form
 from app.routers.auth_ui import require_user, require_manager, verify_csrf
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from sqlalchemy import select, func, extract
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.item import Item
 from app.models.location import Location
 from app.models.assignment import Assignment
@@ -15,6 +15,8 @@ import app.services.location_service as loc_svc
 import app.services.audit_service as audit_svc
 import app.services.disposal_service as disposal_svc
 import app.services.import_service as import_svc
+import app.services.move_service as move_svc
+import app.services.category_service as category_svc
 from app.config import settings
 from datetime import datetime, timezone
 
@@ -41,7 +43,7 @@ def _get_active_audit(db: Session):
 
 
 @router.get("/", response_class=HTMLResponse)
-def dashboard(request: Request, db: Session = Depends(get_db)):
+def dashboard(request: Request, db: Session = Depends(get_read_db)):
     total_items = db.scalar(select(func.count()).select_from(Item).where(Item.is_active == True))
     total_locations = db.scalar(select(func.count()).select_from(Location).where(Location.is_active == True))
     open_audits = db.scalar(select(func.count()).select_from(Audit).where(Audit.status == "open"))
@@ -128,6 +130,7 @@ def dashboard(request: Request, db: Session = Depends(get_db)):
 
     return templates.TemplateResponse("dashboard.html", {
         "request": request,
+        "category_stats": category_svc.get_category_stats(db),
         "total_items": total_items,
         "total_locations": total_locations,
         "open_audits": open_audits,
@@ -154,10 +157,8 @@ def items_list(request: Request, page: int = 1, search: str = "", category: str
         items.append(item)
     result.items = items
 
-    # Get unique categories
-    categories = db.scalars(
-        select(Item.category).where(Item.is_active == True, Item.category != None).distinct()
-    ).all()
+    # Kategorie pro filtr z udržovaného souhrnu (s počty položek)
+    category_stats = [s for s in category_svc.get_category_stats(db) if s.category]
 
     locations = db.scalars(select(Location).where(Location.is_active == True).order_by(Location.building, Location.name)).all()
 
@@ -168,14 +169,18 @@ def items_list(request: Request, page: int = 1, search: str = "", category: str
         "search": search,
         "selected_category": category,
         "selected_location": location_id,
-        "categories": sorted([c for c in categories if c]),
+        "category_stats": category_stats,
         "locations": locations,
     })
 
 
 @router.get("/majetek/search", response_class=HTMLResponse)
 def items_search(request: Request, search: str = "", category: str = "", location_id: int = 0, db: Session = Depends(get_db)):
-    result = item_svc.get_items(db, page=1, size=50, search=search, category=category, location_id=location_id if location_id != 0 else None)
+    # Volá se při každém stisku klávesy a řádky počet nezobrazují — bez COUNT(*)
+    result = item_svc.get_items(
+        db, page=1, size=50, search=search, category=category,
+        location_id=location_id if location_id != 0 else None, with_total=False,
+    )
     items = []
     for item in result.items:
         assignment = item_svc.get_current_location(db, item.id)
@@ -262,25 +267,7 @@ def location_detail(loc_id: int, request: Request, db: Session = Depends(get_db)
     all_locations = db.scalars(select(Location).order_by(Location.is_active.desc(), Location.building, Location.name)).all()
 
     # Počet položek bez viditelné lokace (bez assignment NEBO s assignment → neaktivní lokaci)
-    assigned_subq = select(Assignment.item_id).distinct().subquery()
-    no_assign_count = db.scalar(
-        select(func.count(Item.id))
-        .where(Item.is_active == True)
-        .where(~Item.id.in_(select(assigned_subq.c.item_id)))
-    ) or 0
-    # Položky s assignment → neaktivní lokaci
-    active_loc_subq = select(Location.id).where(Location.is_active == True).subquery()
-    latest_subq = (
-        select(Assignment.item_id, func.max(Assignment.assigned_at).label("max_at"))
-        .group_by(Assignment.item_id).subquery()
-    )
-    orphan_count = db.scalar(
-        select(func.count(Assignment.item_id.distinct()))
-        .join(latest_subq, (Assignment.item_id == latest_subq.c.item_id) &
-              (Assignment.assigned_at == latest_subq.c.max_at))
-        .where(~Assignment.location_id.in_(select(active_loc_subq.c.id)))
-    ) or 0
-    unlocated_count = no_assign_count + orphan_count
+    unlocated_count = move_svc.count_unlocated_items(db)
 
     return templates.TemplateResponse("locations/detail.html", {
         "request": request,
@@ -308,7 +295,7 @@ def audits_list(request: Request, db: Session = Depends(get_db)):
 
 
 @router.get("/inventury/{audit_id}", response_class=HTMLResponse)
-def audit_detail(audit_id: int, request: Request, db: Session = Depends(get_db)):
+def audit_detail(audit_id: int, request: Request, db: Session = Depends(get_read_db)):
     audit = audit_svc.get_audit(db, audit_id)
     report = audit_svc.get_audit_report(db, audit_id)
     return templates.TemplateResponse("audits/detail.html", {
@@ -319,7 +306,7 @@ def audit_detail(audit_id: int, request: Request, db: Session = Depends(get_db))
 
 
 @router.get("/inventury/{audit_id}/progress", response_class=HTMLResponse)
-def audit_progress(audit_id: int, request: Request, db: Session = Depends(get_db)):
+def audit_progress(audit_id: int, request: Request, db: Session = Depends(get_read_db)):
     audit = audit_svc.get_audit(db, audit_id)
     report = audit_svc.get_audit_report(db, audit_id)
     return templates.TemplateResponse("partials/audit_progress.html", {
@@ -379,7 +366,7 @@ def import_page(request: Request, db: Session = Depends(get_db), _=Depends(requi
 
 
 @router.post("/import", response_class=HTMLResponse)
-async def import_items(request: Request, file: UploadFile = File(...), db: Session = Depends(get_db), _=Depends(require_manager)):
+def import_items(request: Request, file: UploadFile = File(...), mode: str = Form("insert"), db: Session = Depends(get_db), _=Depends(require_manager)):
     locations = db.scalars(select(Location).where(Location.is_active == True).order_by(Location.code)).all()
 
     if not file.filename or not file.filename.lower().endswith((".xlsx", ".xlsm")):
@@ -404,7 +391,8 @@ async def import_items(request: Request, file: UploadFile = File(...), db: Sessi
             "request": request, "result": result, "locations": locations,
         })
 
-    file_data = await file.read()
+    # Sync endpoint (threadpool) — parsování a upsert až 50 000 řádků nesmí blokovat event loop
+    file_data = file.file.read()
     if len(file_data) > 10 * 1024 * 1024:
         result = {
             "success": False,
@@ -415,7 +403,7 @@ async def import_items(request: Request, file: UploadFile = File(...), db: Sessi
             "request": request, "result": result, "locations": locations,
         })
 
-    result = import_svc.import_items_from_excel(db, file_data)
+    result = import_svc.import_items_from_excel(db, file_data, mode=mode)
     return templates.TemplateResponse("import.html", {
         "request": request,
         "result": result,
@@ -440,12 +428,7 @@ def disposals_list(
     reason_clean: str | None = reason if reason and reason.strip() else None
     page_data = disposal_svc.get_disposals(db, page=page, size=25, year=year_int, reason=reason_clean)
 
-    years_raw = db.scalars(
-        select(extract("year", Disposal.disposed_at)).distinct().order_by(
-            extract("year", Disposal.disposed_at).desc()
-        )
-    ).all()
-    available_years = [int(y) for y in years_raw if y is not None]
+    available_years = disposal_svc.get_disposal_years(db)
 
     return templates.TemplateResponse("disposals/list.html", {
         "request": request,
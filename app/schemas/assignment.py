@@ -1,5 +1,5 @@
 from datetime import datetime
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class MoveRequest(BaseModel):
@@ -18,6 +18,32 @@ class BulkMoveResponse(BaseModel):
     moved: int
 
 
+class BatchMoveEntry(BaseModel):
+    item_id: int | None = None
+    item_code: str | None = None
+    location_id: int | None = None
+    location_code: str | None = None
+
+
+class BatchMoveRequest(BaseModel):
+    moves: list[BatchMoveEntry] = Field(..., min_length=1, max_length=10000)
+    note: str | None = None
+
+
+class BatchMoveResult(BaseModel):
+    index: int
+    status: str  # moved / error
+    item_id: int | None = None
+    location_id: int | None = None
+    detail: str | None = None
+
+
+class BatchMoveResponse(BaseModel):
+    moved: int
+    errors: int
+    results: list[BatchMoveResult]
+
+
 class AssignmentResponse(BaseModel):
     id: int
     item_id: int
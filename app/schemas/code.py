@@ -0,0 +1,9 @@
+from typing import Literal
+from pydantic import BaseModel
+
+
+class CodeSuggestion(BaseModel):
+    code: str
+    name: str
+    kind: Literal["item", "location"]
+    id: int
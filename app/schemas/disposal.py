@@ -11,7 +11,8 @@ class DisposalRequest(BaseModel):
 
 
 class BulkDisposeRequest(BaseModel):
-    item_ids: list[int] = Field(..., min_length=1)
+    # Horní mez jako u dávkového přesunu — IN (…) pod limitem parametrů SQLite, krátký zámek zápisu
+    item_ids: list[int] = Field(..., min_length=1, max_length=10000)
     reason: DisposalReason
     disposed_at: datetime | None = None
     note: str | None = None
@@ -38,3 +38,13 @@ class ItemResponse(ItemBase):
     updated_at: datetime
 
     model_config = {"from_attributes": True}
+
+
+class CategoryFacet(BaseModel):
+    category: str | None  # None = položky bez kategorie
+    count: int
+    total_value: Decimal
+
+
+class ItemFacets(BaseModel):
+    categories: list[CategoryFacet]
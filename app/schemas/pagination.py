@@ -6,7 +6,9 @@ T = TypeVar("T")
 
 class Page(BaseModel, Generic[T]):
     items: list[T]
-    total: int
+    total: int | None  # None v kurzorovém režimu (?after=…)
     page: int
-    pages: int
+    pages: int | None
     size: int
+    next_cursor: str | None = None  # token pro ?after= — další stránka bez OFFSET
+    has_more: bool = False
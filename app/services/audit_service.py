@@ -1,14 +1,17 @@
 from datetime import datetime, timezone
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from fastapi import HTTPException
+from app import metrics
 from app.models.audit import Audit, AuditScan
 from app.models.item import Item
 from app.models.location import Location
 from app.models.assignment import Assignment
 from app.schemas.audit import AuditCreate, AuditScanRequest
 from app.schemas.pagination import Page
-import math
+from app.services.pagination import paginate
+import app.services.upsert as upsert
 
 
 def create_audit(db: Session, data: AuditCreate, user_id: int) -> Audit:
@@ -19,12 +22,14 @@ def create_audit(db: Session, data: AuditCreate, user_id: int) -> Audit:
     return audit
 
 
-def get_audits(db: Session, page: int = 1, size: int = 50) -> Page:
-    from sqlalchemy import func
+def get_audits(
+    db: Session, page: int = 1, size: int = 50, after: str | None = None, with_total: bool = True,
+) -> Page:
     query = select(Audit)
-    total = db.scalar(select(func.count()).select_from(query.subquery()))
-    audits = db.scalars(query.offset((page - 1) * size).limit(size)).all()
-    return Page(items=audits, total=total, page=page, pages=math.ceil(total / size) if total else 1, size=size)
+    return paginate(
+        db, query, keys=[Audit.id], page=page, size=size, after=after,
+        with_total=with_total, count_key=("audits",), tables=("audits",),
+    )
 
 
 def get_audit(db: Session, audit_id: int) -> Audit:
@@ -34,41 +39,62 @@ def get_audit(db: Session, audit_id: int) -> Audit:
     return audit
 
 
-def scan_item(db: Session, audit_id: int, data: AuditScanRequest, user_id: int | None = None) -> AuditScan:
-    audit = get_audit(db, audit_id)
+def _check_open(audit: Audit | None) -> None:
+    if not audit:
+        raise HTTPException(status_code=404, detail="Inventura nenalezena")
     if audit.status != "open":
         raise HTTPException(status_code=400, detail="Inventura je uzavřena")
 
-    # Resolve item by item_id or item_code
+
+def _item_select(data: AuditScanRequest):
+    """Dotaz na skenovanou položku podle item_id nebo item_code."""
     if data.item_id:
-        item = db.get(Item, data.item_id)
-    elif data.item_code:
-        item = db.scalar(select(Item).where(Item.code == data.item_code))
-    else:
-        raise HTTPException(status_code=400, detail="Zadejte item_id nebo item_code")
+        return select(Item).where(Item.id == data.item_id)
+    if data.item_code:
+        return select(Item).where(Item.code == data.item_code)
+    raise HTTPException(status_code=400, detail="Zadejte item_id nebo item_code")
 
-    if not item or not item.is_active:
-        raise HTTPException(status_code=404, detail="Položka nenalezena")
 
-    # Idempotent: if already scanned, return existing
-    existing = db.scalar(
-        select(AuditScan)
-        .where(AuditScan.audit_id == audit_id, AuditScan.item_id == item.id)
-    )
-    if existing:
-        return existing
+def _existing_scan_select(audit_id: int, item_id: int):
+    return select(AuditScan).where(AuditScan.audit_id == audit_id, AuditScan.item_id == item_id)
+
 
-    # Get current location from latest assignment
-    latest_assignment = db.scalar(
-        select(Assignment)
-        .where(Assignment.item_id == item.id)
+def _current_location_select(item_id: int):
+    """Lokace z posledního přiřazení položky."""
+    return (
+        select(Assignment.location_id)
+        .where(Assignment.item_id == item_id)
         .order_by(Assignment.assigned_at.desc())
         .limit(1)
     )
-    current_location_id = latest_assignment.location_id if latest_assignment else None
 
-    # Use scanned location if provided, otherwise fall back to current
-    scan_location_id = data.location_id if data.location_id else current_location_id
+
+def apply_scan(db: Session, audit_id: int, data: AuditScanRequest, user_id: int | None = None) -> AuditScan:
+    """Zapíše sken do session (bez commitu) — pro skupinový commit (app.write_queue).
+
+    Idempotentní i při souběhu: sken se vkládá přes INSERT … ON CONFLICT DO
+    NOTHING na uq_audit_item. Kdo prohraje, dostane existující záznam.
+    """
+    _check_open(db.get(Audit, audit_id))
+    item = db.scalar(_item_select(data))
+    if not item or not item.is_active:
+        raise HTTPException(status_code=404, detail="Položka nenalezena")
+
+    current_location_id = db.scalar(_current_location_select(item.id))
+    scan = upsert.insert_or_ignore(db, AuditScan, {
+        "audit_id": audit_id,
+        "item_id": item.id,
+        # Use scanned location if provided, otherwise fall back to current
+        "location_id": data.location_id if data.location_id else current_location_id,
+        "scanned_by": user_id,
+    }, conflict=["audit_id", "item_id"])
+    if scan is None:
+        # Idempotent: already scanned (possibly by a concurrent request) → return existing
+        existing = db.scalar(_existing_scan_select(audit_id, item.id))
+        if existing is None:
+            raise HTTPException(status_code=409, detail="Sken se nepodařilo uložit")
+        return existing
+    metrics.record(db, "scans")
 
     # Auto-move: item found at different location than recorded → create assignment
     if data.location_id and current_location_id != data.location_id:
@@ -78,19 +104,27 @@ def scan_item(db: Session, audit_id: int, data: AuditScanRequest, user_id: int |
             user_id=user_id,
             note=f"Automatický přesun při inventuře #{audit_id}",
         ))
+        db.flush()
+        metrics.record(db, "moves")
+    return scan
 
-    scan = AuditScan(
-        audit_id=audit_id,
-        item_id=item.id,
-        location_id=scan_location_id,
-        scanned_by=user_id,
-    )
-    db.add(scan)
+
+def scan_item(db: Session, audit_id: int, data: AuditScanRequest, user_id: int | None = None) -> AuditScan:
+    scan = apply_scan(db, audit_id, data, user_id)
     db.commit()
     db.refresh(scan)
     return scan
 
 
+async def scan_item_async(
+    db: AsyncSession, audit_id: int, data: AuditScanRequest, user_id: int | None = None,
+) -> AuditScan:
+    scan = await db.run_sync(apply_scan, audit_id, data, user_id)
+    await db.commit()
+    await db.refresh(scan)
+    return scan
+
+
 def close_audit(db: Session, audit_id: int, user_id: int | None = None) -> Audit:
     audit = get_audit(db, audit_id)
     if audit.status == "closed":
@@ -0,0 +1,60 @@
+"""
+Fasety kategorií — udržovaná tabulka category_stats.
+
+Služby, které mění kategorii, cenu nebo aktivitu položky, předají změny do
+`apply_changes` v rámci své transakce; čtení pak nemusí procházet items.
+"""
+from decimal import Decimal
+
+from sqlalchemy import select, func, delete
+from sqlalchemy.orm import Session
+
+from app.models.item import Item
+from app.models.category_stat import CategoryStat
+import app.services.upsert as upsert
+
+# (kategorie, pořizovací cena, aktivní) — stav položky z pohledu souhrnu
+ItemState = tuple[str | None, Decimal | None, bool]
+
+
+def item_state(item) -> ItemState:
+    return (item.category, item.purchase_price, item.is_active)
+
+
+def apply_changes(db: Session, changes: list[tuple[ItemState | None, ItemState | None]]) -> None:
+    """Promítne změny položek (stav před, stav po; None = neexistovala) do category_stats."""
+    deltas: dict[str, list] = {}
+    for before, after in changes:
+        for state, sign in ((before, -1), (after, 1)):
+            if state is None or not state[2]:
+                continue
+            category, price, _ = state
+            delta = deltas.setdefault(category or "", [0, Decimal("0")])
+            delta[0] += sign
+            delta[1] += sign * (price or 0)
+    for category, (count, value) in sorted(deltas.items()):
+        if count or value:
+            upsert.increment(
+                db, CategoryStat, {"category": category}, {"item_count": count, "total_value": value}
+            )
+
+
+def get_category_stats(db: Session) -> list[CategoryStat]:
+    """Kategorie s alespoň jednou aktivní položkou, abecedně (bez kategorie na konci)."""
+    stats = db.scalars(
+        select(CategoryStat).where(CategoryStat.item_count > 0).order_by(CategoryStat.category)
+    ).all()
+    return sorted(stats, key=lambda s: s.category == "")
+
+
+def rebuild_category_stats(db: Session) -> None:
+    """Přepočítá category_stats z tabulky items (migrace, app.bootstrap)."""
+    category = func.coalesce(Item.category, "")
+    rows = db.execute(
+        select(category, func.count(), func.coalesce(func.sum(Item.purchase_price), 0))
+        .where(Item.is_active == True)
+        .group_by(category)
+    ).all()
+    db.execute(delete(CategoryStat))
+    db.add_all(CategoryStat(category=c, item_count=n, total_value=v) for c, n, v in rows)
+    db.commit()
@@ -0,0 +1,245 @@
+"""
+Index kódů položek a lokací v paměti — pro našeptávání při ručním zadání kódu.
+
+Seřazený seznam klíčů + bisect: prefix „IT-00" je souvislý úsek seznamu,
+takže dotaz nesahá do DB a stojí O(log n + limit).
+
+Index se postaví při startu (a znovu, pokud se dotaz ptá na jinou DB než tu,
+ze které byl postaven) a dál se udržuje přírůstkově:
+  - after_flush zaznamená změněné Item/Location objekty (kód, název, aktivita)
+  - after_commit je promítne do indexu, rollback je zahodí
+Hromadné INSERT/UPDATE/DELETE přes session.execute() jednotlivé řádky
+nevidí — index se označí jako zastaralý a při dalším dotazu se přestaví.
+Stejně tak po zápisu do items/locations v jiném workeru (DATA_VERSIONS_SHARED,
+app.data_versions.subscribe). Změny a invalidace, které přijdou během
+přestavby, se zapíší do žurnálu a po výměně se na nový snímek promítnou
+znovu — snímek je mohl přečíst ještě před jejich commitem.
+
+Přibližné hledání (`nearest`) generuje všechny kódy o jednu editaci vedle
+(smazání, vložení, záměna, prohození sousedů) a ověřuje je proti množině
+kódů — ~600 lookupů místo procházení celé množiny, i pro 100k kódů < 1 ms.
+BK-strom byl na hustých číselných řadách (IT-00001…) řádově pomalejší.
+Vstup delší než nejdelší možný kód + 1 se nezkouší — počet i délka
+kandidátů rostou s délkou vstupu.
+"""
+import threading
+from bisect import bisect_left, insort
+from itertools import chain
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app import data_versions
+from app.database import database_key
+from app.models.item import Item
+from app.models.location import Location
+
+_KINDS = {Item: "item", Location: "location"}
+_TABLES = {"items", "locations"}
+# Nic delšího nemůže být o jednu editaci od existujícího kódu
+_MAX_INPUT = max(model.__table__.c.code.type.length for model in _KINDS) + 1
+_PENDING_KEY = "_code_index_pending"
+_STALE_KEY = "_code_index_stale"
+
+# Znaky, které se při ručním přepisu štítku snadno zamění
+_CONFUSABLE = {
+    frozenset(p) for p in ("O0", "Q0", "D0", "I1", "L1", "S5", "B8", "Z2", "G6")
+}
+
+
+def _edits(word: str, alphabet: str) -> dict[str, float]:
+    """Kódy ve vzdálenosti 1 → cena editace (pravděpodobnější překlepy jsou levnější)."""
+    out: dict[str, float] = {}
+
+    def put(candidate: str, cost: float) -> None:
+        if candidate != word and cost < out.get(candidate, 2):
+            out[candidate] = cost
+
+    for i in range(len(word) + 1):
+        head, tail = word[:i], word[i:]
+        if tail:
+            # Smazání; zdvojený znak je častý překlep
+            put(head + tail[1:], 0.5 if i and word[i - 1] == tail[0] else 1)
+            for c in alphabet:
+                if c != tail[0]:
+                    put(head + c + tail[1:], 0.2 if frozenset((c, tail[0])) in _CONFUSABLE else 1)
+        if len(tail) > 1:
+            put(head + tail[1] + tail[0] + tail[2:], 0.5)
+        for c in alphabet:
+            # Vložení; vynechaný opakovaný znak (0042 → 00042) je častý
+            doubled = (head and head[-1] == c) or (tail and tail[0] == c)
+            put(head + c + tail, 0.5 if doubled else 1)
+    return out
+
+
+class CodeIndex:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._database = None
+        self._stale = True
+        self._keys: list[tuple[str, str, int]] = []  # (kód velkými písmeny, druh, id)
+        self._entries: dict[tuple[str, int], tuple[str, str]] = {}  # (druh, id) → (kód, název)
+        self._by_code: dict[str, set[tuple[str, int]]] = {}  # kód velkými písmeny → (druh, id)
+        self._alphabet: set[str] = set()
+        # Změny z apply() během probíhajících přestaveb (viz rebuild)
+        self._rebuilding = 0
+        self._journal: list[dict] = []
+        self._invalidations = 0
+
+    def rebuild(self, db: Session) -> None:
+        with self._lock:
+            self._rebuilding += 1
+            start = len(self._journal)
+            invalidations = self._invalidations
+        try:
+            entries = {}
+            for model, kind in _KINDS.items():
+                rows = db.execute(select(model.id, model.code, model.name).where(model.is_active == True))
+                for row_id, code, name in rows:
+                    entries[(kind, row_id)] = (code, name)
+        except BaseException:
+            with self._lock:
+                self._finish_rebuild()
+            raise
+        keys = sorted((code.upper(), kind, row_id) for (kind, row_id), (code, _) in entries.items())
+        by_code: dict[str, set[tuple[str, int]]] = {}
+        for key, kind, row_id in keys:
+            by_code.setdefault(key, set()).add((kind, row_id))
+        database = database_key(db.get_bind())
+        with self._lock:
+            late = self._journal[start:]
+            self._finish_rebuild()
+            self._entries = entries
+            self._keys = keys
+            self._by_code = by_code
+            self._alphabet = set("".join(by_code))
+            self._database = database
+            for changes in late:
+                self._apply(changes)
+            # Hromadná změna během přestavby — snímek ji nemusí obsahovat
+            self._stale = self._invalidations != invalidations
+
+    def _finish_rebuild(self) -> None:
+        self._rebuilding -= 1
+        if not self._rebuilding:
+            self._journal = []
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._invalidations += 1
+            self._stale = True
+
+    def owns(self, session: Session) -> bool:
+        # Sync i async session nad stejnou DB sdílí jeden index
+        return database_key(session.get_bind()) == self._database
+
+    def suggest(self, db: Session, prefix: str, limit: int = 10) -> list[dict]:
+        if self._stale or not self.owns(db):
+            self.rebuild(db)
+        needle = prefix.upper()
+        with self._lock:
+            start = bisect_left(self._keys, (needle,))
+            result = []
+            for key, kind, row_id in self._keys[start:start + limit]:
+                if not key.startswith(needle):
+                    break
+                code, name = self._entries[(kind, row_id)]
+                result.append({"code": code, "name": name, "kind": kind, "id": row_id})
+        return result
+
+    def nearest(self, db: Session, code: str, limit: int = 5) -> list[dict]:
+        """Kódy o jeden překlep vedle `code`, nejpravděpodobnější první."""
+        needle = code.strip().upper()
+        if len(needle) > _MAX_INPUT:
+            return []
+        if self._stale or not self.owns(db):
+            self.rebuild(db)
+        with self._lock:
+            alphabet = "".join(sorted(self._alphabet))
+            hits = [
+                (cost, candidate)
+                for candidate, cost in _edits(needle, alphabet).items()
+                if candidate in self._by_code
+            ]
+            if needle in self._by_code:
+                # Liší se jen velikostí písmen — nejčastější „překlep" ruční čtečky
+                hits.append((0, needle))
+            hits.sort()
+            result = []
+            for _, candidate in hits:
+                for kind, row_id in sorted(self._by_code[candidate]):
+                    code_, name = self._entries[(kind, row_id)]
+                    result.append({"code": code_, "name": name, "kind": kind, "id": row_id})
+        return result[:limit]
+
+    def apply(self, changes: dict[tuple[str, int], tuple[str, str] | None]) -> None:
+        """Promítne změny: (druh, id) → (kód, název), nebo None = odebrat."""
+        with self._lock:
+            self._apply(changes)
+            if self._rebuilding:
+                self._journal.append(changes)
+
+    def _apply(self, changes: dict[tuple[str, int], tuple[str, str] | None]) -> None:
+        for (kind, row_id), entry in changes.items():
+            old = self._entries.pop((kind, row_id), None)
+            if old is not None:
+                key = old[0].upper()
+                i = bisect_left(self._keys, (key, kind, row_id))
+                if i < len(self._keys) and self._keys[i] == (key, kind, row_id):
+                    del self._keys[i]
+                owners = self._by_code.get(key, set())
+                owners.discard((kind, row_id))
+                if not owners:
+                    self._by_code.pop(key, None)
+            if entry is not None:
+                key = entry[0].upper()
+                self._entries[(kind, row_id)] = entry
+                insort(self._keys, (key, kind, row_id))
+                self._by_code.setdefault(key, set()).add((kind, row_id))
+                self._alphabet.update(key)
+
+
+code_index = CodeIndex()
+data_versions.subscribe(_TABLES, lambda tables: code_index.invalidate())
+
+
+def _pending(session: Session) -> dict:
+    return session.info.setdefault(_PENDING_KEY, {})
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_flushed(session: Session, flush_context) -> None:
+    if not code_index.owns(session):
+        return
+    changes = _pending(session)
+    for obj in chain(session.new, session.dirty):
+        kind = _KINDS.get(type(obj))
+        if kind:
+            changes[(kind, obj.id)] = (obj.code, obj.name) if obj.is_active else None
+    for obj in session.deleted:
+        kind = _KINDS.get(type(obj))
+        if kind:
+            changes[(kind, obj.id)] = None
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _bulk_dml(state) -> None:
+    if state.is_insert or state.is_update or state.is_delete:
+        table = getattr(state.statement, "table", None)
+        if table is not None and table.name in _TABLES and code_index.owns(state.session):
+            state.session.info[_STALE_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed(session: Session) -> None:
+    changes = session.info.pop(_PENDING_KEY, None)
+    if session.info.pop(_STALE_KEY, False):
+        code_index.invalidate()
+    elif changes:
+        code_index.apply(changes)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_STALE_KEY, None)
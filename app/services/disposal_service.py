@@ -1,13 +1,16 @@
 from datetime import datetime, timezone
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func, extract
+from sqlalchemy import select, func, extract, update, insert, delete
 from fastapi import HTTPException
-import math
 
-from app.models.disposal import Disposal
+from app import metrics
+from app.models.disposal import Disposal, DisposalYear
 from app.models.item import Item
 from app.schemas.disposal import DisposalRequest, BulkDisposeRequest
 from app.schemas.pagination import Page
+from app.services.pagination import paginate
+import app.services.upsert as upsert
+import app.services.category_service as category_svc
 
 
 def dispose_item(
@@ -22,7 +25,9 @@ def dispose_item(
     if not item.is_active:
         raise HTTPException(status_code=409, detail="Položka je již vyřazena")
 
+    before = category_svc.item_state(item)
     item.is_active = False
+    category_svc.apply_changes(db, [(before, None)])
 
     disposal = Disposal(
         item_id=item_id,
@@ -33,6 +38,8 @@ def dispose_item(
         document_ref=data.document_ref,
     )
     db.add(disposal)
+    _bump_disposal_years(db, [disposal.disposed_at])
+    metrics.record(db, "disposals")
     db.commit()
     db.refresh(disposal)
     return disposal
@@ -44,35 +51,68 @@ def get_disposals(
     size: int = 50,
     year: int | None = None,
     reason: str | None = None,
+    after: str | None = None,
+    with_total: bool = True,
 ) -> Page:
     query = select(Disposal)
 
     if year is not None:
-        query = query.where(extract("year", Disposal.disposed_at) == year)
+        # Polootevřený interval místo extract(year) — využije index na disposed_at
+        start, end = _year_range(year)
+        query = query.where(Disposal.disposed_at >= start, Disposal.disposed_at < end)
     if reason is not None:
         query = query.where(Disposal.reason == reason)
 
-    query = query.order_by(Disposal.disposed_at.desc())
+    # Položkové údaje se načtou stejným dotazem (LEFT JOIN), ne db.get() pro každý řádek
+    query = query.add_columns(Item.code, Item.name).outerjoin(Item, Item.id == Disposal.item_id)
+
+    return paginate(
+        db, query,
+        keys=[Disposal.disposed_at, Disposal.id],
+        descending=True,
+        page=page, size=size, after=after,
+        scalars=False,
+        key=lambda row: (row[0].disposed_at, row[0].id),
+        transform=lambda rows: [_to_response_dict(d, code, name) for d, code, name in rows],
+        with_total=with_total,
+        count_key=("disposals", year, reason),
+        tables=("disposals",),
+    )
+
+
+def get_disposal_years(db: Session) -> list[int]:
+    """Roky s alespoň jedním vyřazením (sestupně) — z udržovaného souhrnu disposal_years."""
+    years = db.scalars(
+        select(DisposalYear.year).where(DisposalYear.count > 0).order_by(DisposalYear.year.desc())
+    ).all()
+    return list(years)
+
 
-    total = db.scalar(select(func.count()).select_from(query.subquery()))
-    rows = db.scalars(query.offset((page - 1) * size).limit(size)).all()
+def rebuild_disposal_years(db: Session) -> None:
+    """Přepočítá souhrn disposal_years z tabulky disposals (migrace, app.bootstrap)."""
+    year = extract("year", Disposal.disposed_at)
+    counts = db.execute(select(year, func.count()).group_by(year)).all()
+    db.execute(delete(DisposalYear))
+    db.add_all(DisposalYear(year=int(y), count=c) for y, c in counts if y is not None)
+    db.commit()
 
-    # Obohacení o denormalizované položkové údaje
-    results = []
-    for d in rows:
-        item = db.get(Item, d.item_id)
-        obj = _to_response_dict(d, item)
-        results.append(obj)
 
-    return Page(
-        items=results,
-        total=total,
-        page=page,
-        pages=math.ceil(total / size) if total else 1,
-        size=size,
+def _year_range(year: int) -> tuple[datetime, datetime]:
+    return (
+        datetime(year, 1, 1, tzinfo=timezone.utc),
+        datetime(year + 1, 1, 1, tzinfo=timezone.utc),
     )
 
 
+def _bump_disposal_years(db: Session, disposed_at: list[datetime]) -> None:
+    """Započítá nová vyřazení do souhrnu disposal_years (v rámci probíhající transakce)."""
+    counts: dict[int, int] = {}
+    for dt in disposed_at:
+        counts[dt.year] = counts.get(dt.year, 0) + 1
+    for year, n in counts.items():
+        upsert.increment(db, DisposalYear, {"year": year}, {"count": n})
+
+
 def get_disposal(db: Session, disposal_id: int) -> Disposal:
     disposal = db.get(Disposal, disposal_id)
     if not disposal:
@@ -85,41 +125,86 @@ def bulk_dispose_items(
     data: BulkDisposeRequest,
     user_id: int | None = None,
 ) -> dict:
-    """Hromadné vyřazení. Již vyřazené nebo neexistující položky jsou přeskočeny."""
-    disposed = []
-    skipped_ids = []
+    """Hromadné vyřazení. Již vyřazené nebo neexistující položky jsou přeskočeny.
+
+    Celé vyřazení proběhne v jedné transakci: jeden SELECT kandidátů, jeden
+    UPDATE … WHERE id IN (…) a dávkový INSERT záznamů o vyřazení.
+    """
     disposed_at = data.disposed_at or datetime.now(timezone.utc)
+    requested = list(dict.fromkeys(data.item_ids))  # bez duplicit, v pořadí požadavku
+
+    candidates = {
+        row.id: row
+        for row in db.execute(
+            select(Item.id, Item.code, Item.name, Item.category, Item.purchase_price)
+            .where(Item.id.in_(requested), Item.is_active == True)
+        ).all()
+    }
+    to_dispose = [item_id for item_id in requested if item_id in candidates]
 
+    # Duplicitní ID v požadavku: první výskyt se vyřadí, další jsou přeskočeny
+    skipped_ids = []
+    seen: set[int] = set()
     for item_id in data.item_ids:
-        item = db.get(Item, item_id)
-        if not item or not item.is_active:
+        if item_id not in candidates or item_id in seen:
             skipped_ids.append(item_id)
-            continue
-
-        item.is_active = False
-        disposal = Disposal(
-            item_id=item_id,
-            reason=data.reason,
-            disposed_at=disposed_at,
-            disposed_by=user_id,
-            note=data.note,
-            document_ref=data.document_ref,
-        )
-        db.add(disposal)
-        db.flush()
-        disposed.append(disposal)
+        seen.add(item_id)
+
+    if not to_dispose:
+        return {"disposed": [], "skipped_ids": skipped_ids}
 
+    db.execute(
+        update(Item)
+        .where(Item.id.in_(to_dispose))
+        .values(is_active=False, updated_at=datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
+    )
+
+    rows = [
+        {
+            "item_id": item_id,
+            "reason": data.reason,
+            "disposed_at": disposed_at,
+            "disposed_by": user_id,
+            "note": data.note,
+            "document_ref": data.document_ref,
+        }
+        for item_id in to_dispose
+    ]
+    dialect = db.get_bind().dialect
+    if dialect.insert_executemany_returning_sort_by_parameter_order:
+        ids = db.scalars(
+            insert(Disposal).returning(Disposal.id, sort_by_parameter_order=True), rows
+        ).all()
+        disposal_ids = dict(zip(to_dispose, ids))
+    else:
+        # Bez RETURNING (starší MariaDB/MySQL) — ID dohledáme jedním dotazem
+        db.execute(insert(Disposal), rows)
+        disposal_ids = dict(db.execute(
+            select(Disposal.item_id, func.max(Disposal.id))
+            .where(Disposal.item_id.in_(to_dispose))
+            .group_by(Disposal.item_id)
+        ).all())
+    _bump_disposal_years(db, [disposed_at] * len(rows))
+    metrics.record(db, "disposals", len(rows))
+    category_svc.apply_changes(db, [
+        ((candidates[i].category, candidates[i].purchase_price, True), None) for i in to_dispose
+    ])
     db.commit()
-    for d in disposed:
-        db.refresh(d)
 
-    return {
-        "disposed": [_to_response_dict(d, db.get(Item, d.item_id)) for d in disposed],
-        "skipped_ids": skipped_ids,
-    }
+    disposed = [
+        {
+            "id": disposal_ids[row["item_id"]],
+            **row,
+            "item_code": candidates[row["item_id"]].code,
+            "item_name": candidates[row["item_id"]].name,
+        }
+        for row in rows
+    ]
+    return {"disposed": disposed, "skipped_ids": skipped_ids}
 
 
-def _to_response_dict(disposal: Disposal, item: Item | None) -> dict:
+def _to_response_dict(disposal: Disposal, item_code: str | None, item_name: str | None) -> dict:
     return {
         "id": disposal.id,
         "item_id": disposal.item_id,
@@ -128,6 +213,6 @@ def _to_response_dict(disposal: Disposal, item: Item | None) -> dict:
         "disposed_by": disposal.disposed_by,
         "note": disposal.note,
         "document_ref": disposal.document_ref,
-        "item_code": item.code if item else None,
-        "item_name": item.name if item else None,
+        "item_code": item_code,
+        "item_name": item_name,
     }
@@ -3,10 +3,10 @@ Import service — hromadný import majetku z Excel souboru.
 Podporuje formáty .xlsx a .xlsm (openpyxl).
 """
 import io
-from datetime import datetime, date
+from datetime import datetime, date, timezone
 from decimal import Decimal, InvalidOperation
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func
+from sqlalchemy import select, func, update, insert
 from openpyxl import load_workbook, Workbook
 from openpyxl.styles import Font, PatternFill, Alignment
 from openpyxl.utils import get_column_letter
@@ -14,6 +14,7 @@ from openpyxl.utils import get_column_letter
 from app.models.item import Item
 from app.models.location import Location
 from app.models.assignment import Assignment
+import app.services.category_service as category_svc
 
 # Mapování názvů sloupců (malá písmena, bez diakritiky) → interní název pole
 _COL_MAP = {
@@ -99,24 +100,111 @@ def _generate_code(db: Session, used: set) -> str:
 
 
 _IMPORT_MAX_ROWS = 2000
+_UPSERT_MAX_ROWS = 50000
+
+# Počet parametrů v jednom IN (…) — drží se pod limitem SQLite (32 766 proměnných)
+_IN_CHUNK = 5000
+
+# Sloupce, které upsert porovnává a případně přepisuje (kód je klíč, lokace se řeší zvlášť)
+_UPSERT_FIELDS = (
+    "name", "category", "description", "serial_number",
+    "responsible_person", "purchase_date", "purchase_price",
+)
+
+IMPORT_MODES = ("insert", "upsert")
+
+
+def _chunks(values: list, size: int = _IN_CHUNK):
+    for i in range(0, len(values), size):
+        yield values[i:i + size]
+
+
+def _fetch_existing_items(db: Session, codes: list[str]) -> dict[str, dict]:
+    """Načte aktuální stav položek pro dané kódy jedním dotazem (po dávkách IN)."""
+    cols = [Item.id, Item.code, Item.is_active, *(getattr(Item, f) for f in _UPSERT_FIELDS)]
+    existing: dict[str, dict] = {}
+    for chunk in _chunks(codes):
+        for row in db.execute(select(*cols).where(Item.code.in_(chunk))).mappings():
+            existing[row["code"]] = dict(row)
+    return existing
+
+
+def _fetch_current_locations(db: Session, item_ids: list[int]) -> dict[int, int]:
+    """Vrátí item_id → location_id posledního přiřazení pro dané položky."""
+    current: dict[int, int] = {}
+    for chunk in _chunks(item_ids):
+        subq = (
+            select(Assignment.item_id, func.max(Assignment.assigned_at).label("max_at"))
+            .where(Assignment.item_id.in_(chunk))
+            .group_by(Assignment.item_id)
+            .subquery()
+        )
+        rows = db.execute(
+            select(Assignment.item_id, Assignment.location_id)
+            .join(subq, (Assignment.item_id == subq.c.item_id) &
+                  (Assignment.assigned_at == subq.c.max_at))
+        ).all()
+        current.update({item_id: loc_id for item_id, loc_id in rows})
+    return current
+
+
+def _fetch_active_locations(db: Session, codes: list[str]) -> dict[str, int]:
+    """Vrátí kód → id pro aktivní lokace s danými kódy."""
+    found: dict[str, int] = {}
+    for chunk in _chunks(codes):
+        rows = db.execute(
+            select(Location.code, Location.id)
+            .where(Location.code.in_(chunk), Location.is_active == True)
+        ).all()
+        found.update({code: loc_id for code, loc_id in rows})
+    return found
+
+
+def _diff_item(current: dict, incoming: dict, present: set[str]) -> dict:
+    """Vrátí jen změněné sloupce. Prázdná buňka hodnotu nemaže."""
+    changes = {}
+    for field in _UPSERT_FIELDS:
+        if field not in present:
+            continue
+        value = incoming[field]
+        if value is None:
+            continue
+        if current[field] != value:
+            changes[field] = value
+    return changes
 
 
-def import_items_from_excel(db: Session, file_data: bytes) -> dict:
+def import_items_from_excel(db: Session, file_data: bytes, mode: str = "insert") -> dict:
     """
     Zpracuje Excel soubor a importuje položky majetku.
 
+    Režimy:
+      - "insert": řádek s existujícím kódem je přeskočen (výchozí)
+      - "upsert": řádek s existujícím kódem aktualizuje položku — mění se jen
+        sloupce, které se liší, zápis proběhne dávkovým UPDATE
+
     Vrací dict s:
       - success: bool
       - imported: int
+      - updated: int
+      - unchanged: int
       - skipped: int
       - errors: int
+      - field_changes: dict[str, int] — počet změn pro každé pole (jen upsert)
       - details: list[dict] — výsledek pro každou řádku
       - error: str (jen pokud success=False)
     """
+    upsert = mode == "upsert"
+    empty = {"imported": 0, "updated": 0, "unchanged": 0, "skipped": 0, "errors": 0,
+             "field_changes": {}, "details": []}
+
+    if mode not in IMPORT_MODES:
+        return {"success": False, "error": f"Neznámý režim importu '{mode}'", **empty}
+
     try:
         wb = load_workbook(filename=io.BytesIO(file_data), data_only=True)
     except Exception as e:
-        return {"success": False, "error": f"Nepodařilo se načíst soubor: {e}", "imported": 0, "skipped": 0, "errors": 0, "details": []}
+        return {"success": False, "error": f"Nepodařilo se načíst soubor: {e}", **empty}
 
     # Hledáme první list (nebo list pojmenovaný "Import majetku")
     if "Import majetku" in wb.sheetnames:
@@ -150,7 +238,7 @@ def import_items_from_excel(db: Session, file_data: bytes) -> dict:
                 "Nepodařilo se najít povinný sloupec 'Název' v souboru. "
                 "Zkontrolujte, zda jste použili šablonu AssetTrack."
             ),
-            "imported": 0, "skipped": 0, "errors": 0, "details": [],
+            **empty,
         }
 
     def get_val(row_values: tuple, field: str):
@@ -163,37 +251,118 @@ def import_items_from_excel(db: Session, file_data: bytes) -> dict:
         return str(v).strip() if not isinstance(v, (int, float, date, datetime)) else v
 
     # --- Kontrola limitu řádků ---
+    max_rows = _UPSERT_MAX_ROWS if upsert else _IMPORT_MAX_ROWS
     data_rows = ws.max_row - header_row
-    if data_rows > _IMPORT_MAX_ROWS:
+    if data_rows > max_rows:
         return {
             "success": False,
-            "error": f"Soubor obsahuje příliš mnoho řádků ({data_rows}). Maximum je {_IMPORT_MAX_ROWS}.",
-            "imported": 0, "skipped": 0, "errors": 0, "details": [],
+            "error": f"Soubor obsahuje příliš mnoho řádků ({data_rows}). Maximum je {max_rows}.",
+            **empty,
         }
 
-    # --- Fáze 1: validace a příprava dat (bez zápisu do DB) ---
-    to_insert: list[dict] = []
+    # --- Fáze 1: načtení řádků ---
+    rows: list[dict] = []
     results: list[dict] = []
-    used_codes: set[str] = set()
 
-    for row_values in ws.iter_rows(min_row=header_row + 1, max_row=header_row + _IMPORT_MAX_ROWS, values_only=True):
+    for row_values in ws.iter_rows(min_row=header_row + 1, max_row=header_row + max_rows, values_only=True):
         # Přeskočíme prázdné řádky
         if all(v is None or (isinstance(v, str) and v.strip() == "") for v in row_values):
             continue
 
         name_raw = get_val(row_values, "name")
         name = str(name_raw).strip() if name_raw else None
-        if not name:
-            results.append({"status": "skipped", "code": "—", "name": "—", "reason": "Chybí název (povinný sloupec)"})
-            continue
-
-        # Kód
         code_raw = get_val(row_values, "code")
         code = str(code_raw).strip() if code_raw else None
+        location_code_raw = get_val(row_values, "location_code")
+
+        rows.append({
+            "code": code,
+            "name": name,
+            "category": get_val(row_values, "category") or None,
+            "description": get_val(row_values, "description") or None,
+            "serial_number": get_val(row_values, "serial_number") or None,
+            "responsible_person": get_val(row_values, "responsible_person") or None,
+            "purchase_date": _parse_date(get_val(row_values, "purchase_date")),
+            "purchase_price": _parse_price(get_val(row_values, "purchase_price")),
+            "location_code": str(location_code_raw).strip() if location_code_raw else None,
+        })
+
+    # Hromadné načtení existujících kódů a lokací (místo dotazu na každý řádek)
+    file_codes = list({r["code"] for r in rows if r["code"]})
+    existing = _fetch_existing_items(db, file_codes)
+    locations = _fetch_active_locations(db, list({r["location_code"] for r in rows if r["location_code"]}))
+    current_locations = (
+        _fetch_current_locations(db, [e["id"] for e in existing.values() if e["is_active"]]) if upsert else {}
+    )
+
+    # --- Fáze 2: validace a příprava dat (bez zápisu do DB) ---
+    to_insert: list[dict] = []
+    to_update: list[dict] = []
+    new_assignments: list[dict] = []
+    field_changes: dict[str, int] = {}
+    stat_changes: list = []  # změny pro category_stats (stav před, stav po)
+    used_codes: set[str] = set()
+    present = set(col_map)
+
+    for r in rows:
+        code = r["code"]
+        name = r["name"]
+
+        location_id = None
+        location_note = None
+        if r["location_code"]:
+            location_id = locations.get(r["location_code"])
+            if location_id is None:
+                location_note = f"Lokace '{r['location_code']}' nenalezena — položka importována bez přiřazení"
+
+        if upsert and code and code in existing:
+            if code in used_codes:
+                results.append({"status": "skipped", "code": code, "name": name or "—", "reason": f"Kód '{code}' se opakuje v souboru"})
+                continue
+            used_codes.add(code)
+
+            current = existing[code]
+            if not current["is_active"]:
+                # Vyřazená položka se nemění ani nepřesouvá (stejně jako v move_service)
+                results.append({"status": "skipped", "code": code, "name": current["name"],
+                                "reason": f"Položka '{code}' je vyřazená — neaktualizuje se"})
+                continue
+            changes = _diff_item(current, r, present)
+            changed_fields = list(changes)
+            if location_id is not None and current_locations.get(current["id"]) != location_id:
+                new_assignments.append({"item_id": current["id"], "location_id": location_id,
+                                        "note": "Změna lokace při importu"})
+                changed_fields.append("location")
+
+            if not changed_fields:
+                results.append({"status": "unchanged", "code": code, "name": current["name"],
+                                "reason": location_note or ""})
+                continue
+
+            if changes:
+                to_update.append({"id": current["id"], **changes})
+                if "category" in changes or "purchase_price" in changes:
+                    after = {**current, **changes}
+                    stat_changes.append((
+                        (current["category"], current["purchase_price"], current["is_active"]),
+                        (after["category"], after["purchase_price"], after["is_active"]),
+                    ))
+            for field in changed_fields:
+                field_changes[field] = field_changes.get(field, 0) + 1
+            reason = "Změněno: " + ", ".join(changed_fields)
+            if location_note:
+                reason += f" · {location_note}"
+            results.append({"status": "updated", "code": code, "name": changes.get("name", current["name"]),
+                            "reason": reason})
+            continue
+
+        if not name:
+            results.append({"status": "skipped", "code": code or "—", "name": "—", "reason": "Chybí název (povinný sloupec)"})
+            continue
 
         if code:
             # Kontrola duplikátu v DB
-            if code in used_codes or db.scalar(select(Item).where(Item.code == code)):
+            if code in used_codes or code in existing:
                 results.append({"status": "skipped", "code": code, "name": name, "reason": f"Kód '{code}' již existuje nebo se opakuje v souboru"})
                 continue
         else:
@@ -201,39 +370,23 @@ def import_items_from_excel(db: Session, file_data: bytes) -> dict:
 
         used_codes.add(code)
 
-        # Datum a cena
-        purchase_date = _parse_date(get_val(row_values, "purchase_date"))
-        purchase_price = _parse_price(get_val(row_values, "purchase_price"))
-
-        # Lokace (jen validace — přiřadíme ve fázi 2)
-        location_code_raw = get_val(row_values, "location_code")
-        location_code = str(location_code_raw).strip() if location_code_raw else None
-        location_id = None
-        location_note = None
-
-        if location_code:
-            loc = db.scalar(select(Location).where(Location.code == location_code, Location.is_active == True))
-            if loc:
-                location_id = loc.id
-            else:
-                location_note = f"Lokace '{location_code}' nenalezena — položka importována bez přiřazení"
-
         to_insert.append({
             "code": code,
             "name": name,
-            "category": get_val(row_values, "category") or None,
-            "description": get_val(row_values, "description") or None,
-            "serial_number": get_val(row_values, "serial_number") or None,
-            "responsible_person": get_val(row_values, "responsible_person") or None,
-            "purchase_date": purchase_date,
-            "purchase_price": purchase_price,
+            "category": r["category"],
+            "description": r["description"],
+            "serial_number": r["serial_number"],
+            "responsible_person": r["responsible_person"],
+            "purchase_date": r["purchase_date"],
+            "purchase_price": r["purchase_price"],
             "location_id": location_id,
             "location_note": location_note,
         })
 
-    # --- Fáze 2: zápis do DB ---
+    # --- Fáze 3: zápis do DB ---
     imported = 0
     errors = 0
+    inserted_stats: list = []
 
     for d in to_insert:
         try:
@@ -253,6 +406,7 @@ def import_items_from_excel(db: Session, file_data: bytes) -> dict:
             if d["location_id"]:
                 db.add(Assignment(item_id=item.id, location_id=d["location_id"]))
 
+            inserted_stats.append((None, (d["category"], d["purchase_price"], True)))
             imported += 1
             results.append({
                 "status": "imported",
@@ -262,6 +416,7 @@ def import_items_from_excel(db: Session, file_data: bytes) -> dict:
             })
         except Exception as e:
             db.rollback()
+            inserted_stats = []  # rollback zahodil i dříve vložené řádky
             errors += 1
             results.append({
                 "status": "error",
@@ -270,7 +425,19 @@ def import_items_from_excel(db: Session, file_data: bytes) -> dict:
                 "reason": str(e),
             })
 
-    if imported > 0:
+    updated = len([r for r in results if r["status"] == "updated"])
+
+    if to_update:
+        # ORM bulk UPDATE podle primárního klíče — SQLAlchemy seskupí řádky se stejnou
+        # sadou změněných sloupců do jednoho executemany
+        now = datetime.now(timezone.utc)
+        for chunk in _chunks(to_update):
+            db.execute(update(Item), [{**u, "updated_at": now} for u in chunk])
+    if new_assignments:
+        db.execute(insert(Assignment), new_assignments)
+    category_svc.apply_changes(db, inserted_stats + stat_changes)
+
+    if imported > 0 or updated > 0:
         try:
             db.commit()
         except Exception as e:
@@ -278,17 +445,22 @@ def import_items_from_excel(db: Session, file_data: bytes) -> dict:
             return {
                 "success": False,
                 "error": f"Chyba při ukládání do databáze: {e}",
-                "imported": 0, "skipped": len([r for r in results if r["status"] == "skipped"]),
-                "errors": len(to_insert), "details": results,
+                **empty,
+                "skipped": len([r for r in results if r["status"] == "skipped"]),
+                "errors": len(to_insert) + len(to_update), "details": results,
             }
 
     skipped = len([r for r in results if r["status"] == "skipped"])
+    unchanged = len([r for r in results if r["status"] == "unchanged"])
 
     return {
         "success": True,
         "imported": imported,
+        "updated": updated,
+        "unchanged": unchanged,
         "skipped": skipped,
         "errors": errors,
+        "field_changes": field_changes,
         "details": results,
     }
 
@@ -378,7 +550,9 @@ def generate_import_template() -> bytes:
         ("   • Řádky s prázdným sloupcem Název jsou přeskočeny.", None, 15),
         ("   • Řádky s duplicitním Kódem jsou přeskočeny (kód musí být jedinečný).", None, 15),
         ("   • Pokud Kód lokace neexistuje, položka se importuje bez přiřazení k lokaci.", None, 15),
-        ("   • Import NIKDY nepřepisuje existující data — přidává pouze nové položky.", None, 15),
+        ("   • Běžný import NIKDY nepřepisuje existující data — přidává pouze nové položky.", None, 15),
+        ("   • Režim 'Aktualizovat existující' přepíše u existujících kódů jen změněné", None, 15),
+        ("     sloupce; prázdné buňky hodnotu nemažou.", None, 15),
         ("   • Maximální velikost souboru: 10 MB.", None, 15),
         ("", None, 8),
         ("5. PŘÍPUSTNÉ FORMÁTY SOUBORU", bold_font, 18),
@@ -1,21 +1,38 @@
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from fastapi import HTTPException
 from app.models.item import Item
 from app.models.assignment import Assignment
-from app.schemas.item import ItemCreate, ItemUpdate
+from app.schemas.item import ItemCreate, ItemUpdate, ItemResponse
 from app.schemas.pagination import Page
-import math
-
-
-def get_items(db: Session, page: int = 1, size: int = 50, search: str = "", category: str = "", location_id: int | None = None) -> Page:
-    query = select(Item).where(Item.is_active == True)
+from app.services.pagination import paginate
+import app.services.search_service as search_svc
+import app.services.category_service as category_svc
+from app.fast_json import row_dicts
+
+# Sloupce odpovědi ve stejném pořadí jako ItemResponse — pro rychlou JSON cestu
+ITEM_ROW_FIELDS = tuple(ItemResponse.model_fields)
+
+
+def get_items(
+    db: Session,
+    page: int = 1,
+    size: int = 50,
+    search: str = "",
+    category: str = "",
+    location_id: int | None = None,
+    after: str | None = None,
+    with_total: bool = True,
+    as_rows: bool = False,
+) -> Page:
+    """Stránka aktivních položek. S `as_rows` obsahuje `items` slovníky
+    přímo z Core řádků (bez ORM objektů) — pro `app.fast_json`."""
+    entity = [getattr(Item, f) for f in ITEM_ROW_FIELDS] if as_rows else [Item]
+    query = select(*entity).where(Item.is_active == True)
+    rank, descending = None, False
     if search:
-        query = query.where(
-            Item.name.ilike(f"%{search}%")
-            | Item.code.ilike(f"%{search}%")
-            | Item.serial_number.ilike(f"%{search}%")
-        )
+        query, rank, descending = search_svc.apply_item_search(db, query, search)
     if category:
         query = query.where(Item.category.ilike(category))
     if location_id == -1:
@@ -32,14 +49,30 @@ def get_items(db: Session, page: int = 1, size: int = 50, search: str = "", cate
             .scalar_subquery()
         )
         query = query.where(current_loc_subq == location_id)
-    total = db.scalar(select(func.count()).select_from(query.subquery()))
-    items = db.scalars(query.offset((page - 1) * size).limit(size)).all()
-    return Page(
-        items=items,
-        total=total,
-        page=page,
-        pages=math.ceil(total / size) if total else 1,
-        size=size,
+    # Filtr podle lokace závisí i na assignments — jinak stačí verze items
+    tables = ("items", "assignments") if location_id else ("items",)
+    count_key = ("items", search, category.lower(), location_id)
+    if as_rows:
+        unwrap = lambda rows: row_dicts(rows, ITEM_ROW_FIELDS)  # noqa: E731
+        row_id = lambda row: row.id  # noqa: E731
+    else:
+        unwrap = lambda rows: [row[0] for row in rows]  # noqa: E731
+        row_id = lambda row: row[0].id  # noqa: E731
+    if rank is None:
+        return paginate(
+            db, query, keys=[Item.id], page=page, size=size, after=after,
+            scalars=not as_rows, transform=unwrap if as_rows else None,
+            with_total=with_total, count_key=count_key, tables=tables,
+        )
+    # Fulltext: nejrelevantnější první, kurzor nese (relevance, id)
+    return paginate(
+        db, query.add_columns(rank.label("relevance")),
+        keys=[rank, Item.id], descending=descending,
+        page=page, size=size, after=after,
+        scalars=False,
+        key=lambda row: (row.relevance, row_id(row)),
+        transform=unwrap,
+        with_total=with_total, count_key=count_key, tables=tables,
     )
 
 
@@ -54,12 +87,24 @@ def get_item_by_code(db: Session, code: str) -> Item | None:
     return db.scalar(select(Item).where(Item.code == code))
 
 
+async def get_item_async(db: AsyncSession, item_id: int) -> Item:
+    item = await db.get(Item, item_id)
+    if not item:
+        raise HTTPException(status_code=404, detail="Položka nenalezena")
+    return item
+
+
+async def get_item_by_code_async(db: AsyncSession, code: str) -> Item | None:
+    return await db.scalar(select(Item).where(Item.code == code))
+
+
 def create_item(db: Session, data: ItemCreate) -> Item:
     existing = get_item_by_code(db, data.code)
     if existing:
         raise HTTPException(status_code=409, detail="Kód položky již existuje")
     item = Item(**data.model_dump())
     db.add(item)
+    category_svc.apply_changes(db, [(None, category_svc.item_state(item))])
     db.commit()
     db.refresh(item)
     return item
@@ -67,8 +112,10 @@ def create_item(db: Session, data: ItemCreate) -> Item:
 
 def update_item(db: Session, item_id: int, data: ItemUpdate) -> Item:
     item = get_item(db, item_id)
+    before = category_svc.item_state(item)
     for field, value in data.model_dump(exclude_unset=True).items():
         setattr(item, field, value)
+    category_svc.apply_changes(db, [(before, category_svc.item_state(item))])
     db.commit()
     db.refresh(item)
     return item
@@ -76,7 +123,9 @@ def update_item(db: Session, item_id: int, data: ItemUpdate) -> Item:
 
 def delete_item(db: Session, item_id: int) -> Item:
     item = get_item(db, item_id)
+    before = category_svc.item_state(item)
     item.is_active = False
+    category_svc.apply_changes(db, [(before, category_svc.item_state(item))])
     db.commit()
     db.refresh(item)
     return item
@@ -91,6 +140,14 @@ def get_item_history(db: Session, item_id: int) -> list[Assignment]:
     ).all()
 
 
+def get_item_history_stamp(db: Session, item_id: int) -> tuple[int, int | None]:
+    """(počet, max id) přesunů položky — levný validátor pro ETag historie (přes index)."""
+    count, max_id = db.execute(
+        select(func.count(), func.max(Assignment.id)).where(Assignment.item_id == item_id)
+    ).one()
+    return count, max_id
+
+
 def get_current_location(db: Session, item_id: int) -> Assignment | None:
     return db.scalar(
         select(Assignment)
@@ -4,16 +4,27 @@ from fastapi import HTTPException
 from app.models.location import Location
 from app.models.assignment import Assignment
 from app.models.item import Item
-from app.schemas.location import LocationCreate, LocationUpdate
+from app.schemas.location import LocationCreate, LocationUpdate, LocationResponse
 from app.schemas.pagination import Page
-import math
+from app.services.pagination import paginate
+from app.fast_json import row_dicts
 
+LOCATION_ROW_FIELDS = tuple(LocationResponse.model_fields)
 
-def get_locations(db: Session, page: int = 1, size: int = 50) -> Page:
-    query = select(Location).where(Location.is_active == True)
-    total = db.scalar(select(func.count()).select_from(query.subquery()))
-    locs = db.scalars(query.offset((page - 1) * size).limit(size)).all()
-    return Page(items=locs, total=total, page=page, pages=math.ceil(total / size) if total else 1, size=size)
+
+def get_locations(
+    db: Session, page: int = 1, size: int = 50, after: str | None = None, with_total: bool = True,
+    as_rows: bool = False,
+) -> Page:
+    """Stránka aktivních lokací; `as_rows` viz item_service.get_items."""
+    entity = [getattr(Location, f) for f in LOCATION_ROW_FIELDS] if as_rows else [Location]
+    query = select(*entity).where(Location.is_active == True)
+    return paginate(
+        db, query, keys=[Location.id], page=page, size=size, after=after,
+        scalars=not as_rows,
+        transform=(lambda rows: row_dicts(rows, LOCATION_ROW_FIELDS)) if as_rows else None,
+        with_total=with_total, count_key=("locations",), tables=("locations",),
+    )
 
 
 def get_location(db: Session, loc_id: int) -> Location:
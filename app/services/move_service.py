@@ -1,109 +1,247 @@
+from datetime import datetime, timezone
 from sqlalchemy.orm import Session
-from sqlalchemy import select, func, exists
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, insert, literal, or_, Integer, String
 from fastapi import HTTPException
+from app import metrics
 from app.models.assignment import Assignment
 from app.models.item import Item
 from app.models.location import Location
-from app.schemas.assignment import MoveRequest
+from app.schemas.assignment import MoveRequest, BatchMoveRequest
 
 
-def move_item(db: Session, data: MoveRequest, user_id: int | None = None) -> Assignment:
-    item = db.get(Item, data.item_id)
+def _new_assignment(item: Item | None, loc: Location | None, data: MoveRequest, user_id: int | None) -> Assignment:
     if not item or not item.is_active:
         raise HTTPException(status_code=404, detail="Položka nenalezena")
-
-    loc = db.get(Location, data.location_id)
     if not loc or not loc.is_active:
         raise HTTPException(status_code=404, detail="Lokace nenalezena")
-
-    assignment = Assignment(
+    return Assignment(
         item_id=data.item_id,
         location_id=data.location_id,
         user_id=user_id,
         note=data.note,
     )
+
+
+def apply_move(db: Session, data: MoveRequest, user_id: int | None = None) -> Assignment:
+    """Zapíše přesun do session (flush, bez commitu) — pro skupinový commit (app.write_queue)."""
+    assignment = _new_assignment(db.get(Item, data.item_id), db.get(Location, data.location_id), data, user_id)
     db.add(assignment)
+    db.flush()
+    metrics.record(db, "moves")
+    return assignment
+
+
+def move_item(db: Session, data: MoveRequest, user_id: int | None = None) -> Assignment:
+    assignment = apply_move(db, data, user_id)
     db.commit()
     db.refresh(assignment)
     return assignment
 
 
-def bulk_move_items(db: Session, from_loc_id: int, to_loc_id: int, note: str | None = None) -> int:
-    """Přesune všechny položky z from_loc_id do to_loc_id (nové záznamy v assignments)."""
-    to_loc = db.get(Location, to_loc_id)
-    if not to_loc or not to_loc.is_active:
-        raise HTTPException(status_code=404, detail="Cílová lokace nenalezena nebo není aktivní")
+async def move_item_async(db: AsyncSession, data: MoveRequest, user_id: int | None = None) -> Assignment:
+    item = await db.get(Item, data.item_id)
+    loc = await db.get(Location, data.location_id)
+    assignment = _new_assignment(item, loc, data, user_id)
+    db.add(assignment)
+    metrics.record(db, "moves")
+    await db.commit()
+    await db.refresh(assignment)
+    return assignment
+
+
+def batch_move_items(db: Session, data: BatchMoveRequest, user_id: int | None = None) -> dict:
+    """Přesune libovolné páry (položka → lokace) v jedné transakci.
+
+    Položky i lokace se ověří dvěma dotazy IN (podle ID nebo kódu). Neplatné
+    řádky se přeskočí a vrátí s chybou, platné se zapíší jedním executemany.
+    """
+    item_ids = {m.item_id for m in data.moves if m.item_id is not None}
+    item_codes = {m.item_code for m in data.moves if m.item_id is None and m.item_code}
+    loc_ids = {m.location_id for m in data.moves if m.location_id is not None}
+    loc_codes = {m.location_code for m in data.moves if m.location_id is None and m.location_code}
+
+    items_by_id: dict[int, tuple] = {}
+    items_by_code: dict[str, tuple] = {}
+    if item_ids or item_codes:
+        for row in db.execute(
+            select(Item.id, Item.code, Item.is_active)
+            .where(or_(Item.id.in_(list(item_ids)), Item.code.in_(list(item_codes))))
+        ).all():
+            items_by_id[row.id] = row
+            items_by_code[row.code] = row
+
+    locs_by_id: dict[int, tuple] = {}
+    locs_by_code: dict[str, tuple] = {}
+    if loc_ids or loc_codes:
+        for row in db.execute(
+            select(Location.id, Location.code, Location.is_active)
+            .where(or_(Location.id.in_(list(loc_ids)), Location.code.in_(list(loc_codes))))
+        ).all():
+            locs_by_id[row.id] = row
+            locs_by_code[row.code] = row
+
+    now = datetime.now(timezone.utc)
+    rows: list[dict] = []
+    results: list[dict] = []
+    seen_items: set[int] = set()
+
+    for index, m in enumerate(data.moves):
+        if m.item_id is not None:
+            item = items_by_id.get(m.item_id)
+        elif m.item_code:
+            item = items_by_code.get(m.item_code)
+        else:
+            results.append({"index": index, "status": "error", "detail": "Zadejte item_id nebo item_code"})
+            continue
+
+        if m.location_id is not None:
+            loc = locs_by_id.get(m.location_id)
+        elif m.location_code:
+            loc = locs_by_code.get(m.location_code)
+        else:
+            results.append({"index": index, "status": "error", "detail": "Zadejte location_id nebo location_code"})
+            continue
+
+        if not item or not item.is_active:
+            results.append({"index": index, "status": "error", "detail": "Položka nenalezena"})
+            continue
+        if not loc or not loc.is_active:
+            results.append({"index": index, "status": "error", "item_id": item.id, "detail": "Lokace nenalezena"})
+            continue
+        if item.id in seen_items:
+            results.append({"index": index, "status": "error", "item_id": item.id, "location_id": loc.id,
+                            "detail": "Položka se v dávce opakuje"})
+            continue
+        seen_items.add(item.id)
+
+        rows.append({"item_id": item.id, "location_id": loc.id, "user_id": user_id,
+                     "note": data.note, "assigned_at": now})
+        results.append({"index": index, "status": "moved", "item_id": item.id, "location_id": loc.id})
+
+    if rows:
+        db.execute(insert(Assignment), rows)
+        metrics.record(db, "moves", len(rows))
+        db.commit()
+
+    return {
+        "moved": len(rows),
+        "errors": len(results) - len(rows),
+        "results": results,
+    }
 
-    # Najde položky, jejichž POSLEDNÍ přiřazení je na from_loc_id (i neaktivní lokace)
-    subq = (
+
+def _latest_assignment_subquery():
+    """(item_id, max_at) — čas posledního přiřazení pro každou položku."""
+    return (
         select(Assignment.item_id, func.max(Assignment.assigned_at).label("max_at"))
         .group_by(Assignment.item_id)
         .subquery()
     )
-    item_ids = db.scalars(
-        select(Assignment.item_id)
+
+
+def bulk_move_items(
+    db: Session,
+    from_loc_id: int,
+    to_loc_id: int,
+    note: str | None = None,
+    user_id: int | None = None,
+) -> int:
+    """Přesune všechny položky z from_loc_id do to_loc_id (nové záznamy v assignments).
+
+    Zápis je jediný INSERT … SELECT — položky se nenačítají do Pythonu.
+    """
+    to_loc = db.get(Location, to_loc_id)
+    if not to_loc or not to_loc.is_active:
+        raise HTTPException(status_code=404, detail="Cílová lokace nenalezena nebo není aktivní")
+
+    # Každý nový záznam nese poznámku, odkud byla položka přesunuta
+    row_note = note or f"Hromadný přesun z lokace #{from_loc_id}"
+    now = datetime.now(timezone.utc)
+
+    # Aktivní položky, jejichž POSLEDNÍ přiřazení je na from_loc_id (i neaktivní lokace)
+    subq = _latest_assignment_subquery()
+    source = (
+        select(
+            Assignment.item_id,
+            literal(to_loc_id, Integer),
+            literal(user_id, Integer),
+            literal(row_note, String),
+            literal(now, Assignment.assigned_at.type),
+        )
         .join(subq, (Assignment.item_id == subq.c.item_id) &
               (Assignment.assigned_at == subq.c.max_at))
-        .where(Assignment.location_id == from_loc_id)
-    ).all()
-
-    count = 0
-    for item_id in item_ids:
-        item = db.get(Item, item_id)
-        if item and item.is_active:
-            db.add(Assignment(item_id=item_id, location_id=to_loc_id, note=note))
-            count += 1
+        .join(Item, Item.id == Assignment.item_id)
+        .where(Assignment.location_id == from_loc_id, Item.is_active == True)
+    )
+    result = db.execute(
+        insert(Assignment).from_select(
+            ["item_id", "location_id", "user_id", "note", "assigned_at"], source
+        )
+    )
+    count = result.rowcount or 0
 
     if count > 0:
+        metrics.record(db, "moves", count)
         db.commit()
     return count
 
 
-def assign_unlocated_items(db: Session, to_loc_id: int, note: str | None = None) -> int:
-    """Přiřadí sem všechny aktivní položky bez viditelné lokace.
+def _unlocated_items_select():
+    """Aktivní položky bez viditelné lokace — jeden anti-join.
 
     Pokrývá dva případy:
     1. Položka nemá žádný záznam v assignments.
     2. Poslední assignment ukazuje na neaktivní nebo chybějící lokaci.
     """
+    subq = _latest_assignment_subquery()
+    latest = (
+        select(Assignment.item_id, Assignment.location_id)
+        .join(subq, (Assignment.item_id == subq.c.item_id) &
+              (Assignment.assigned_at == subq.c.max_at))
+        .subquery()
+    )
+    return (
+        select(Item.id)
+        .outerjoin(latest, latest.c.item_id == Item.id)
+        .outerjoin(Location, (Location.id == latest.c.location_id) & (Location.is_active == True))
+        .where(Item.is_active == True, Location.id.is_(None))
+    )
+
+
+def count_unlocated_items(db: Session) -> int:
+    """Počet aktivních položek bez viditelné lokace."""
+    unlocated = _unlocated_items_select().subquery()
+    return db.scalar(select(func.count()).select_from(unlocated)) or 0
+
+
+def assign_unlocated_items(
+    db: Session,
+    to_loc_id: int,
+    note: str | None = None,
+    user_id: int | None = None,
+) -> int:
+    """Přiřadí sem všechny aktivní položky bez viditelné lokace (jeden INSERT … SELECT)."""
     to_loc = db.get(Location, to_loc_id)
     if not to_loc or not to_loc.is_active:
         raise HTTPException(status_code=404, detail="Cílová lokace nenalezena nebo není aktivní")
 
-    # Případ 1 — žádný assignment
-    assigned_subq = select(Assignment.item_id).distinct().subquery()
-    no_assign_ids = set(db.scalars(
-        select(Item.id)
-        .where(Item.is_active == True)
-        .where(~Item.id.in_(select(assigned_subq.c.item_id)))
-    ).all())
-
-    # Případ 2 — poslední assignment → neaktivní/chybějící lokace
-    subq = (
-        select(Assignment.item_id, func.max(Assignment.assigned_at).label("max_at"))
-        .group_by(Assignment.item_id)
-        .subquery()
+    unlocated = _unlocated_items_select().subquery()
+    source = select(
+        unlocated.c.id,
+        literal(to_loc_id, Integer),
+        literal(user_id, Integer),
+        literal(note, String),
+        literal(datetime.now(timezone.utc), Assignment.assigned_at.type),
     )
-    latest = db.execute(
-        select(Assignment.item_id, Assignment.location_id)
-        .join(subq, (Assignment.item_id == subq.c.item_id) &
-              (Assignment.assigned_at == subq.c.max_at))
-    ).all()
-
-    orphan_ids = set()
-    for item_id, loc_id in latest:
-        loc = db.get(Location, loc_id)
-        if loc is None or not loc.is_active:
-            item = db.get(Item, item_id)
-            if item and item.is_active:
-                orphan_ids.add(item_id)
-
-    all_ids = no_assign_ids | orphan_ids
-    count = 0
-    for item_id in all_ids:
-        db.add(Assignment(item_id=item_id, location_id=to_loc_id, note=note))
-        count += 1
+    result = db.execute(
+        insert(Assignment).from_select(
+            ["item_id", "location_id", "user_id", "note", "assigned_at"], source
+        )
+    )
+    count = result.rowcount or 0
 
     if count > 0:
+        metrics.record(db, "moves", count)
         db.commit()
     return count
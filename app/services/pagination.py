@@ -0,0 +1,158 @@
+"""
+Stránkování seznamů — offset (UI) i keyset/kurzor (API klienti).
+
+Kurzor je neprůhledný token (base64 JSON) s hodnotami řadicího klíče posledního
+vráceného řádku. Další stránka se čte podmínkou `klíč > kurzor` místo OFFSET,
+takže i hluboké stránky stojí stejně jako první.
+
+Počty (`total`) se cachují podle klíče filtru a verzí zdrojových tabulek
+(app.data_versions) — COUNT(*) se spouští jen po změně dat. Klient, který celkový
+počet nepotřebuje, může počítání vypnout (`with_total=False`, režim „has more").
+"""
+import base64
+import binascii
+import json
+import math
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Callable
+
+from fastapi import HTTPException
+from sqlalchemy import Select, and_, func, or_, select
+from sqlalchemy.orm import Session
+
+from app import data_versions
+from app.schemas.pagination import Page
+
+_COUNT_CACHE_SIZE = 1024
+_count_cache: OrderedDict[tuple, tuple[tuple[int, ...], int]] = OrderedDict()
+_count_lock = threading.Lock()
+
+
+def encode_cursor(values: tuple) -> str:
+    raw = [v.isoformat() if isinstance(v, (datetime, date)) else v for v in values]
+    return base64.urlsafe_b64encode(json.dumps(raw).encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, keys: list) -> tuple:
+    """Dekóduje kurzor a převede hodnoty na typy řadicích sloupců."""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        raw = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(raw, list) or len(raw) != len(keys):
+            raise ValueError
+        values = []
+        for key, value in zip(keys, raw):
+            python_type = key.type.python_type
+            if python_type is datetime:
+                value = datetime.fromisoformat(value)
+            elif python_type is date:
+                value = date.fromisoformat(value)
+            elif not isinstance(value, python_type):
+                raise ValueError
+            values.append(value)
+        return tuple(values)
+    except (ValueError, TypeError, binascii.Error, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Neplatný kurzor stránkování")
+
+
+def _after(keys: list, values: tuple, descending: bool):
+    """(a, b) > (va, vb) rozepsané do OR/AND — indexovatelné i na MariaDB."""
+    clauses = []
+    for i, key in enumerate(keys):
+        prefix = [keys[j] == values[j] for j in range(i)]
+        step = key < values[i] if descending else key > values[i]
+        clauses.append(and_(*prefix, step))
+    return or_(*clauses)
+
+
+def cached_count(db: Session, query: Select, count_key: tuple, tables: tuple[str, ...]) -> int:
+    """COUNT(*) dotazu, uložený pod `count_key` dokud se nezmění verze `tables`.
+
+    Nefiltrovaný klíč (např. ("items",)) tak funguje jako udržovaný čítač —
+    přepočítá se jednou po každém commitu do tabulky, ne při každém čtení.
+    """
+    versions = data_versions.get_versions(*tables)
+    with _count_lock:
+        hit = _count_cache.get(count_key)
+        if hit is not None and hit[0] == versions:
+            _count_cache.move_to_end(count_key)
+            return hit[1]
+
+    total = db.scalar(select(func.count()).select_from(query.subquery()))
+
+    with _count_lock:
+        _count_cache[count_key] = (versions, total)
+        _count_cache.move_to_end(count_key)
+        while len(_count_cache) > _COUNT_CACHE_SIZE:
+            _count_cache.popitem(last=False)
+    return total
+
+
+def clear_count_cache() -> None:
+    with _count_lock:
+        _count_cache.clear()
+
+
+def paginate(
+    db: Session,
+    query: Select,
+    *,
+    keys: list,
+    page: int = 1,
+    size: int = 50,
+    after: str | None = None,
+    descending: bool = False,
+    scalars: bool = True,
+    key: Callable[[Any], tuple] | None = None,
+    transform: Callable[[list], list] | None = None,
+    with_total: bool = True,
+    count_key: tuple | None = None,
+    tables: tuple[str, ...] = (),
+) -> Page:
+    """Vrátí stránku dotazu seřazeného podle `keys` (poslední klíč musí být unikátní).
+
+    Bez `after` se použije offset podle `page` a spočítá se `total`. S `after`
+    se čte keyset stránka za kurzorem; `total` a `pages` se nepočítají.
+    V obou režimech obsahuje odpověď `next_cursor` a `has_more`, pokud existují
+    další řádky.
+
+    `count_key` + `tables` zapnou cachovaný počet (viz `cached_count`),
+    `with_total=False` počítání úplně vynechá — načte se jen size+1 řádků.
+    """
+    if key is None:
+        key = lambda row: tuple(getattr(row, k.key) for k in keys)  # noqa: E731
+    ordered = query.order_by(*(k.desc() if descending else k for k in keys))
+    fetch = db.scalars if scalars else db.execute
+
+    if after is None and with_total:
+        if count_key is not None:
+            total = cached_count(db, query, count_key, tables)
+        else:
+            total = db.scalar(select(func.count()).select_from(query.subquery()))
+        rows = fetch(ordered.offset((page - 1) * size).limit(size)).all()
+        has_more = page * size < total
+        pages = math.ceil(total / size) if total else 1
+    elif after is None:
+        rows = fetch(ordered.offset((page - 1) * size).limit(size + 1)).all()
+        has_more = len(rows) > size
+        rows = rows[:size]
+        total = pages = None
+    else:
+        values = decode_cursor(after, keys)
+        rows = fetch(ordered.where(_after(keys, values, descending)).limit(size + 1)).all()
+        has_more = len(rows) > size
+        rows = rows[:size]
+        total = pages = None
+
+    next_cursor = encode_cursor(key(rows[-1])) if has_more and rows else None
+    return Page(
+        items=transform(rows) if transform else rows,
+        total=total,
+        page=page,
+        pages=pages,
+        size=size,
+        next_cursor=next_cursor,
+        has_more=has_more,
+    )
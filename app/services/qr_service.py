@@ -1,5 +1,7 @@
+import hashlib
 import io
 import os
+from functools import lru_cache
 import qrcode
 from qrcode.image.pil import PilImage
 from reportlab.lib.pagesizes import A4
@@ -84,6 +86,7 @@ def _t(text: str) -> str:
 
 # ── Generování QR kódu (PNG) ──────────────────────────────────────────────────
 
+@lru_cache(maxsize=1024)
 def _make_qr_bytes(url: str, border: int = 4) -> bytes:
     qr = qrcode.QRCode(version=1, box_size=10, border=border)
     qr.add_data(url)
@@ -94,22 +97,35 @@ def _make_qr_bytes(url: str, border: int = 4) -> bytes:
     return buf.getvalue()
 
 
-def generate_item_qr(db: Session, item_id: int) -> bytes:
+def item_qr_url(db: Session, item_id: int) -> str:
+    """Adresa zakódovaná do QR položky — PNG je čistou funkcí této hodnoty."""
     item = db.get(Item, item_id)
     if not item:
         raise HTTPException(status_code=404, detail="Položka nenalezena")
-    url = f"{settings.BASE_URL}/scan/{item.code}"
-    return _make_qr_bytes(url)
+    return f"{settings.BASE_URL}/scan/{item.code}"
 
 
-def generate_location_qr(db: Session, loc_id: int) -> bytes:
+def location_qr_url(db: Session, loc_id: int) -> str:
     loc = db.get(Location, loc_id)
     if not loc:
         raise HTTPException(status_code=404, detail="Lokace nenalezena")
-    url = f"{settings.BASE_URL}/scan/{loc.code}"
+    return f"{settings.BASE_URL}/scan/{loc.code}"
+
+
+def qr_png(url: str) -> bytes:
     return _make_qr_bytes(url)
 
 
+def scan_url(code: str) -> str:
+    return f"{settings.BASE_URL}/scan/{code}"
+
+
+def qr_version(url: str) -> str:
+    """Otisk zakódované adresy pro ?v= — změna kódu i BASE_URL změní URL obrázku."""
+    return hashlib.sha1(url.encode()).hexdigest()[:12]
+
+
+
 # ── PDF štítky pro položky ─────────────────────────────────────────────────────
 
 def generate_batch_pdf(db: Session, item_ids: list[int]) -> bytes:
@@ -0,0 +1,88 @@
+"""
+Fulltextové vyhledávání položek.
+
+SQLite: FTS5 tabulka items_fts (viz app/models/item.py), řazení podle bm25.
+MariaDB: FULLTEXT index ft_items, MATCH … AGAINST v boolean režimu.
+Bez fulltextového indexu (jiná DB, SQLite bez FTS5, neaplikovaná migrace)
+se použije původní ILIKE přes kód, název a sériové číslo.
+
+Každé slovo dotazu se hledá jako prefix a všechna musí odpovídat —
+„zid kanc" najde „Židle kancelářská".
+"""
+import re
+import unicodedata
+import weakref
+from typing import Any
+
+from sqlalchemy import Float, Select, column, table, text, type_coerce
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.orm import Session
+
+from app.models.item import FTS_COLUMNS, Item
+
+_items_fts = table("items_fts", column("rowid"), column("rank", Float))
+
+# Engine → je fulltextový index k dispozici (zjišťuje se jednou za proces)
+_available: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+
+def fold(value: str) -> str:
+    """Malá písmena bez diakritiky: „Židle" → „zidle"."""
+    decomposed = unicodedata.normalize("NFKD", value)
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def _terms(search: str) -> list[str]:
+    return re.findall(r"\w+", fold(search))
+
+
+def has_fulltext(db: Session) -> bool:
+    bind = db.get_bind()
+    engine = getattr(bind, "engine", bind)
+    if engine not in _available:
+        dialect = engine.dialect.name
+        if dialect == "sqlite":
+            found = db.scalar(text("SELECT 1 FROM sqlite_master WHERE name = 'items_fts'"))
+        elif dialect in ("mysql", "mariadb"):
+            found = db.scalar(text(
+                "SELECT 1 FROM information_schema.statistics WHERE table_schema = DATABASE() "
+                "AND table_name = 'items' AND index_name = 'ft_items' LIMIT 1"
+            ))
+        else:
+            found = None
+        _available[engine] = found is not None
+    return _available[engine]
+
+
+def apply_item_search(db: Session, query: Select, search: str) -> tuple[Select, Any, bool]:
+    """Přidá do dotazu na Item vyhledávací podmínku.
+
+    Vrací (dotaz, výraz relevance, descending). Výraz je None, pokud se hledá
+    přes LIKE — pak se řadí jen podle id.
+    """
+    terms = _terms(search)
+    if not terms or not has_fulltext(db):
+        query = query.where(
+            Item.name.ilike(f"%{search}%")
+            | Item.code.ilike(f"%{search}%")
+            | Item.serial_number.ilike(f"%{search}%")
+        )
+        return query, None, False
+
+    if db.get_bind().dialect.name == "sqlite":
+        expr = " ".join(f'"{t}"*' for t in terms)
+        query = query.join(_items_fts, _items_fts.c.rowid == Item.id).where(
+            text("items_fts MATCH :fts_query").bindparams(fts_query=expr)
+        )
+        # rank = bm25, menší je relevantnější
+        return query, _items_fts.c.rank, False
+
+    score = type_coerce(
+        match(
+            *(getattr(Item, c) for c in FTS_COLUMNS),
+            against=" ".join(f"+{t}*" for t in terms),
+        ).in_boolean_mode(),
+        Float,
+    )
+    # Skóre MATCH je vyšší pro relevantnější řádky
+    return query.where(score > 0), score, True
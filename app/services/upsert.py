@@ -0,0 +1,80 @@
+"""
+Zápisy odolné vůči souběhu podle dialektu.
+
+`increment` — přičtení do souhrnných tabulek: INSERT, nebo při konfliktu klíče
+UPDATE x = x + n. SQLite: ON CONFLICT DO UPDATE, MariaDB/MySQL: ON DUPLICATE
+KEY UPDATE. Jiné dialekty: UPDATE a při nulovém rowcount INSERT (bez ochrany
+proti souběhu).
+
+`insert_or_ignore` — INSERT, který při konfliktu unikátního klíče nic neudělá.
+Jiné chyby (cizí klíč, NOT NULL) se vyhodí jako u běžného INSERTu.
+"""
+from typing import Any
+
+from sqlalchemy import Connection, insert, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+_ER_DUP_ENTRY = 1062  # MariaDB/MySQL: duplicitní hodnota unikátního klíče
+
+
+def increment(db: Session | Connection, model, key: dict[str, Any], amounts: dict[str, Any]) -> None:
+    """Přičte `amounts` k řádku `model` s primárním klíčem `key` (řádek případně založí)."""
+    dialect = (db.dialect if isinstance(db, Connection) else db.get_bind().dialect).name
+    values = {**key, **amounts}
+    if dialect == "sqlite":
+        stmt = sqlite_insert(model).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(key),
+            set_={col: getattr(model, col) + stmt.excluded[col] for col in amounts},
+        )
+    elif dialect in ("mysql", "mariadb"):
+        stmt = mysql_insert(model).values(**values)
+        stmt = stmt.on_duplicate_key_update(
+            {col: getattr(model, col) + stmt.inserted[col] for col in amounts}
+        )
+    else:
+        updated = db.execute(
+            update(model)
+            .where(*(getattr(model, col) == value for col, value in key.items()))
+            .values({col: getattr(model, col) + value for col, value in amounts.items()})
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if updated:
+            return
+        stmt = insert(model).values(**values)
+    db.execute(stmt)
+
+
+def insert_or_ignore(db: Session, model, values: dict[str, Any], conflict: list[str]):
+    """Vloží řádek, pokud ještě neexistuje řádek se stejnými sloupci `conflict`.
+
+    Vrátí nově vložený ORM objekt, nebo None, pokud řádek už existoval
+    (třeba ho právě vložil souběžný požadavek). Bez předchozího SELECTu.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        stmt = sqlite_insert(model).values(**values).on_conflict_do_nothing(index_elements=conflict)
+        return db.scalars(stmt.returning(model)).first()
+    if dialect in ("mysql", "mariadb"):
+        # Ne INSERT IGNORE — ten na varování změní i porušení cizího klíče,
+        # NOT NULL nebo oříznutí. ON DUPLICATE KEY UPDATE id = id zase s
+        # CLIENT_FOUND_ROWS (výchozí u ovladačů SQLAlchemy) vrací rowcount 1
+        # i pro existující řádek. Savepoint a kód chyby jsou jednoznačné.
+        try:
+            with db.begin_nested():
+                result = db.execute(insert(model).values(**values))
+        except IntegrityError as exc:
+            if exc.orig.args[0] != _ER_DUP_ENTRY:
+                raise
+            return None
+        return db.get(model, result.inserted_primary_key[0])
+    try:
+        with db.begin_nested():
+            return db.scalars(insert(model).values(**values).returning(model)).first()
+    except IntegrityError:
+        if db.scalar(select(model).filter_by(**{col: values[col] for col in conflict})) is None:
+            raise  # nešlo o konflikt klíče `conflict`
+        return None
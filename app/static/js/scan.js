@@ -55,3 +55,35 @@ function initScanner(onDecoded) {
     }
   });
 }
+
+/**
+ * Našeptávání kódů pro ruční zadání — plní <datalist> z /api/codes/suggest.
+ */
+function attachCodeSuggest(inputId) {
+  var input = document.getElementById(inputId);
+  if (!input) return;
+  var list = document.createElement('datalist');
+  list.id = inputId + '-suggest';
+  input.setAttribute('list', list.id);
+  input.parentNode.appendChild(list);
+
+  var lastPrefix = '';
+  input.addEventListener('input', function() {
+    var prefix = input.value.trim();
+    if (!prefix || prefix === lastPrefix) return;
+    lastPrefix = prefix;
+    fetch('/api/codes/suggest?prefix=' + encodeURIComponent(prefix))
+      .then(function(res) { return res.ok ? res.json() : []; })
+      .then(function(rows) {
+        if (prefix !== lastPrefix) return;
+        list.innerHTML = '';
+        rows.forEach(function(row) {
+          var opt = document.createElement('option');
+          opt.value = row.code;
+          opt.label = row.name;
+          list.appendChild(opt);
+        });
+      })
+      .catch(function() {});
+  });
+}
@@ -0,0 +1,153 @@
+"""
+Jediný zapisovač se skupinovým commitem — pro skeny a přesuny na SQLite.
+
+Na SQLite je každý commit vlastní fsync a souběžní zapisovatelé se střídají
+na zámku databáze. S WRITE_QUEUE požadavek jen vloží záměr (funkci služby,
+která zapisuje bez commitu — `apply_scan`, `apply_move`) do fronty. Vlákno
+zapisovače bere záměry po dávkách (okno WRITE_QUEUE_WINDOW_MS, nejvýš
+WRITE_QUEUE_MAX_BATCH) a celou dávku potvrdí jedním commitem. Požadavek
+dostane výsledek až po commitu, takže potvrzený zápis nemůže zmizet.
+
+Záměr musí validační chybu (HTTPException — 404, uzavřená inventura…)
+vyhodit dřív, než cokoli zapíše; ta se pak týká jen jeho požadavku. Jiná
+chyba (např. IntegrityError) zruší dávku a záměry se zapíší znovu, každý
+ve vlastní transakci. SAVEPOINT na záměr by propustnost snížil o třetinu.
+"""
+import asyncio
+import concurrent.futures
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable
+
+from fastapi import HTTPException
+from sqlalchemy import inspect as sa_inspect, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class WriteQueue:
+    def __init__(self, session_factory, window: float = 0.002, max_batch: int = 256) -> None:
+        self._session_factory = session_factory
+        self._window = window
+        self._max_batch = max_batch
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="write-queue", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Dopíše záměry, které už jsou ve frontě, a ukončí vlákno."""
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+            self._thread = None
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> concurrent.futures.Future:
+        """Zařadí `fn(db, *args, **kwargs)`; výsledek je ve future po commitu dávky."""
+        future: concurrent.futures.Future = concurrent.futures.Future()
+        self._queue.put((fn, args, kwargs, future))
+        return future
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def _collect(self) -> list | None:
+        first = self._queue.get()
+        if first is _STOP:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self._window
+        while len(batch) < self._max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if entry is _STOP:
+                self._queue.put(_STOP)  # dopsat tuto dávku, pak skončit
+                break
+            batch.append(entry)
+        return batch
+
+    def _run(self) -> None:
+        while (batch := self._collect()) is not None:
+            self._write(batch)
+
+    def _write(self, batch: list) -> None:
+        # Zrušené záměry (klient mezitím odešel) se nezapíší
+        entries = [entry for entry in batch if entry[3].set_running_or_notify_cancel()]
+        try:
+            self._commit(entries)
+        except Exception:
+            logger.warning("Skupinový commit %d záměrů selhal — zapíší se jednotlivě", len(entries), exc_info=True)
+            for entry in entries:
+                try:
+                    self._commit([entry])
+                except Exception as exc:
+                    entry[3].set_exception(exc)
+
+    def _commit(self, entries: list) -> None:
+        """Provede záměry v jedné transakci. Chyba DB se vyhodí, výsledky
+        (i HTTPException jednotlivých záměrů) se předají až po commitu."""
+        done: list[tuple[concurrent.futures.Future, Any]] = []
+        failed: list[tuple[concurrent.futures.Future, HTTPException]] = []
+        db: Session = self._session_factory(expire_on_commit=False)
+        try:
+            for fn, args, kwargs, future in entries:
+                try:
+                    result = fn(db, *args, **kwargs)
+                except HTTPException as exc:
+                    failed.append((future, exc))
+                else:
+                    done.append((future, result))
+            db.commit()
+        except Exception:
+            db.rollback()
+            db.close()
+            raise
+        # Dávka je zapsaná — chyba při načtení výsledků ji nesmí poslat k opakování
+        try:
+            _reload(db, [result for _, result in done])
+        except Exception:
+            logger.warning("Načtení výsledků %d záměrů po commitu selhalo", len(done), exc_info=True)
+        finally:
+            db.close()
+        for future, exc in failed:
+            future.set_exception(exc)
+        for future, result in done:
+            future.set_result(result)
+
+
+def _reload(db: Session, results: list) -> None:
+    """Načte výsledky znovu z DB (jeden dotaz na třídu) — stejné hodnoty jako
+    refresh() při přímém zápisu, např. časy v podobě, v jaké je vrací DB."""
+    by_class: dict[type, list] = defaultdict(list)
+    for result in results:
+        if result in db:
+            by_class[type(result)].append(sa_inspect(result).identity[0])
+    for cls, ids in by_class.items():
+        pk = sa_inspect(cls).primary_key[0]
+        db.scalars(select(cls).where(pk.in_(ids)).execution_options(populate_existing=True)).all()
+
+
+write_queue = WriteQueue(
+    SessionLocal,
+    window=settings.WRITE_QUEUE_WINDOW_MS / 1000,
+    max_batch=settings.WRITE_QUEUE_MAX_BATCH,
+)
@@ -6,5 +6,17 @@ mkdir -p /app/data
 echo "==> Running database migrations..."
 python -m alembic upgrade head
 
+WORKERS="${WEB_CONCURRENCY:-1}"
+if [ "$WORKERS" -gt 1 ]; then
+    # Cache a limity přihlášení musí vidět zápisy ostatních workerů
+    export DATA_VERSIONS_SHARED="${DATA_VERSIONS_SHARED:-true}"
+    export RATE_LIMIT_BACKEND="${RATE_LIMIT_BACKEND:-database}"
+    # Metriky všech workerů (app/metrics.py) — hodnoty z minulého běhu zahodit
+    export PROMETHEUS_MULTIPROC_DIR="${PROMETHEUS_MULTIPROC_DIR:-/tmp/assettrack-metrics}"
+    rm -rf "$PROMETHEUS_MULTIPROC_DIR" && mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+    echo "==> Starting AssetTrack (gunicorn, $WORKERS workers)..."
+    exec gunicorn -c gunicorn.conf.py app.main:app
+fi
+
 echo "==> Starting AssetTrack..."
 exec uvicorn app.main:app --host 0.0.0.0 --port 8000
@@ -0,0 +1,54 @@
+"""
+gunicorn — více workerů (entrypoint.sh při WEB_CONCURRENCY > 1).
+
+Aplikace se načte jednou v master procesu (preload_app) a inicializace DB
+proběhne jen tam (app/bootstrap.py). Workery se po `max_requests`
+požadavcích recyklují (s rozptylem, aby se nerestartovaly naráz).
+`kill -HUP <master>` vymění workery bez výpadku.
+
+Metriky (app/metrics.py) se při více procesech sčítají přes soubory
+v PROMETHEUS_MULTIPROC_DIR — adresář musí existovat dřív, než se aplikace
+načte; entrypoint.sh ho při startu kontejneru vyprázdní.
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", min(multiprocessing.cpu_count() * 2 + 1, 8)))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+max_requests = int(os.environ.get("MAX_REQUESTS", 2000))
+max_requests_jitter = int(os.environ.get("MAX_REQUESTS_JITTER", 200))
+timeout = int(os.environ.get("WORKER_TIMEOUT", 120))  # PDF/XLSX exporty
+graceful_timeout = 30
+keepalive = 5
+
+forwarded_allow_ips = "*"
+
+os.makedirs(os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/assettrack-metrics"), exist_ok=True)
+accesslog = "-"
+
+
+def on_starting(server):
+    from app import bootstrap
+    from app.database import engine
+
+    os.makedirs("data", exist_ok=True)
+    bootstrap.init_database(engine)
+    bootstrap.mark_initialized()
+
+
+def post_fork(server, worker):
+    # Spojení z master procesu nesmí sdílet forknuté workery — každý si otevře vlastní
+    from app.database import async_engine, engine, read_engine
+
+    engine.dispose(close=False)
+    read_engine.dispose(close=False)
+    async_engine.sync_engine.dispose(close=False)
+
+
+def child_exit(server, worker):
+    from app.metrics import archive_dead_process
+
+    archive_dead_process(worker.pid)
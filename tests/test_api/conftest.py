@@ -1,24 +1,23 @@
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
 from app.main import app
-from app.database import Base, get_db
+from app.database import Base, get_db, get_async_db, get_read_db, make_engine, make_async_engine, make_read_engine
 from app.models.user import User
 from app.services.user_service import hash_password
-
-TEST_DB_URL = "sqlite:///:memory:"
+from app.services.pagination import clear_count_cache
 
 
 @pytest.fixture(scope="function")
-def client():
-    engine = create_engine(
-        TEST_DB_URL,
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,  # Ensure all connections share same in-memory DB
-    )
+def client(tmp_path):
+    # Soubor (ne :memory:) — sync i async engine musí vidět stejnou databázi
+    db_url = f"sqlite:///{tmp_path / 'test.db'}"
+    engine = make_engine(db_url)
+    async_engine = make_async_engine(db_url)
+    read_engine = make_read_engine(db_url)
     Base.metadata.create_all(engine)
+    clear_count_cache()  # cachované počty patří předchozí testovací DB
     TestSession = sessionmaker(bind=engine)
 
     def override_get_db():
@@ -28,7 +27,24 @@ def client():
         finally:
             db.close()
 
+    ReadTestSession = sessionmaker(bind=read_engine, info={"read_only": True})
+
+    def override_get_read_db():
+        db = ReadTestSession()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    AsyncTestSession = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_async_db():
+        async with AsyncTestSession() as db:
+            yield db
+
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_read_db] = override_get_read_db
 
     # Create a default user for audits (id=1)
     db = TestSession()
@@ -41,6 +57,10 @@ def client():
         # Log in so that protected UI routes are accessible
         c.post("/login", data={"username": "admin", "password": "admin123", "next": "/"})
         yield c
+        # aiosqlite spojení patří smyčce TestClientu — zavřít, dokud běží
+        c.portal.call(async_engine.dispose)
 
     app.dependency_overrides.clear()
+    read_engine.dispose()
     Base.metadata.drop_all(engine)
+    engine.dispose()
@@ -83,3 +83,81 @@ def test_audit_report(client):
     data = res.json()
     assert data["scanned_count"] >= 1
     assert "missing_items" in data
+
+
+async def test_concurrent_async_scans(tmp_path):
+    """Async skeny běží souběžně nad jedním engine — každý dostane svůj záznam."""
+    import asyncio
+    from sqlalchemy import func, select
+    from sqlalchemy.ext.asyncio import async_sessionmaker
+    from app.database import Base, make_async_engine
+    from app.models.audit import Audit, AuditScan
+    from app.models.item import Item
+    from app.models.user import User
+    from app.schemas.audit import AuditScanRequest
+    from app.services.audit_service import scan_item_async
+
+    engine = make_async_engine(f"sqlite:///{tmp_path / 'scan.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    Session = async_sessionmaker(engine, expire_on_commit=False)
+    async with Session() as db:
+        db.add(User(username="u", email="u@test.com", hashed_password="x", role="admin"))
+        db.add_all(Item(code=f"AS-{i:02d}", name=f"Item {i}") for i in range(20))
+        db.add(Audit(name="Async", created_by=1))
+        await db.commit()
+
+    async def scan(code: str):
+        async with Session() as db:
+            return await scan_item_async(db, 1, AuditScanRequest(item_code=code), user_id=1)
+
+    scans = await asyncio.gather(*(scan(f"AS-{i:02d}") for i in range(20)))
+    assert len({s.item_id for s in scans}) == 20
+
+    async with Session() as db:
+        assert await db.scalar(select(func.count()).select_from(AuditScan)) == 20
+    await engine.dispose()
+
+
+def test_concurrent_scans_of_one_item(tmp_path):
+    """Mnoho čteček skenuje stejnou položku naráz — jeden záznam, žádná IntegrityError."""
+    from concurrent.futures import ThreadPoolExecutor
+    from threading import Barrier
+    from sqlalchemy import func, select
+    from sqlalchemy.orm import sessionmaker
+    from app.database import Base, make_engine
+    from app.models.assignment import Assignment
+    from app.models.audit import Audit, AuditScan
+    from app.models.item import Item
+    from app.models.location import Location
+    from app.models.user import User
+    from app.schemas.audit import AuditScanRequest
+    from app.services.audit_service import scan_item
+
+    engine = make_engine(f"sqlite:///{tmp_path / 'race.db'}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        db.add(User(username="u", email="u@test.com", hashed_password="x", role="admin"))
+        db.add(Item(code="RACE-1", name="Sporná položka"))
+        db.add(Location(code="RACE-L", name="Sklad"))
+        db.add(Audit(name="Souběh", created_by=1))
+        db.commit()
+
+    threads = 16
+    barrier = Barrier(threads)
+
+    def scan(_):
+        with Session() as db:
+            barrier.wait()
+            return scan_item(db, 1, AuditScanRequest(item_code="RACE-1", location_id=1), user_id=1).id
+
+    with ThreadPoolExecutor(threads) as pool:
+        ids = list(pool.map(scan, range(threads)))
+
+    assert len(set(ids)) == 1
+    with Session() as db:
+        assert db.scalar(select(func.count()).select_from(AuditScan)) == 1
+        # Automatický přesun vznikl jen jednou — s prvním skenem
+        assert db.scalar(select(func.count()).select_from(Assignment)) == 1
+    engine.dispose()
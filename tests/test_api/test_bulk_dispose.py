@@ -97,6 +97,18 @@ def test_bulk_dispose_with_metadata(client):
     assert d["reason"] == "donation"
 
 
+def test_bulk_dispose_duplicate_ids(client):
+    """Duplicitní ID v požadavku vyřadí položku jen jednou, další výskyt je přeskočen."""
+    id1 = _item(client, "BULK-010", "Duplicitní")
+    res = client.post("/api/items/bulk-dispose", json={"item_ids": [id1, id1, 99999], "reason": "loss"})
+    assert res.status_code == 200
+    data = res.json()
+    assert len(data["disposed"]) == 1
+    assert data["disposed"][0]["item_code"] == "BULK-010"
+    assert data["disposed"][0]["item_name"] == "Duplicitní"
+    assert data["skipped_ids"] == [id1, 99999]
+
+
 def test_bulk_dispose_missing_reason(client):
     """Chybějící reason → 422."""
     id1 = _item(client, "BULK-009")
@@ -110,6 +122,12 @@ def test_bulk_dispose_empty_ids(client):
     assert res.status_code == 422
 
 
+def test_bulk_dispose_too_many_ids(client):
+    """Víc než 10 000 item_ids → 422 (ne 500 z limitu parametrů SQLite)."""
+    res = client.post("/api/items/bulk-dispose", json={"item_ids": list(range(1, 10002)), "reason": "loss"})
+    assert res.status_code == 422
+
+
 # ── GET /api/qr/batch?type=location ──────────────────────────────────────────
 
 def test_qr_batch_location(client):
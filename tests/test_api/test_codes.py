@@ -0,0 +1,113 @@
+def test_suggest_items_and_locations(client):
+    client.post("/api/items", json={"code": "IT-0041", "name": "Notebook"})
+    client.post("/api/items", json={"code": "IT-0042", "name": "Monitor"})
+    client.post("/api/items", json={"code": "XX-0001", "name": "Jiné"})
+    client.post("/api/locations", json={"code": "IT-ROOM", "name": "Serverovna"})
+
+    res = client.get("/api/codes/suggest?prefix=it-00")
+    assert res.status_code == 200
+    assert [(r["code"], r["kind"]) for r in res.json()] == [("IT-0041", "item"), ("IT-0042", "item")]
+
+    codes = [r["code"] for r in client.get("/api/codes/suggest?prefix=IT").json()]
+    assert codes == ["IT-0041", "IT-0042", "IT-ROOM"]
+
+
+def test_suggest_limit(client):
+    for i in range(5):
+        client.post("/api/items", json={"code": f"LIM-{i}", "name": "x"})
+    assert len(client.get("/api/codes/suggest?prefix=LIM&limit=2").json()) == 2
+
+
+def test_suggest_follows_writes(client):
+    item = client.post("/api/items", json={"code": "SUG-001", "name": "Lampa"}).json()
+    assert client.get("/api/codes/suggest?prefix=SUG").json()[0]["name"] == "Lampa"
+
+    client.put(f"/api/items/{item['id']}", json={"code": "SUG-900", "name": "Věšák"})
+    res = client.get("/api/codes/suggest?prefix=SUG").json()
+    assert [(r["code"], r["name"]) for r in res] == [("SUG-900", "Věšák")]
+
+    client.delete(f"/api/items/{item['id']}")
+    assert client.get("/api/codes/suggest?prefix=SUG").json() == []
+
+
+def test_suggest_after_bulk_dispose(client):
+    ids = [client.post("/api/items", json={"code": f"SBD-{i}", "name": "x"}).json()["id"] for i in range(3)]
+    assert len(client.get("/api/codes/suggest?prefix=SBD").json()) == 3
+    client.post("/api/items/bulk-dispose", json={"item_ids": ids[:2], "reason": "sale"})
+    assert [r["code"] for r in client.get("/api/codes/suggest?prefix=SBD").json()] == ["SBD-2"]
+
+
+def test_suggest_requires_prefix(client):
+    assert client.get("/api/codes/suggest").status_code == 422
+
+
+def test_resolve_unknown_offers_near_codes(client):
+    client.post("/api/items", json={"code": "IT-00042", "name": "Notebook"})
+    client.post("/api/items", json={"code": "IT-00043", "name": "Monitor"})
+    client.post("/api/locations", json={"code": "KANC-12", "name": "Kancelář"})
+
+    # Písmeno O místo nuly
+    res = client.get("/api/scan/resolve/IT-0O042").json()
+    assert res["type"] == "unknown"
+    assert res["candidates"][0]["code"] == "IT-00042"
+
+    # Vynechaná zdvojená nula má přednost před ostatními vloženími
+    res = client.get("/api/scan/resolve/IT-0042").json()
+    assert res["candidates"][0]["code"] == "IT-00042"
+
+    # Prohozené znaky, malá písmena, lokace
+    res = client.get("/api/scan/resolve/knac-12").json()
+    assert [(c["code"], c["kind"]) for c in res["candidates"]] == [("KANC-12", "location")]
+
+    # Jen jiná velikost písmen — kód sám je první kandidát
+    res = client.get("/api/scan/resolve/it-00042").json()
+    assert res["candidates"][0]["code"] == "IT-00042"
+
+
+def test_resolve_unknown_without_candidates(client):
+    client.post("/api/items", json={"code": "IT-00042", "name": "Notebook"})
+    res = client.get("/api/scan/resolve/ZZZ").json()
+    assert res == {"type": "unknown", "code": "ZZZ", "candidates": []}
+
+
+def test_resolve_overlong_code_skips_near_search(client, monkeypatch):
+    import app.services.code_index as code_index
+
+    def no_edits(word, alphabet):
+        raise AssertionError("kandidáti pro příliš dlouhý vstup")
+
+    client.post("/api/items", json={"code": "IT-00042", "name": "Notebook"})
+    monkeypatch.setattr(code_index, "_edits", no_edits)
+    res = client.get(f"/api/scan/resolve/{'A' * 5000}").json()
+    assert res["candidates"] == []
+    assert client.get(f"/scan/{'A' * 5000}").status_code == 404
+
+
+def test_scan_unknown_code_page_offers_near_codes(client):
+    client.post("/api/items", json={"code": "IT-00042", "name": "<b>Notebook</b>"})
+    res = client.get("/scan/IT-0O042", follow_redirects=False)
+    assert res.status_code == 404
+    assert 'href="/scan/IT-00042"' in res.text
+    assert "&lt;b&gt;Notebook&lt;/b&gt;" in res.text
+
+
+def test_rebuild_keeps_changes_committed_meanwhile(db):
+    from sqlalchemy import event
+    from app.models.item import Item
+    from app.services.code_index import CodeIndex
+
+    db.add(Item(code="RB-1", name="Stará"))
+    db.commit()
+    index = CodeIndex()
+
+    def concurrent_commit(state):
+        # Commit jiné session mezi čtením snímku a jeho výměnou
+        index.apply({("item", 999): ("RB-2", "Nová")})
+
+    event.listen(db, "do_orm_execute", concurrent_commit, once=True)
+    index.rebuild(db)
+    assert [r["code"] for r in index.suggest(db, "RB")] == ["RB-1", "RB-2"]
+
+    event.listen(db, "do_orm_execute", lambda state: index.invalidate(), once=True)
+    index.rebuild(db)
+    assert index._stale
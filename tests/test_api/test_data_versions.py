@@ -0,0 +1,118 @@
+"""Testy registru verzí dat (app.data_versions)."""
+import pytest
+from sqlalchemy import create_engine, select, update
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import data_versions
+from app.config import settings
+from app.database import Base
+from app.models.data_version import DataVersion
+from app.models.item import Item
+
+
+@pytest.fixture()
+def Session():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    Base.metadata.drop_all(engine)
+
+
+def test_commit_bumps_changed_tables(Session):
+    db = Session()
+    a = Item(code="DV-1", name="A")
+    db.add(a)
+    db.commit()
+    items_v, locations_v = data_versions.get_versions("items", "locations")
+
+    a.name = "A2"
+    db.commit()
+    assert data_versions.get_version("items") > items_v
+    assert data_versions.get_version("locations") == locations_v
+
+
+def test_rollback_does_not_bump(Session):
+    db = Session()
+    db.add(Item(code="DV-3", name="C"))
+    db.commit()
+    version = data_versions.get_version("items")
+    db.add(Item(code="DV-4", name="D"))
+    db.flush()
+    db.rollback()
+    assert data_versions.get_version("items") == version
+
+
+def test_bulk_dml_bumps_table(Session):
+    db = Session()
+    db.add(Item(code="DV-5", name="E"))
+    db.commit()
+    version = data_versions.get_version("items")
+    db.execute(update(Item).where(Item.code == "DV-5").values(name="F"))
+    db.commit()
+    assert data_versions.get_version("items") > version
+
+
+def test_shared_versions_across_workers(Session, monkeypatch):
+    monkeypatch.setattr(settings, "DATA_VERSIONS_SHARED", True)
+    monkeypatch.setattr(data_versions, "_shared_seen", {})
+    db = Session()
+    db.add(Item(code="DV-6", name="G"))
+    db.commit()
+    # Víc flushů v jedné transakci → jedno přičtení
+    db.execute(update(Item).values(name="H"))
+    db.flush()
+    db.execute(update(Item).values(name="H2"))
+    db.commit()
+    assert db.scalar(select(DataVersion.version).where(DataVersion.table_name == "items")) == 2
+    assert "items" in data_versions.sync_shared(db)
+    assert data_versions.sync_shared(db) == []
+
+    # Zápis „jiného workeru" — přímo do data_versions, bez lokálního commitu přes ORM
+    version = data_versions.get_version("items")
+    db.execute(update(DataVersion).where(DataVersion.table_name == "items").values(version=DataVersion.version + 1))
+    db.commit()
+    assert data_versions.sync_shared(db) == ["items"]
+    assert data_versions.get_version("items") > version
+
+
+def test_shared_sync_ignores_own_writes_and_notifies(Session, monkeypatch):
+    monkeypatch.setattr(settings, "DATA_VERSIONS_SHARED", True)
+    monkeypatch.setattr(data_versions, "_shared_seen", {})
+    monkeypatch.setattr(data_versions, "_listeners", [])
+    notified = []
+    data_versions.subscribe(["items"], notified.append)
+    db = Session()
+    db.add(Item(code="DV-7", name="I"))
+    db.commit()
+    assert data_versions.sync_shared(db) == ["items"]
+    assert notified == [["items"]]
+
+    # Vlastní zápis navazuje na známou verzi — sync ho za cizí nepovažuje
+    db.add(Item(code="DV-8", name="J"))
+    db.commit()
+    assert data_versions.sync_shared(db) == []
+    assert notified == [["items"]]
+
+    db.execute(update(DataVersion).where(DataVersion.table_name == "items").values(version=DataVersion.version + 1))
+    db.commit()
+    db.add(Item(code="DV-9", name="K"))
+    db.commit()
+    assert data_versions.sync_shared(db) == ["items"]
+    assert notified == [["items"], ["items"]]
+
+
+def test_remote_change_invalidates_code_index(Session, monkeypatch):
+    from app.services.code_index import code_index
+
+    monkeypatch.setattr(settings, "DATA_VERSIONS_SHARED", True)
+    monkeypatch.setattr(data_versions, "_shared_seen", {})
+    db = Session()
+    db.add(Item(code="DV-10", name="L"))
+    db.commit()
+    data_versions.sync_shared(db)
+    code_index.rebuild(db)
+    db.execute(update(DataVersion).where(DataVersion.table_name == "items").values(version=DataVersion.version + 1))
+    db.commit()
+    assert data_versions.sync_shared(db) == ["items"]
+    assert code_index._stale
@@ -177,3 +177,31 @@ def test_list_disposals_pagination(client):
     assert data["total"] == 5
     assert len(data["items"]) == 2
     assert data["pages"] == 3
+
+
+def test_list_disposals_includes_item_fields(client):
+    item_id = _create_item(client, "DISP-JOIN-1")
+    client.post(f"/api/items/{item_id}/dispose", json={"reason": "sale"})
+    d = client.get("/api/disposals").json()["items"][0]
+    assert d["item_code"] == "DISP-JOIN-1"
+    assert d["item_name"]
+
+
+def test_disposal_years_summary(client):
+    """Souhrn let se udržuje při vyřazení i hromadném vyřazení."""
+    from app.database import get_db
+    import app.services.disposal_service as svc
+
+    a = _create_item(client, "DISP-YR-1")
+    b = _create_item(client, "DISP-YR-2")
+    c = _create_item(client, "DISP-YR-3")
+    client.post(f"/api/items/{a}/dispose", json={"reason": "sale", "disposed_at": "2022-12-31T23:00:00Z"})
+    client.post("/api/items/bulk-dispose", json={"item_ids": [b, c], "reason": "loss", "disposed_at": "2024-01-01T00:00:00Z"})
+
+    db = next(client.app.dependency_overrides[get_db]())
+    assert svc.get_disposal_years(db) == [2024, 2022]
+    db.close()
+
+    assert client.get("/api/disposals?year=2024").json()["total"] == 2
+    assert client.get("/api/disposals?year=2023").json()["total"] == 0
+    assert client.get("/api/disposals?year=2022").json()["total"] == 1
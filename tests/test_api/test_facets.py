@@ -0,0 +1,57 @@
+"""Testy udržovaného souhrnu category_stats a /api/items/facets."""
+from decimal import Decimal
+
+from tests.test_api.test_import import make_excel
+
+
+def _facets(client) -> dict:
+    res = client.get("/api/items/facets")
+    assert res.status_code == 200
+    return {c["category"]: (c["count"], Decimal(str(c["total_value"]))) for c in res.json()["categories"]}
+
+
+def test_facets_follow_item_writes(client):
+    a = client.post("/api/items", json={"code": "F-1", "name": "A", "category": "IT", "purchase_price": "1000.50"}).json()
+    client.post("/api/items", json={"code": "F-2", "name": "B", "category": "IT", "purchase_price": "200"})
+    c = client.post("/api/items", json={"code": "F-3", "name": "C"}).json()
+    assert _facets(client) == {"IT": (2, Decimal("1200.50")), None: (1, Decimal("0"))}
+
+    # Změna kategorie a ceny přesune položku mezi fasetami
+    client.put(f"/api/items/{c['id']}", json={"category": "Nábytek", "purchase_price": "300"})
+    client.put(f"/api/items/{a['id']}", json={"purchase_price": "1500"})
+    assert _facets(client) == {"IT": (2, Decimal("1700")), "Nábytek": (1, Decimal("300"))}
+
+    client.delete(f"/api/items/{a['id']}")
+    client.post(f"/api/items/{c['id']}/dispose", json={"reason": "sale"})
+    assert _facets(client) == {"IT": (1, Decimal("200"))}
+
+
+def test_facets_after_bulk_dispose(client):
+    ids = [
+        client.post("/api/items", json={"code": f"FB-{i}", "name": "x", "category": "Židle", "purchase_price": "100"}).json()["id"]
+        for i in range(3)
+    ]
+    client.post("/api/items/bulk-dispose", json={"item_ids": ids[:2] + ids[:1], "reason": "liquidation"})
+    assert _facets(client) == {"Židle": (1, Decimal("100"))}
+
+
+def test_facets_after_import_upsert(client):
+    client.post("/api/items", json={"code": "FI-1", "name": "A", "category": "IT", "purchase_price": "100"})
+    data = make_excel([
+        ["FI-1", "A", "Kancelář", "", "", "", "150", ""],   # změna kategorie i ceny
+        ["FI-2", "B", "IT", "", "", "", "50", ""],           # nová položka
+    ])
+    res = client.post(
+        "/import",
+        data={"mode": "upsert"},
+        files={"file": ("import.xlsx", data, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")},
+    )
+    assert res.status_code == 200
+    assert _facets(client) == {"IT": (1, Decimal("50")), "Kancelář": (1, Decimal("150"))}
+
+
+def test_dashboard_and_filter_show_categories(client):
+    client.post("/api/items", json={"code": "FD-1", "name": "A", "category": "Tiskárny", "purchase_price": "1234"})
+    assert "Tiskárny (1)" in client.get("/majetek").text
+    page = client.get("/").text
+    assert "Tiskárny" in page and "1 234 Kč" in page
@@ -2,3 +2,141 @@ def test_health(client):
     res = client.get("/health")
     assert res.status_code == 200
     assert res.json() == {"status": "ok"}
+
+
+def test_health_db_reports_pool(client):
+    res = client.get("/health/db")
+    assert res.status_code == 200
+    data = res.json()
+    assert data["dialect"] == "sqlite"
+    assert data["journal_mode"] == "wal"
+    assert data["pool"]["checkedout"] >= 1
+
+
+def test_sqlite_profile_pragmas(tmp_path):
+    from sqlalchemy import text
+    from app.database import make_engine, pool_stats
+
+    engine = make_engine(f"sqlite:///{tmp_path / 'profile.db'}")
+    with engine.connect() as conn:
+        assert conn.scalar(text("PRAGMA journal_mode")) == "wal"
+        assert conn.scalar(text("PRAGMA synchronous")) == 1  # NORMAL
+        assert conn.scalar(text("PRAGMA busy_timeout")) == 5000
+        assert pool_stats(engine)["checkedout"] == 1
+    assert pool_stats(engine)["checkedout"] == 0
+    engine.dispose()
+
+
+def test_mysql_profile_pool_options():
+    from app.database import engine_options
+
+    options = engine_options("mysql+pymysql://u:p@db/inventory")
+    assert options["pool_pre_ping"] is True
+    assert options["pool_recycle"] == 1800
+    assert "connect_args" not in options
+
+
+def test_read_engine_is_query_only(tmp_path):
+    import pytest
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError
+    from app.database import make_engine, make_read_engine
+
+    url = f"sqlite:///{tmp_path / 'split.db'}"
+    writer = make_engine(url)
+    with writer.begin() as conn:
+        conn.execute(text("CREATE TABLE t (x INTEGER)"))
+        conn.execute(text("INSERT INTO t VALUES (1)"))
+    reader = make_read_engine(url)
+    with reader.connect() as conn:
+        assert conn.scalar(text("SELECT x FROM t")) == 1
+        with pytest.raises(OperationalError):
+            conn.execute(text("INSERT INTO t VALUES (2)"))
+    reader.dispose()
+    writer.dispose()
+
+    assert make_read_engine("sqlite:///:memory:") is None
+    assert make_read_engine("mysql+pymysql://u:p@db/inv") is None
+    replica = make_read_engine("mysql+pymysql://u:p@db/inv", "mysql+pymysql://u:p@replica/inv")
+    assert replica.url.host == "replica"
+
+
+def test_metrics_endpoint(client):
+    from prometheus_client import REGISTRY
+
+    def sample(name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    moves = sample("assettrack_moves_total")
+    requests = sample("assettrack_http_request_duration_seconds_count", method="GET", route="/api/items/{item_id}")
+    queries = sample("assettrack_db_queries_per_request_sum")
+
+    item_id = client.post("/api/items", json={"code": "MET-1", "name": "Měřená"}).json()["id"]
+    loc_id = client.post("/api/locations", json={"name": "Sklad", "code": "MET-L"}).json()["id"]
+    assert client.post("/api/moves", json={"item_id": item_id, "location_id": loc_id}).status_code == 201
+    assert client.post("/api/moves", json={"item_id": 99999, "location_id": loc_id}).status_code == 404
+    assert client.get(f"/api/items/{item_id}").status_code == 200
+
+    res = client.get("/metrics")
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/plain")
+    assert "assettrack_threadpool_size_threads" in res.text
+    assert sample("assettrack_moves_total") == moves + 1  # neúspěšný přesun se nepočítá
+    assert sample(
+        "assettrack_http_request_duration_seconds_count", method="GET", route="/api/items/{item_id}"
+    ) == requests + 1
+    assert sample("assettrack_db_queries_per_request_sum") > queries
+
+
+def test_server_timing_header(client, monkeypatch):
+    import re
+    from app.config import settings
+
+    assert "server-timing" not in client.get("/").headers
+    monkeypatch.setattr(settings, "SERVER_TIMING", True)
+    res = client.get("/")
+    assert res.status_code == 200
+    timing = res.headers["server-timing"]
+    queries, db_ms, tpl_ms = re.match(r'db;desc="(\d+) SQL";dur=([\d.]+), tpl;dur=([\d.]+), total;dur=', timing).groups()
+    assert int(queries) > 0
+    assert float(tpl_ms) > 0
+
+
+def test_slow_request_log(client, monkeypatch, caplog):
+    import json
+    from app.config import settings
+
+    monkeypatch.setattr(settings, "SLOW_REQUEST_MS", 1)
+    monkeypatch.setattr(settings, "SLOW_REQUEST_TOP_SQL", 2)
+    with caplog.at_level("WARNING", logger="app.slow_requests"):
+        client.get("/")
+    entry = json.loads(caplog.records[-1].getMessage())
+    assert entry["event"] == "slow_request"
+    assert entry["route"] == "/"
+    assert entry["queries"] > 2
+    assert len(entry["slowest_sql"]) == 2
+    assert entry["slowest_sql"][0]["ms"] >= entry["slowest_sql"][1]["ms"]
+
+
+def test_archive_dead_worker_metrics(tmp_path):
+    from prometheus_client import CollectorRegistry
+    from prometheus_client.mmap_dict import MmapedDict, mmap_key
+    from prometheus_client.multiprocess import MultiProcessCollector
+    from app.metrics import archive_dead_process
+
+    key = mmap_key("jobs_total", "jobs_total", [], [], "Úlohy")
+    for pid, value in ((101, 2.0), (102, 3.0)):
+        values = MmapedDict(str(tmp_path / f"counter_{pid}.db"))
+        values.write_value(key, value, 0.0)
+        values.close()
+
+    def total():
+        registry = CollectorRegistry()
+        MultiProcessCollector(registry, str(tmp_path))
+        return registry.get_sample_value("jobs_total")
+
+    assert total() == 5.0
+    archive_dead_process(101, str(tmp_path))
+    archive_dead_process(102, str(tmp_path))
+    assert total() == 5.0
+    assert sorted(p.name for p in tmp_path.glob("*.db")) == ["counter_archive.db"]
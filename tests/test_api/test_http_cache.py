@@ -0,0 +1,128 @@
+"""Testy podmíněných GET (ETag / Last-Modified / 304)."""
+import os
+
+import pytest
+
+
+def test_item_etag_and_304(client):
+    item = client.post("/api/items", json={"code": "HC-1", "name": "Lampa"}).json()
+    res = client.get(f"/api/items/{item['id']}")
+    etag = res.headers["etag"]
+    assert res.headers["cache-control"] == "private, no-cache"
+    assert "last-modified" in res.headers
+
+    res = client.get(f"/api/items/{item['id']}", headers={"If-None-Match": etag})
+    assert res.status_code == 304
+    assert res.content == b""
+    assert res.headers["etag"] == etag
+
+    # Weak varianta (nginx gzip) i seznam tagů
+    assert client.get(f"/api/items/{item['id']}", headers={"If-None-Match": f'"x", W/{etag}'}).status_code == 304
+
+    client.put(f"/api/items/{item['id']}", json={"name": "Věšák"})
+    res = client.get(f"/api/items/{item['id']}", headers={"If-None-Match": etag})
+    assert res.status_code == 200
+    assert res.json()["name"] == "Věšák"
+    assert res.headers["etag"] != etag
+
+
+def test_item_if_modified_since(client):
+    item = client.post("/api/items", json={"code": "HC-2", "name": "Lampa"}).json()
+    last_modified = client.get(f"/api/items/{item['id']}").headers["last-modified"]
+    res = client.get(f"/api/items/{item['id']}", headers={"If-Modified-Since": last_modified})
+    assert res.status_code == 304
+    res = client.get(f"/api/items/{item['id']}", headers={"If-Modified-Since": "Mon, 01 Jan 2001 00:00:00 GMT"})
+    assert res.status_code == 200
+
+
+def test_list_etag_follows_data_versions(client):
+    client.post("/api/locations", json={"code": "HC-L1", "name": "Sklad"})
+    etag = client.get("/api/locations").headers["etag"]
+    assert client.get("/api/locations", headers={"If-None-Match": etag}).status_code == 304
+    # Jiné parametry → jiný ETag
+    assert client.get("/api/locations?size=1", headers={"If-None-Match": etag}).status_code == 200
+
+    client.post("/api/locations", json={"code": "HC-L2", "name": "Dílna"})
+    res = client.get("/api/locations", headers={"If-None-Match": etag})
+    assert res.status_code == 200
+    assert res.json()["total"] == 2
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="bez fork()")
+def test_forked_worker_has_own_etag_epoch():
+    from app import http_cache
+
+    # Stejné lokální verze v obou procesech — shodovat by se mohly jen přes zděděnou epochu
+    parent = http_cache.versions_etag(None, ("items",))
+    read_end, write_end = os.pipe()
+    pid = os.fork()
+    if pid == 0:  # worker po forku z preloadovaného mastera
+        os.write(write_end, http_cache.versions_etag(None, ("items",)).encode())
+        os._exit(0)
+    os.close(write_end)
+    child = os.read(read_end, 100).decode()
+    os.close(read_end)
+    os.waitpid(pid, 0)
+    assert child and child != parent
+
+
+def test_shared_list_etag_is_same_in_all_workers(client, monkeypatch):
+    from sqlalchemy import update
+    from app import data_versions, http_cache
+    from app.config import settings
+    from app.database import get_db
+    from app.models.data_version import DataVersion
+
+    monkeypatch.setattr(settings, "DATA_VERSIONS_SHARED", True)
+    client.post("/api/locations", json={"code": "HC-L4", "name": "Sklad"})
+    etag = client.get("/api/locations").headers["etag"]
+
+    # Jiný worker — vlastní epocha i lokální čítače verzí
+    monkeypatch.setattr(http_cache, "_EPOCH", "worker-b")
+    data_versions.bump("locations")
+    assert client.get("/api/locations", headers={"If-None-Match": etag}).status_code == 304
+
+    # Zápis jiného workeru je vidět v data_versions hned
+    db = next(client.app.dependency_overrides[get_db]())
+    db.execute(update(DataVersion).where(DataVersion.table_name == "locations").values(version=DataVersion.version + 1))
+    db.commit()
+    db.close()
+    assert client.get("/api/locations", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_history_etag_changes_after_move(client):
+    item = client.post("/api/items", json={"code": "HC-3", "name": "Stůl"}).json()
+    loc = client.post("/api/locations", json={"code": "HC-L3", "name": "Kancelář"}).json()
+    etag = client.get(f"/api/items/{item['id']}/history").headers["etag"]
+    assert client.get(f"/api/items/{item['id']}/history", headers={"If-None-Match": etag}).status_code == 304
+
+    client.post("/api/moves", json={"item_id": item["id"], "location_id": loc["id"]})
+    res = client.get(f"/api/items/{item['id']}/history", headers={"If-None-Match": etag})
+    assert res.status_code == 200
+    assert len(res.json()) == 1
+
+
+def test_qr_immutable_with_version(client, monkeypatch):
+    from app.config import settings
+    from app.services.qr_service import qr_version, scan_url
+
+    item = client.post("/api/items", json={"code": "HC-QR", "name": "Tiskárna"}).json()
+    version = qr_version(scan_url("HC-QR"))
+    res = client.get(f"/api/qr/item/{item['id']}?v={version}")
+    assert res.status_code == 200
+    assert res.headers["content-type"] == "image/png"
+    assert "immutable" in res.headers["cache-control"]
+    assert client.get(f"/api/qr/item/{item['id']}", headers={"If-None-Match": res.headers["etag"]}).status_code == 304
+
+    # Bez kódu (nebo se starým kódem) jen s revalidací
+    assert client.get(f"/api/qr/item/{item['id']}").headers["cache-control"] == "private, no-cache"
+    client.put(f"/api/items/{item['id']}", json={"code": "HC-QR2"})
+    res2 = client.get(f"/api/qr/item/{item['id']}?v={version}", headers={"If-None-Match": res.headers["etag"]})
+    assert res2.status_code == 200
+    assert "immutable" not in res2.headers["cache-control"]
+
+    # Změna BASE_URL — starý otisk už trvalé cachování nezapne
+    version2 = qr_version(scan_url("HC-QR2"))
+    monkeypatch.setattr(settings, "BASE_URL", "https://inventar.example.cz")
+    res3 = client.get(f"/api/qr/item/{item['id']}?v={version2}")
+    assert "immutable" not in res3.headers["cache-control"]
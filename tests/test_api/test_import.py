@@ -286,3 +286,140 @@ class TestImportService:
         ws = wb["Import majetku"]
         # Alespoň záhlaví + jeden ukázkový řádek
         assert ws.max_row >= 2
+
+
+# ── Testy upsert režimu ───────────────────────────────────────────────────────
+
+class TestImportUpsert:
+    def _db(self):
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from sqlalchemy.pool import StaticPool
+        from app.database import Base
+
+        engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+        Base.metadata.create_all(engine)
+        return sessionmaker(bind=engine)()
+
+    def test_upsert_updates_only_changed_fields(self):
+        from decimal import Decimal
+        from app.models.item import Item
+
+        db = self._db()
+        db.add_all([
+            Item(code="UP-001", name="Notebook", category="IT", purchase_price=Decimal("1000.00")),
+            Item(code="UP-002", name="Monitor", category="IT", purchase_price=Decimal("500.00")),
+        ])
+        db.commit()
+
+        data = make_excel([
+            ["UP-001", "Notebook", "IT", "", "", "", "1200", ""],   # změna ceny
+            ["UP-002", "Monitor",  "IT", "", "", "", "500", ""],    # beze změny
+            ["UP-003", "Nová",     "",   "", "", "", "", ""],       # nová položka
+        ])
+        result = svc.import_items_from_excel(db, data, mode="upsert")
+
+        assert result["success"] is True
+        assert result["updated"] == 1
+        assert result["unchanged"] == 1
+        assert result["imported"] == 1
+        assert result["field_changes"] == {"purchase_price": 1}
+
+        db.expire_all()
+        item = db.query(Item).filter_by(code="UP-001").one()
+        assert item.purchase_price == Decimal("1200")
+        assert item.name == "Notebook"
+        db.close()
+
+    def test_upsert_blank_cell_keeps_value(self):
+        from app.models.item import Item
+
+        db = self._db()
+        db.add(Item(code="UP-010", name="Židle", category="Nábytek", responsible_person="Jan Novák"))
+        db.commit()
+
+        data = make_excel(
+            [["UP-010", "", "", "Jana Dvořák"]],
+            headers=["Kód", "Název *", "Kategorie", "Zodpovědná osoba"],
+        )
+        result = svc.import_items_from_excel(db, data, mode="upsert")
+
+        assert result["updated"] == 1
+        assert result["field_changes"] == {"responsible_person": 1}
+        db.expire_all()
+        item = db.query(Item).filter_by(code="UP-010").one()
+        assert item.responsible_person == "Jana Dvořák"
+        assert item.name == "Židle"
+        assert item.category == "Nábytek"
+        db.close()
+
+    def test_upsert_moves_item_to_new_location(self):
+        from app.models.item import Item
+        from app.models.location import Location
+        from app.models.assignment import Assignment
+
+        db = self._db()
+        item = Item(code="UP-020", name="Projektor")
+        loc_a = Location(code="LA", name="A")
+        loc_b = Location(code="LB", name="B")
+        db.add_all([item, loc_a, loc_b])
+        db.flush()
+        db.add(Assignment(item_id=item.id, location_id=loc_a.id))
+        db.commit()
+
+        data = make_excel([["UP-020", "Projektor", "", "", "", "", "", "LB"]])
+        result = svc.import_items_from_excel(db, data, mode="upsert")
+
+        assert result["field_changes"] == {"location": 1}
+        assignments = db.query(Assignment).filter_by(item_id=item.id).all()
+        assert len(assignments) == 2
+        db.close()
+
+    def test_upsert_skips_disposed_item(self):
+        from app.models.item import Item
+        from app.models.location import Location
+        from app.models.assignment import Assignment
+
+        db = self._db()
+        item = Item(code="UP-040", name="Vyřazený", is_active=False)
+        db.add_all([item, Location(code="LC", name="C")])
+        db.commit()
+
+        data = make_excel([["UP-040", "Přejmenovaný", "", "", "", "", "", "LC"]])
+        result = svc.import_items_from_excel(db, data, mode="upsert")
+
+        assert result["skipped"] == 1
+        assert result["updated"] == 0
+        assert "vyřazená" in result["details"][0]["reason"]
+        db.expire_all()
+        assert db.query(Item).filter_by(code="UP-040").one().name == "Vyřazený"
+        assert db.query(Assignment).filter_by(item_id=item.id).count() == 0
+        db.close()
+
+    def test_insert_mode_still_skips_existing(self):
+        from app.models.item import Item
+
+        db = self._db()
+        db.add(Item(code="UP-030", name="Původní"))
+        db.commit()
+
+        data = make_excel([["UP-030", "Přepsaný", "", "", "", "", "", ""]])
+        result = svc.import_items_from_excel(db, data)
+
+        assert result["skipped"] == 1
+        assert result["updated"] == 0
+        db.expire_all()
+        assert db.query(Item).filter_by(code="UP-030").one().name == "Původní"
+        db.close()
+
+    def test_upsert_via_ui(self, client):
+        client.post("/api/items", json={"code": "UP-UI-1", "name": "Původní název"})
+        data = make_excel([["UP-UI-1", "Nový název", "", "", "", "", "", ""]])
+        res = client.post(
+            "/import",
+            data={"mode": "upsert"},
+            files={"file": ("import.xlsx", data, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")},
+        )
+        assert res.status_code == 200
+        assert "Aktualizováno" in res.text
+        assert client.get("/api/items/by-code/UP-UI-1").json()["name"] == "Nový název"
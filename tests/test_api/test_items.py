@@ -63,6 +63,43 @@ def test_search_items(client):
     assert res.json()["total"] >= 1
 
 
+def test_search_accent_folding(client):
+    client.post("/api/items", json={"code": "FTS-001", "name": "Židle kancelářská"})
+    client.post("/api/items", json={"code": "FTS-002", "name": "Stůl"})
+    res = client.get("/api/items?search=zidle kanc").json()
+    assert [i["code"] for i in res["items"]] == ["FTS-001"]
+
+
+def test_search_other_fields_and_ranking(client):
+    client.post("/api/items", json={"code": "FTS-010", "name": "Monitor", "description": "starý monitor do skladu"})
+    client.post("/api/items", json={"code": "FTS-011", "name": "Monitor Monitor Dell", "category": "Monitor"})
+    client.post("/api/items", json={"code": "FTS-012", "name": "Tiskárna", "responsible_person": "Jan Novák"})
+    codes = [i["code"] for i in client.get("/api/items?search=monitor").json()["items"]]
+    assert codes[0] == "FTS-011"
+    assert set(codes) == {"FTS-010", "FTS-011"}
+    assert [i["code"] for i in client.get("/api/items?search=novak").json()["items"]] == ["FTS-012"]
+
+
+def test_search_index_follows_writes(client):
+    item = client.post("/api/items", json={"code": "FTS-020", "name": "Lampa"}).json()
+    client.put(f"/api/items/{item['id']}", json={"name": "Věšák"})
+    assert client.get("/api/items?search=lampa").json()["total"] == 0
+    assert client.get("/api/items?search=vesak").json()["total"] == 1
+    client.delete(f"/api/items/{item['id']}")
+    assert client.get("/api/items?search=vesak").json()["total"] == 0
+
+
+def test_search_cursor_walk(client):
+    for i in range(5):
+        client.post("/api/items", json={"code": f"FTS-03{i}", "name": "Regál " + "kovový " * i})
+    res = client.get("/api/items?search=regal&size=2").json()
+    seen = [i["code"] for i in res["items"]]
+    while res["next_cursor"]:
+        res = client.get(f"/api/items?search=regal&size=2&after={res['next_cursor']}").json()
+        seen += [i["code"] for i in res["items"]]
+    assert sorted(seen) == [f"FTS-03{i}" for i in range(5)]
+
+
 def test_item_history(client):
     r = client.post("/api/items", json={"code": "HIST-001", "name": "History Item"})
     item_id = r.json()["id"]
@@ -45,3 +45,97 @@ def test_move_invalid_location(client):
     r_item = client.post("/api/items", json={"code": "MV-003", "name": "Item3"})
     res = client.post("/api/moves", json={"item_id": r_item.json()["id"], "location_id": 99999})
     assert res.status_code == 404
+
+
+def test_bulk_move(client):
+    """Hromadný přesun přesune jen aktivní položky, jejichž poslední lokace je zdrojová."""
+    src = client.post("/api/locations", json={"name": "Sklad", "code": "MV-BULK-SRC"}).json()["id"]
+    dst = client.post("/api/locations", json={"name": "Kancelář", "code": "MV-BULK-DST"}).json()["id"]
+    other = client.post("/api/locations", json={"name": "Jinde", "code": "MV-BULK-OTH"}).json()["id"]
+
+    ids = [client.post("/api/items", json={"code": f"MV-BULK-{i}", "name": f"Item {i}"}).json()["id"] for i in range(4)]
+    for item_id in ids:
+        client.post("/api/moves", json={"item_id": item_id, "location_id": src})
+    # ids[2] už odešla jinam, ids[3] je vyřazená
+    client.post("/api/moves", json={"item_id": ids[2], "location_id": other})
+    client.post(f"/api/items/{ids[3]}/dispose", json={"reason": "loss"})
+
+    res = client.post("/api/moves/bulk", json={"from_location_id": src, "to_location_id": dst, "note": "Stěhování"})
+    assert res.status_code == 200
+    assert res.json()["moved"] == 2
+
+    moved = {i["id"] for i in client.get(f"/api/locations/{dst}/items").json()}
+    assert moved == {ids[0], ids[1]}
+    last = client.get(f"/api/items/{ids[0]}/history").json()[-1]
+    assert last["note"] == "Stěhování"
+    assert last["user_id"] is not None
+    assert client.get(f"/api/locations/{src}/items").json() == []
+
+
+def test_bulk_move_inactive_target(client):
+    src = client.post("/api/locations", json={"name": "A", "code": "MV-BULK-A"}).json()["id"]
+    dst = client.post("/api/locations", json={"name": "B", "code": "MV-BULK-B"}).json()["id"]
+    client.delete(f"/api/locations/{dst}")
+    res = client.post("/api/moves/bulk", json={"from_location_id": src, "to_location_id": dst})
+    assert res.status_code == 404
+
+
+def test_assign_unlocated(client):
+    """Přiřadí položky bez lokace i položky na neaktivní lokaci; ostatní nechá být."""
+    target = client.post("/api/locations", json={"name": "Cíl", "code": "MV-UNL-T"}).json()["id"]
+    dead = client.post("/api/locations", json={"name": "Zrušená", "code": "MV-UNL-D"}).json()["id"]
+    ok = client.post("/api/locations", json={"name": "OK", "code": "MV-UNL-OK"}).json()["id"]
+
+    no_loc = client.post("/api/items", json={"code": "MV-UNL-1", "name": "Bez lokace"}).json()["id"]
+    orphan = client.post("/api/items", json={"code": "MV-UNL-2", "name": "Sirotek"}).json()["id"]
+    placed = client.post("/api/items", json={"code": "MV-UNL-3", "name": "Umístěná"}).json()["id"]
+    disposed = client.post("/api/items", json={"code": "MV-UNL-4", "name": "Vyřazená"}).json()["id"]
+    client.post("/api/moves", json={"item_id": orphan, "location_id": dead})
+    client.post("/api/moves", json={"item_id": placed, "location_id": ok})
+    client.post(f"/api/items/{disposed}/dispose", json={"reason": "loss"})
+    client.delete(f"/api/locations/{dead}")
+
+    res = client.post(f"/api/moves/assign-unlocated/{target}")
+    assert res.status_code == 200
+    assert res.json()["moved"] == 2
+    at_target = {i["id"] for i in client.get(f"/api/locations/{target}/items").json()}
+    assert at_target == {no_loc, orphan}
+
+    # Druhé volání už nemá co přiřadit
+    assert client.post(f"/api/moves/assign-unlocated/{target}").json()["moved"] == 0
+
+
+def test_batch_move(client):
+    """Dávkový přesun párů (položka → lokace) podle ID i kódu, s výsledkem pro každý řádek."""
+    loc_a = client.post("/api/locations", json={"name": "A", "code": "MV-BAT-A"}).json()["id"]
+    client.post("/api/locations", json={"name": "B", "code": "MV-BAT-B"})
+    i1 = client.post("/api/items", json={"code": "MV-BAT-1", "name": "Jedna"}).json()["id"]
+    i2 = client.post("/api/items", json={"code": "MV-BAT-2", "name": "Dvě"}).json()["id"]
+
+    res = client.post("/api/moves/batch", json={
+        "note": "Stěhování patra",
+        "moves": [
+            {"item_id": i1, "location_id": loc_a},
+            {"item_code": "MV-BAT-2", "location_code": "MV-BAT-B"},
+            {"item_code": "NEEXISTUJE", "location_code": "MV-BAT-B"},
+            {"item_id": i1, "location_code": "NEEXISTUJE"},
+            {"item_id": i1, "location_code": "MV-BAT-B"},
+            {"location_id": loc_a},
+        ],
+    })
+    assert res.status_code == 200
+    data = res.json()
+    assert data["moved"] == 2
+    assert data["errors"] == 4
+    statuses = [r["status"] for r in data["results"]]
+    assert statuses == ["moved", "moved", "error", "error", "error", "error"]
+    assert data["results"][4]["detail"] == "Položka se v dávce opakuje"
+
+    history = client.get(f"/api/items/{i2}/history").json()
+    assert len(history) == 1
+    assert history[0]["note"] == "Stěhování patra"
+
+
+def test_batch_move_empty(client):
+    res = client.post("/api/moves/batch", json={"moves": []})
+    assert res.status_code == 422
@@ -0,0 +1,138 @@
+"""Testy stránkování — offset i kurzor (keyset)."""
+
+
+def _walk(client, url):
+    """Projde všechny stránky přes next_cursor, vrátí seznam id."""
+    ids = []
+    res = client.get(url).json()
+    ids += [i["id"] for i in res["items"]]
+    sep = "&" if "?" in url else "?"
+    while res["next_cursor"]:
+        res = client.get(f"{url}{sep}after={res['next_cursor']}").json()
+        assert res["total"] is None
+        ids += [i["id"] for i in res["items"]]
+    return ids
+
+
+def test_items_cursor_walk(client):
+    created = [client.post("/api/items", json={"code": f"PG-{i:03d}", "name": f"Položka {i}"}).json()["id"] for i in range(7)]
+    first = client.get("/api/items?size=3").json()
+    assert first["total"] == 7
+    assert first["pages"] == 3
+    assert first["next_cursor"]
+
+    assert _walk(client, "/api/items?size=3") == created
+
+
+def test_items_cursor_respects_filter(client):
+    for i in range(5):
+        client.post("/api/items", json={"code": f"PGF-{i}", "name": "Židle" if i % 2 else "Stůl"})
+    ids = _walk(client, "/api/items?size=1&search=Židle")
+    assert len(ids) == 2
+
+
+def test_last_page_has_no_cursor(client):
+    client.post("/api/items", json={"code": "PG-ONE", "name": "Jediná"})
+    res = client.get("/api/items?size=5").json()
+    assert res["next_cursor"] is None
+
+
+def test_locations_cursor_walk(client):
+    created = [client.post("/api/locations", json={"name": f"L{i}", "code": f"PGL-{i}"}).json()["id"] for i in range(4)]
+    assert _walk(client, "/api/locations?size=3") == created
+
+
+def test_disposals_cursor_walk_descending(client):
+    ids = [client.post("/api/items", json={"code": f"PGD-{i}", "name": "X"}).json()["id"] for i in range(5)]
+    for day, item_id in enumerate(ids, 1):
+        client.post(f"/api/items/{item_id}/dispose", json={"reason": "sale", "disposed_at": f"2024-03-0{day}T10:00:00Z"})
+    # Dvě vyřazení se stejným časem — rozhoduje id
+    extra = client.post("/api/items", json={"code": "PGD-X", "name": "X"}).json()["id"]
+    client.post(f"/api/items/{extra}/dispose", json={"reason": "sale", "disposed_at": "2024-03-03T10:00:00Z"})
+
+    listed = []
+    res = client.get("/api/disposals?size=2").json()
+    listed += [d["item_id"] for d in res["items"]]
+    while res["next_cursor"]:
+        res = client.get(f"/api/disposals?size=2&after={res['next_cursor']}").json()
+        listed += [d["item_id"] for d in res["items"]]
+    assert listed == [ids[4], ids[3], extra, ids[2], ids[1], ids[0]]
+
+
+def test_invalid_cursor(client):
+    res = client.get("/api/items?after=nesmysl")
+    assert res.status_code == 400
+
+
+def test_cached_total_follows_writes(client):
+    for i in range(3):
+        client.post("/api/items", json={"code": f"PGC-{i}", "name": "Lavice"})
+    assert client.get("/api/items").json()["total"] == 3
+    assert client.get("/api/items?search=Lavice").json()["total"] == 3
+
+    # Zápis zvýší verzi tabulky items → cachované počty se přepočítají
+    created = client.post("/api/items", json={"code": "PGC-X", "name": "Lavice"}).json()
+    assert client.get("/api/items").json()["total"] == 4
+    client.delete(f"/api/items/{created['id']}")
+    assert client.get("/api/items?search=Lavice").json()["total"] == 3
+
+
+def test_cached_total_after_bulk_dispose(client):
+    ids = [client.post("/api/items", json={"code": f"PGB-{i}", "name": "Skříň"}).json()["id"] for i in range(3)]
+    assert client.get("/api/disposals").json()["total"] == 0
+    client.post("/api/items/bulk-dispose", json={"item_ids": ids[:2], "reason": "sale"})
+    assert client.get("/api/disposals").json()["total"] == 2
+    assert client.get("/api/items").json()["total"] == 1
+
+
+def test_has_more_mode_skips_total(client):
+    for i in range(4):
+        client.post("/api/items", json={"code": f"PGH-{i}", "name": "Police"})
+    res = client.get("/api/items?size=3&with_total=false").json()
+    assert res["total"] is None and res["pages"] is None
+    assert len(res["items"]) == 3
+    assert res["has_more"] is True and res["next_cursor"]
+
+    last = client.get("/api/items?size=3&page=2&with_total=false").json()
+    assert len(last["items"]) == 1
+    assert last["has_more"] is False
+
+
+def test_fast_json_matches_standard_output(client):
+    for i in range(3):
+        client.post("/api/items", json={
+            "code": f"FJ-{i}", "name": f"Židle {i}", "category": "Nábytek",
+            "purchase_price": "1234.50", "purchase_date": "2024-05-01",
+        })
+    client.post("/api/locations", json={"code": "FJ-L", "name": "Sklad", "building": "A"})
+
+    for url in ("/api/items?size=2", "/api/items?search=zidle", "/api/locations"):
+        standard = client.get(url)
+        fast = client.get(url + ("&" if "?" in url else "?") + "fast=true")
+        assert fast.status_code == 200
+        assert fast.headers["content-type"] == "application/json"
+        assert fast.json() == standard.json()
+        assert fast.headers["etag"]
+
+    cursor = client.get("/api/items?size=2&fast=true").json()["next_cursor"]
+    rest = client.get(f"/api/items?size=2&fast=true&after={cursor}").json()
+    assert [i["code"] for i in rest["items"]] == ["FJ-2"]
+
+
+def test_large_api_response_is_compressed(client):
+    for i in range(30):
+        client.post("/api/items", json={"code": f"GZ-{i:03d}", "name": f"Monitor Dell {i}"})
+
+    response = client.get("/api/items?size=30", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert len(response.json()["items"]) == 30
+
+    small = client.get("/api/items?size=1", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers
+
+    identity = client.get("/api/items?size=30", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in identity.headers
+
+    page = client.get("/login", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in page.headers
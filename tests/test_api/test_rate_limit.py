@@ -0,0 +1,51 @@
+"""Limit pokusů o přihlášení (app.rate_limit)."""
+import time
+
+from app.rate_limit import DatabaseRateLimiter, MemoryRateLimiter
+
+
+def test_login_is_throttled(client):
+    from app.routers.auth_ui import login_limiter
+
+    try:
+        statuses = [
+            client.post("/login", data={"username": "admin", "password": "spatne"}).status_code
+            for _ in range(11)
+        ]
+        assert statuses == [401] * 10 + [429]
+    finally:
+        login_limiter.reset("login:testclient")
+
+
+def test_memory_limiter_window_and_cap(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    limiter = MemoryRateLimiter(limit=3, window=60, max_keys=100)
+
+    assert [limiter.hit("a") for _ in range(4)] == [True, True, True, False]
+    assert limiter.hit("b")
+    # O dvě okna později je předchozí okno zapomenuté
+    now[0] += 120
+    assert limiter.hit("a")
+
+    for i in range(500):
+        limiter.hit(f"spray-{i}")
+    assert len(limiter._counters) == 100
+
+
+def test_database_limiter_is_shared(tmp_path):
+    from app.database import Base, make_engine
+
+    engine = make_engine(f"sqlite:///{tmp_path / 'limits.db'}")
+    Base.metadata.create_all(engine)
+    # Dva „workery" nad stejnou DB
+    first = DatabaseRateLimiter(engine, limit=4, window=60)
+    second = DatabaseRateLimiter(engine, limit=4, window=60)
+
+    results = [limiter.hit("login:1.2.3.4") for limiter in (first, second, first, second, first)]
+    assert results == [True, True, True, True, False]
+    assert second.hit("login:5.6.7.8")
+
+    first.reset("login:1.2.3.4")
+    assert second.hit("login:1.2.3.4")
+    engine.dispose()
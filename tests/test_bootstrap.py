@@ -0,0 +1,72 @@
+"""Jednorázová inicializace DB při startu více workerů (app.bootstrap)."""
+import threading
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app import bootstrap
+from app.database import Base, make_engine
+from app.models.user import User
+
+
+def test_concurrent_init_creates_one_admin(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path / 'init.db'}")
+    barrier = threading.Barrier(6)
+    errors = []
+
+    def worker():
+        barrier.wait()
+        try:
+            bootstrap.init_database(engine)
+        except Exception as exc:  # pragma: no cover — test selhání
+            errors.append(exc)
+
+    threads = [threading.Thread(target=worker) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    try:
+        assert errors == []
+        with Session(engine) as db:
+            assert db.scalar(select(func.count()).select_from(User)) == 1
+    finally:
+        Base.metadata.drop_all(engine)
+        engine.dispose()
+
+
+def test_mark_initialized_skips_worker_init(monkeypatch):
+    # setenv zaznamená původní stav — po testu proměnná zmizí i z os.environ
+    monkeypatch.setenv(bootstrap.INIT_DONE_ENV, "0")
+    assert not bootstrap.already_initialized()
+    bootstrap.mark_initialized()
+    assert bootstrap.already_initialized()
+
+
+def test_init_fills_new_summary_tables(tmp_path):
+    from datetime import datetime, timezone
+    from app.models.category_stat import CategoryStat
+    from app.models.disposal import Disposal, DisposalYear
+    from app.models.item import Item
+
+    engine = make_engine(f"sqlite:///{tmp_path / 'summary.db'}")
+    # DB z doby před souhrnnou tabulkou (create_all, bez migrací)
+    Base.metadata.create_all(engine)
+    CategoryStat.__table__.drop(engine)
+    DisposalYear.__table__.drop(engine)
+    with Session(engine) as db:
+        db.add_all([Item(code="BS-1", name="A", category="IT"), Item(code="BS-2", name="B", category="IT")])
+        db.add(Item(code="BS-3", name="C", is_active=False))
+        db.flush()
+        db.add(Disposal(item_id=3, reason="sale", disposed_at=datetime(2023, 5, 1, tzinfo=timezone.utc)))
+        db.commit()
+
+    try:
+        bootstrap.init_database(engine)
+        with Session(engine) as db:
+            assert db.scalar(select(CategoryStat.item_count).where(CategoryStat.category == "IT")) == 2
+            assert db.scalars(select(DisposalYear.year)).all() == [2023]
+    finally:
+        Base.metadata.drop_all(engine)
+        engine.dispose()